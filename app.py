@@ -1,7 +1,21 @@
-import pickle
+import os
+import json
+import hmac
+import time
 import logging
-import pandas as pd
-from flask import Flask, request, jsonify
+import numpy as np
+from flask import Flask, Response, request, jsonify
+
+from src.logging_queue import SamplingFilter, enable_queue_logging
+from src.serving import codec
+from src.serving.batcher import MicroBatcher
+from src.serving.cache import PredictionCache
+from src.serving.schema import (
+    FEATURE_NAMES, FEATURE_SCHEMA, expected_features, explanation_body, prediction_body, warmup_rows
+)
+from src.serving.metrics import LATENCY_BUCKETS_S, NULL_CLOCK, MetricsRegistry, histogram_samples
+from src.serving.lifecycle import ModelManager, load_served_model, model_watch_paths
+from src.serving.validator import SchemaValidator
 
 # Initialize Flask application
 app = Flask("Heart_Disease_Prediction")
@@ -14,81 +28,207 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()]
 )
 logger = logging.getLogger(__name__)
+if os.environ.get("LOG_QUEUE", "1") == "1":
+    enable_queue_logging()
+
+# Per-request success logs, optionally sampled (LOG_SAMPLE_RATE=0.01 keeps ~1%)
+request_logger = logger.getChild("requests")
+request_logger.addFilter(SamplingFilter(float(os.environ.get("LOG_SAMPLE_RATE", "1.0"))))
 
 # Constants
 MODEL_FILE = 'best_model.pkl'
+MODEL_ARTIFACT = os.environ.get("MODEL_ARTIFACT", "best_model.artifact")
+SCORER_MODE = os.environ.get("SCORER_MODE", "compiled")  # "compiled" or "sklearn"
+MICRO_BATCHING = os.environ.get("MICRO_BATCHING", "0") == "1"
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_US = int(os.environ.get("BATCH_MAX_WAIT_US", "500"))
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "0"))  # 0 disables the cache
+PREDICTION_CACHE_TTL_S = float(os.environ.get("PREDICTION_CACHE_TTL_S", "300"))
+PREDICTION_CACHE_DECIMALS = int(os.environ.get("PREDICTION_CACHE_DECIMALS", "6"))
+LOAD_MODEL_ON_IMPORT = os.environ.get("LOAD_MODEL_ON_IMPORT", "1") == "1"
+MODEL_WATCH_INTERVAL_S = float(os.environ.get("MODEL_WATCH_INTERVAL_S", "0"))  # 0 disables the file watcher
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")  # /admin endpoints are disabled unless set
+EXPLANATIONS_ENABLED = os.environ.get("EXPLANATIONS_ENABLED", "1") == "1"  # built on the first ?explain=true
 SERVICE_NAME = "Heart Disease Prediction API"
 API_VERSION = "1.0.0"
+MAX_BATCH_SIZE = 50000
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson")
+
+validator = SchemaValidator(FEATURE_SCHEMA)
+
+started_at = time.time()
+
+# Per-stage timings and request/error counts, served on /metrics
+metrics = MetricsRegistry() if METRICS_ENABLED else None
+if metrics:
+    metrics.describe("http_requests_total", "counter", "Requests handled, by endpoint and status code")
+    metrics.describe("http_errors_total", "counter", "Error responses, by endpoint and error type")
+    metrics.describe("prediction_rows_total", "counter", "Batch records scored or rejected")
+    metrics.describe("request_stage_seconds", "histogram", "Time spent in each request stage", LATENCY_BUCKETS_S)
+    metrics.describe("model_load_seconds", "gauge", "Time taken by the last model load")
+    metrics.describe("model_loaded", "gauge", "1 when a model is loaded")
+    metrics.describe("prediction_cache_hits_total", "counter", "Prediction cache hits")
+    metrics.describe("prediction_cache_misses_total", "counter", "Prediction cache misses")
+    metrics.describe("prediction_cache_evictions_total", "counter", "Entries evicted to stay within capacity")
+    metrics.describe("prediction_cache_expirations_total", "counter", "Entries dropped after their TTL")
+    metrics.describe("prediction_cache_entries", "gauge", "Entries currently cached")
+
+def stage_clock(endpoint):
+    """Clock for timing the stages of one request; a no-op when metrics are disabled"""
+    return metrics.clock("request_stage_seconds", (("endpoint", endpoint),)) if metrics else NULL_CLOCK
 
-# Feature schema with validation rules
-FEATURE_SCHEMA = [
-    {"name": "male", "type": "binary", "description": "Gender (1=male, 0=female)"},
-    {"name": "age", "type": "numeric", "min": 30, "max": 100, "description": "Age in years"},
-    {"name": "education", "type": "numeric", "min": 1, "max": 4, "description": "Education level"},
-    {"name": "currentsmoker", "type": "binary", "description": "Current smoker status"},
-    {"name": "cigsperday", "type": "numeric", "min": 0, "max": 100, "description": "Cigarettes per day"},
-    {"name": "bpmeds", "type": "binary", "description": "Blood pressure medication"},
-    {"name": "prevalentstroke", "type": "binary", "description": "History of stroke"},
-    {"name": "prevalenthyp", "type": "binary", "description": "Hypertensive status"},
-    {"name": "diabetes", "type": "binary", "description": "Diabetic status"},
-    {"name": "totchol", "type": "numeric", "min": 100, "max": 400, "description": "Total cholesterol"},
-    {"name": "bmi", "type": "numeric", "min": 15, "max": 50, "description": "Body Mass Index"},
-    {"name": "heartrate", "type": "numeric", "min": 40, "max": 120, "description": "Resting heart rate"},
-    {"name": "glucose", "type": "numeric", "min": 50, "max": 400, "description": "Blood glucose level"}
-]
-
-# Global model instance
-model = None
+def on_model_swap(served):
+    """Publish load metrics and drop predictions made by the outgoing model"""
+    if metrics:
+        metrics.set_gauge("model_load_seconds", served.load_seconds)
+        metrics.set_gauge("model_loaded", 1)
+    if cache:
+        cache.invalidate(served.generation)
+
+# Owns the served model; reloads swap it atomically and keep the old one for rollback
+model_manager = ModelManager(
+    lambda: load_served_model(MODEL_ARTIFACT, MODEL_FILE, FEATURE_NAMES, SCORER_MODE, EXPLANATIONS_ENABLED),
+    warmup_rows(),
+    on_model_swap
+)
 
 def load_model():
-    """Load machine learning model from file"""
-    global model
-    try:
-        with open(MODEL_FILE, 'rb') as file:
-            model = pickle.load(file)
-        logger.info("Model loaded successfully")
-        return True
-    except FileNotFoundError:
-        logger.error(f"Model file not found: {MODEL_FILE}")
-    except Exception as e:
-        logger.exception("Model loading failed")
-    return False
+    """Load machine learning model, preferring the flat-array artifact over the pickle"""
+    return model_manager.load()
 
 def validate_input(data):
     """Validate input data against feature schema"""
-    errors = []
-    input_keys = set(data.keys())
-    expected_keys = {f["name"] for f in FEATURE_SCHEMA}
-    
-    # Check for missing features
-    if missing := expected_keys - input_keys:
-        errors.append(f"Missing features: {', '.join(sorted(missing))}")
-    
-    # Check for extra features
-    if extra := input_keys - expected_keys:
-        errors.append(f"Unexpected features: {', '.join(sorted(extra))}")
-    
-    # Validate individual features
-    for feature in FEATURE_SCHEMA:
-        name = feature["name"]
-        if name not in data:
-            continue
-            
-        try:
-            value = data[name]
-            if feature["type"] == "binary":
-                if value not in (0, 1):
-                    errors.append(f"'{name}' must be 0 or 1")
-            elif feature["type"] == "numeric":
-                num_value = float(value)
-                if "min" in feature and num_value < feature["min"]:
-                    errors.append(f"'{name}' value {num_value} below minimum {feature['min']}")
-                if "max" in feature and num_value > feature["max"]:
-                    errors.append(f"'{name}' value {num_value} above maximum {feature['max']}")
-        except (TypeError, ValueError):
-            errors.append(f"'{name}' has invalid numeric format")
-    
-    return errors
+    return validator.validate(data)[1]
+
+def validate_batch(records):
+    """Validate a list of records, returning a float feature matrix and per-row errors"""
+    return validator.validate_batch(records)
+
+def predict_labels(X):
+    """Predicted class for each row of a float matrix in FEATURE_SCHEMA order"""
+    return model_manager.current.predict_labels(X)
+
+def predict_probabilities(X):
+    """Positive-class probability for each row, or None if the model has no predict_proba"""
+    return model_manager.current.predict_probabilities(X)
+
+# Coalesces concurrent /predict calls into one scoring call when enabled
+batcher = MicroBatcher(predict_labels, BATCH_MAX_SIZE, BATCH_MAX_WAIT_US) if MICRO_BATCHING else None
+
+# Answers repeated /predict submissions without rescoring when enabled
+cache = PredictionCache(
+    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S, PREDICTION_CACHE_DECIMALS
+) if PREDICTION_CACHE_SIZE > 0 else None
+
+def explain_requested():
+    """True when the request asks for probabilities and per-feature contributions (?explain=true)"""
+    return request.args.get("explain", "").lower() in ("1", "true", "yes")
+
+def explanations_unavailable():
+    return jsonify({
+        "error": "Explanations Unavailable",
+        "message": "The loaded model has no explainer (needs an artifact exported with background data, "
+                   "a tree ensemble within MAX_EXPLAIN_CELLS, or EXPLANATIONS_ENABLED=1)"
+    }), 400
+
+class LineParseError:
+    """An NDJSON line that failed to parse, kept in the place of its record"""
+
+    def __init__(self, message):
+        self.message = message
+
+def parse_batch_payload():
+    """Read a batch of records from a JSON array or NDJSON request body
+
+    NDJSON lines that fail to parse are returned as LineParseError in place of
+    the record, so one bad line does not reject the rest of the batch.
+    """
+    if request.mimetype in NDJSON_CONTENT_TYPES:
+        records = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                records.append(LineParseError(f"Invalid JSON line: {e}"))
+        return records
+
+    payload = request.get_json(silent=True)
+    return payload if isinstance(payload, list) else None
+
+def read_payload(request_format, batch=False):
+    """Decode the request body according to its format
+
+    Returns (document, None) for JSON, NDJSON and MessagePack bodies and
+    (None, matrix) for fixed-layout records, where matrix is a read-only
+    view of the body itself. Raises ValueError for a malformed binary body.
+    """
+    if request_format == codec.RECORDS:
+        dtype = codec.record_dtype(request.mimetype_params)
+        return None, codec.decode_records(request.get_data(), dtype, len(FEATURE_NAMES))
+    if request_format == codec.MSGPACK:
+        document = codec.unpack(request.get_data())
+        return (document if isinstance(document, list) else None) if batch else document, None
+    return parse_batch_payload() if batch else request.get_json(), None
+
+def response_format(request_format):
+    """Response type from the Accept header, defaulting to the request body's own format"""
+    offered = sorted(codec.response_formats(), key=lambda f: f != request_format)
+    return request.accept_mimetypes.best_match(offered, default=request_format)
+
+def respond(body, output_format):
+    """Serialize a response document as JSON or MessagePack"""
+    if output_format == codec.MSGPACK:
+        return Response(codec.pack(body), mimetype=codec.MSGPACK)
+    return jsonify(body)
+
+def records_response(valid, predictions, probabilities, dtype):
+    """Packed per-record results (see src/serving/codec.py), with the rejected count in a header"""
+    response = Response(codec.encode_results(valid, predictions, probabilities, dtype), mimetype=codec.RECORDS)
+    response.headers["X-Rejected-Records"] = str(len(valid) - int(valid.sum()))
+    return response
+
+def msgpack_unavailable():
+    return jsonify({
+        "error": "Unsupported Media Type",
+        "message": "MessagePack bodies need the msgpack package on the server"
+    }), 415
+
+def invalid_payload(error):
+    return jsonify({
+        "error": "Invalid Request",
+        "message": str(error)
+    }), 400
+
+def explanations_not_acceptable():
+    return jsonify({
+        "error": "Not Acceptable",
+        "message": f"Explanations are returned as JSON or MessagePack, not {codec.RECORDS}"
+    }), 406
+
+# Load at import so WSGI servers (waitress-serve app:app) start with a model
+if LOAD_MODEL_ON_IMPORT:
+    logger.info("Starting %s v%s", SERVICE_NAME, API_VERSION)
+    if not load_model():
+        logger.critical("No model loaded at startup; prediction endpoints return 503 until a reload succeeds")
+if MODEL_WATCH_INTERVAL_S > 0:
+    model_manager.watch(model_watch_paths(MODEL_ARTIFACT, MODEL_FILE), MODEL_WATCH_INTERVAL_S)
+
+if metrics:
+    @app.after_request
+    def count_request(response):
+        """Count every response, and error responses by their error type"""
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.increment("http_requests_total", (("endpoint", endpoint), ("status", str(response.status_code))))
+        if response.status_code >= 400:
+            body = response.get_json(silent=True) if response.is_json else None
+            error_type = body.get("error") if isinstance(body, dict) else None
+            metrics.increment(
+                "http_errors_total", (("endpoint", endpoint), ("type", error_type or response.status))
+            )
+        return response
 
 @app.route('/', methods=['GET'])
 def home():
@@ -97,76 +237,136 @@ def home():
         "service": SERVICE_NAME,
         "version": API_VERSION,
         "status": "operational",
+        "content_types": list(codec.response_formats()),
         "endpoints": {
             "health_check": {"path": "/health", "method": "GET"},
-            "prediction": {"path": "/predict", "method": "POST"}
+            "prediction": {"path": "/predict", "method": "POST", "query": {"explain": "true"}},
+            "batch_prediction": {"path": "/predict/batch", "method": "POST", "query": {"explain": "true"}},
+            "metrics": {"path": "/metrics", "method": "GET"},
+            "model_status": {"path": "/admin/model", "method": "GET"},
+            "model_reload": {"path": "/admin/reload", "method": "POST"},
+            "model_rollback": {"path": "/admin/rollback", "method": "POST"}
         }
     })
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Service health monitoring endpoint"""
+    served = model_manager.current
     return jsonify({
         "service": SERVICE_NAME,
-        "status": "ready" if model else "degraded",
-        "model_loaded": bool(model),
-        "model_file": MODEL_FILE
+        "status": "ready" if served else "degraded",
+        "model_loaded": served is not None,
+        "model_file": served.source if served else MODEL_FILE,
+        "model_load_seconds": served.load_seconds if served else None,
+        "model_loaded_at": served.loaded_at if served else None,
+        "uptime_seconds": round(time.time() - started_at, 3),
+        "metrics_enabled": metrics is not None,
+        "micro_batching": batcher.stats() if batcher else None,
+        "prediction_cache": cache.stats() if cache else None
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text exposition of request, stage and batching metrics"""
+    if metrics is None:
+        return jsonify({
+            "error": "Not Found",
+            "message": "Metrics are disabled (METRICS_ENABLED=0)"
+        }), 404
+
+    if cache:
+        cache_stats = cache.stats()
+        for name in ("hits", "misses", "evictions", "expirations"):
+            metrics.set_gauge(f"prediction_cache_{name}_total", cache_stats[name])
+        metrics.set_gauge("prediction_cache_entries", cache_stats["size"])
+
+    text = metrics.render()
+    if batcher:
+        for name, snapshot in (
+            ("microbatch_size", batcher.batch_sizes.snapshot()),
+            ("microbatch_queue_wait_us", batcher.queue_wait_us.snapshot())
+        ):
+            text += f"# TYPE {name} histogram\n" + "\n".join(histogram_samples(name, snapshot)) + "\n"
+    return Response(text, mimetype="text/plain; version=0.0.4")
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Heart disease risk prediction endpoint"""
-    # Check model availability
-    if not model:
+    # Check model availability; the whole request is scored with the model live now
+    served = model_manager.current
+    if served is None:
         return jsonify({
             "error": "Service Unavailable",
             "message": "Prediction model not loaded"
         }), 503
     
+    clock = stage_clock("/predict")
+
     # Parse and validate input
-    if not (input_data := request.get_json()):
+    request_format = codec.body_format(request.mimetype)
+    if request_format == codec.MSGPACK and codec.msgpack is None:
+        return msgpack_unavailable()
+    try:
+        input_data, records = read_payload(request_format)
+    except ValueError as e:
+        return invalid_payload(e)
+    output_format = response_format(request_format)
+    clock.lap("parse")
+
+    if records is not None:
+        if len(records) != 1:
+            return jsonify({
+                "error": "Invalid Request",
+                "message": f"Expected exactly one record, got {len(records)}; send several to /predict/batch"
+            }), 400
+        errors = validator.validate_matrix(records)[1].get(0, [])
+        features = records[0]
+    elif not input_data:
         return jsonify({
             "error": "Invalid Request",
             "message": "No JSON payload provided"
         }), 400
-    
-    if errors := validate_input(input_data):
+    else:
+        features, errors = validator.validate(input_data)
+    clock.lap("validate")
+    if errors:
         return jsonify({
             "error": "Validation Error",
             "message": "Invalid input parameters",
             "details": errors,
-            "expected_features": [{
-                "name": f["name"],
-                "type": f["type"],
-                "description": f["description"],
-                "constraints": {
-                    "min": f.get("min"),
-                    "max": f.get("max")
-                }
-            } for f in FEATURE_SCHEMA]
+            "expected_features": expected_features()
         }), 400
+
+    if explain_requested():
+        if output_format == codec.RECORDS:
+            return explanations_not_acceptable()
+        return predict_explained(served, features, clock, output_format)
+    if output_format == codec.RECORDS:
+        return predict_records(served, features, clock)
     
     try:
-        # Prepare input for model
-        features = [input_data[f["name"]] for f in FEATURE_SCHEMA]
-        feature_names = [f["name"] for f in FEATURE_SCHEMA]
-        input_df = pd.DataFrame([features], columns=feature_names)
-        
-        # Make prediction
-        prediction = model.predict(input_df)[0]
-        risk_level = "High Risk" if prediction == 1 else "Low Risk"
+        # Make prediction, reusing the cached result for a repeated record
+        # Entries are tied to served's generation, so a swap mid-request neither serves nor stores stale results
+        prediction = None
+        if cache:
+            key = cache.key(features)
+            prediction = cache.get(key, served.generation)
+        if prediction is None:
+            if batcher:
+                prediction = batcher.predict(features, served.predict_labels)
+            else:
+                prediction = served.predict_labels(features.reshape(1, -1))[0]
+            if cache:
+                cache.put(key, prediction, served.generation)
+        clock.lap("predict")
+        body = prediction_body(prediction)
         
-        logger.info(f"Prediction completed - Risk: {risk_level}")
+        request_logger.info("Prediction completed - Risk: %s", body["risk_classification"])
         
-        return jsonify({
-            "prediction": int(prediction),
-            "risk_classification": risk_level,
-            "interpretation": (
-                "High risk indicates potential heart disease condition"
-                if prediction == 1 else
-                "Low risk indicates no significant heart disease indicators"
-            )
-        })
+        response = respond(body, output_format)
+        clock.lap("serialize")
+        return response
     
     except Exception as e:
         logger.exception("Prediction processing failed")
@@ -175,9 +375,212 @@ def predict():
             "message": "Could not process prediction request"
         }), 500
 
+def predict_records(served, features, clock):
+    """Prediction and probability for one validated record as a packed record result"""
+    try:
+        X = features.reshape(1, -1)
+        predictions = served.predict_labels(X)
+        probabilities = served.predict_probabilities(X)
+        clock.lap("predict")
+        request_logger.info("Prediction completed - Risk: %s", "High Risk" if predictions[0] == 1 else "Low Risk")
+        response = records_response(np.ones(1, dtype=bool), predictions, probabilities, features.dtype)
+        clock.lap("serialize")
+        return response
+
+    except Exception:
+        logger.exception("Prediction processing failed")
+        return jsonify({
+            "error": "Prediction Error",
+            "message": "Could not process prediction request"
+        }), 500
+
+def predict_explained(served, features, clock, output_format):
+    """Prediction plus probability and per-feature contributions for one validated record"""
+    if served.explainer is None:
+        return explanations_unavailable()
+    try:
+        X = features.reshape(1, -1)
+        prediction = served.predict_labels(X)[0]
+        probabilities = served.predict_probabilities(X)
+        clock.lap("predict")
+        base_value, contributions = served.explain(X)
+        clock.lap("explain")
+        body = prediction_body(prediction)
+        body.update(explanation_body(
+            probabilities[0] if probabilities is not None else None,
+            base_value, contributions[0], served.explainer.output_space
+        ))
+        request_logger.info("Explained prediction completed - Risk: %s", body["risk_classification"])
+        response = respond(body, output_format)
+        clock.lap("serialize")
+        return response
+
+    except Exception:
+        logger.exception("Explained prediction processing failed")
+        return jsonify({
+            "error": "Prediction Error",
+            "message": "Could not process prediction request"
+        }), 500
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Batch heart disease risk prediction endpoint
+
+    Accepts a JSON array of patient records, NDJSON (one record per line),
+    a MessagePack array or fixed-layout binary records. Rows that fail
+    validation are reported individually; the rest are scored together in
+    a single model call.
+    """
+    # Score the whole request with the model that is live now, even if a reload swaps it meanwhile
+    served = model_manager.current
+    if served is None:
+        return jsonify({
+            "error": "Service Unavailable",
+            "message": "Prediction model not loaded"
+        }), 503
+
+    request_format = codec.body_format(request.mimetype)
+    output_format = response_format(request_format)
+    explain = explain_requested()
+    if explain and served.explainer is None:
+        return explanations_unavailable()
+    if explain and output_format == codec.RECORDS:
+        return explanations_not_acceptable()
+    if request_format == codec.MSGPACK and codec.msgpack is None:
+        return msgpack_unavailable()
+
+    clock = stage_clock("/predict/batch")
+    try:
+        records, values = read_payload(request_format, batch=True)
+    except ValueError as e:
+        return invalid_payload(e)
+    clock.lap("parse")
+    n_records = len(values) if values is not None else len(records or ())
+    if not n_records:
+        return jsonify({
+            "error": "Invalid Request",
+            "message": "Expected a non-empty JSON array or NDJSON payload of records"
+        }), 400
+
+    if n_records > MAX_BATCH_SIZE:
+        return jsonify({
+            "error": "Payload Too Large",
+            "message": f"Batch size {n_records} exceeds limit of {MAX_BATCH_SIZE}"
+        }), 413
+
+    if values is not None:
+        # Binary records are validated in place, as the matrix they already are
+        valid, errors = validator.validate_matrix(values)
+    else:
+        # Lines that failed to parse are carried through as LineParseError
+        parse_errors = {i: r for i, r in enumerate(records) if isinstance(r, LineParseError)}
+        values, row_errors = validate_batch([{} if i in parse_errors else r for i, r in enumerate(records)])
+        for i, error in parse_errors.items():
+            row_errors[i] = [error.message]
+        valid = np.array([not e for e in row_errors], dtype=bool)
+        errors = {i: e for i, e in enumerate(row_errors) if e}
+    clock.lap("validate")
+
+    try:
+        predictions, probabilities = np.empty(0, dtype=np.int64), None
+        if valid.any():
+            X = values if valid.all() else values[valid]
+            predictions = served.predict_labels(X)
+            probabilities = served.predict_probabilities(X)
+            clock.lap("predict")
+            if explain:
+                base_value, contributions = served.explain(X)
+                clock.lap("explain")
+        if output_format != codec.RECORDS:
+            results = [None] * n_records
+            for i, e in errors.items():
+                results[i] = {"index": i, "error": "Validation Error", "details": e}
+            for k, i in enumerate(np.flatnonzero(valid)):
+                prediction = int(predictions[k])
+                results[i] = {
+                    "index": int(i),
+                    "prediction": prediction,
+                    "risk_classification": "High Risk" if prediction == 1 else "Low Risk"
+                }
+                if probabilities is not None:
+                    results[i]["probability"] = float(probabilities[k])
+                if explain:
+                    results[i].update(explanation_body(
+                        probabilities[k] if probabilities is not None else None,
+                        base_value, contributions[k], served.explainer.output_space
+                    ))
+    except Exception:
+        logger.exception("Batch prediction processing failed")
+        return jsonify({
+            "error": "Prediction Error",
+            "message": "Could not process batch prediction request"
+        }), 500
+
+    n_valid = int(valid.sum())
+    request_logger.info("Batch prediction completed - %d scored, %d rejected", n_valid, n_records - n_valid)
+    if metrics:
+        metrics.increment("prediction_rows_total", (("outcome", "scored"),), n_valid)
+        metrics.increment("prediction_rows_total", (("outcome", "rejected"),), n_records - n_valid)
+
+    if output_format == codec.RECORDS:
+        response = records_response(valid, predictions, probabilities, values.dtype)
+    else:
+        response = respond({
+            "count": n_records,
+            "scored": n_valid,
+            "rejected": n_records - n_valid,
+            "results": results
+        }, output_format)
+    clock.lap("serialize")
+    return response
+
+def admin_denied():
+    """Error response unless the request carries the configured ADMIN_TOKEN"""
+    if not ADMIN_TOKEN:
+        return jsonify({
+            "error": "Forbidden",
+            "message": "Admin endpoints are disabled (set ADMIN_TOKEN to enable)"
+        }), 403
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        return jsonify({
+            "error": "Unauthorized",
+            "message": "Missing or invalid X-Admin-Token header"
+        }), 401
+    return None
+
+@app.route('/admin/model', methods=['GET'])
+def model_status():
+    """Current and previous model, plus the outcome of the last reload"""
+    if denied := admin_denied():
+        return denied
+    return jsonify(model_manager.status())
+
+@app.route('/admin/reload', methods=['POST'])
+def reload_model():
+    """Load, warm and swap in the model files on disk in the background"""
+    if denied := admin_denied():
+        return denied
+    if not model_manager.reload_async():
+        return jsonify({
+            "error": "Conflict",
+            "message": "A model reload is already in progress"
+        }), 409
+    return jsonify({"status": "reloading", "model": model_manager.status()}), 202
+
+@app.route('/admin/rollback', methods=['POST'])
+def rollback_model():
+    """Swap the previously served model back in"""
+    if denied := admin_denied():
+        return denied
+    if not model_manager.rollback():
+        return jsonify({
+            "error": "Conflict",
+            "message": "No previous model to roll back to"
+        }), 409
+    return jsonify({"status": "rolled back", "model": model_manager.status()})
+
 if __name__ == "__main__":
-    logger.info(f"Starting {SERVICE_NAME} v{API_VERSION}")
-    if load_model():
+    if model_manager.current is not None or load_model():
         logger.info("Service starting on port 8000")
         app.run(host='0.0.0.0', port=8000)
     else:
@@ -0,0 +1,258 @@
+"""
+Asynchronous (ASGI) variant of the prediction API.
+
+Serves the same /, /health and /predict routes as app.py, with the same
+FEATURE_SCHEMA validation and response bodies, as a plain ASGI application
+with no web framework. Run it under any ASGI server, e.g.
+
+    pip install uvicorn
+    uvicorn asgi:app --port 8000
+
+The event loop only parses requests and writes responses; validation and
+scoring run on a bounded thread pool. Requests beyond the pool size wait in
+a bounded queue. When that queue is full the service answers 429 at once,
+and a request that waited longer than QUEUE_TIMEOUT_S gets 503. Both carry
+a Retry-After header, so latency stays bounded under bursts instead of
+growing with the backlog.
+"""
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.logging_queue import enable_queue_logging
+from src.serving.lifecycle import ModelManager, load_served_model
+from src.serving.schema import FEATURE_NAMES, FEATURE_SCHEMA, expected_features, prediction_body, warmup_rows
+from src.serving.validator import SchemaValidator
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger(__name__)
+# A blocking handler would stall the event loop, not just one worker thread
+if os.environ.get("LOG_QUEUE", "1") == "1":
+    enable_queue_logging()
+
+MODEL_FILE = 'best_model.pkl'
+MODEL_ARTIFACT = os.environ.get("MODEL_ARTIFACT", "best_model.artifact")
+SCORER_MODE = os.environ.get("SCORER_MODE", "compiled")
+SERVICE_NAME = "Heart Disease Prediction API"
+API_VERSION = "1.0.0"
+SCORING_THREADS = int(os.environ.get("SCORING_THREADS", os.cpu_count() or 1))
+MAX_QUEUED_REQUESTS = int(os.environ.get("MAX_QUEUED_REQUESTS", "64"))
+QUEUE_TIMEOUT_S = float(os.environ.get("QUEUE_TIMEOUT_S", "1.0"))
+RETRY_AFTER_S = int(os.environ.get("RETRY_AFTER_S", "1"))
+LOAD_MODEL_ON_IMPORT = os.environ.get("LOAD_MODEL_ON_IMPORT", "1") == "1"
+MAX_BODY_BYTES = 64 * 1024
+
+validator = SchemaValidator(FEATURE_SCHEMA)
+model_manager = ModelManager(
+    lambda: load_served_model(MODEL_ARTIFACT, MODEL_FILE, FEATURE_NAMES, SCORER_MODE),
+    warmup_rows()
+)
+
+
+class AdmissionControl:
+    """
+    Bounds the number of requests waiting for or running on the scoring pool.
+
+    A request takes its slot with admit() before anything is awaited for it,
+    reading its body included, and gives it back with release() when it is
+    done. Only used from the event loop thread, so plain counters are enough.
+    """
+
+    def __init__(self, threads, max_queued, queue_timeout_s):
+        self.threads = threads
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="scoring")
+        self.slots = asyncio.Semaphore(threads)
+        self.capacity = threads + max_queued
+        self.queue_timeout_s = queue_timeout_s
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def admit(self):
+        """Take a slot for one request; False (and counted as rejected) when all are taken"""
+        if self.admitted >= self.capacity:
+            self.rejected += 1
+            return False
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.admitted -= 1
+
+    async def run(self, fn, *args):
+        """
+        Run fn(*args) on the pool for an admitted request; raises
+        asyncio.TimeoutError if no thread frees up in time.
+        """
+        await asyncio.wait_for(self.slots.acquire(), self.queue_timeout_s)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.slots.release()
+
+    def stats(self):
+        return {
+            "scoring_threads": self.threads,
+            "capacity": self.capacity,
+            "in_flight": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out
+        }
+
+
+admission = AdmissionControl(SCORING_THREADS, MAX_QUEUED_REQUESTS, QUEUE_TIMEOUT_S)
+
+# Load at import, like app.py, so servers without lifespan support also start with a model
+if LOAD_MODEL_ON_IMPORT:
+    logger.info("Starting %s v%s (ASGI)", SERVICE_NAME, API_VERSION)
+    if not model_manager.load():
+        logger.critical("No model loaded at startup; /predict returns 503 until one loads")
+
+
+def score(input_data):
+    """Validate one record and score it; runs on the scoring pool"""
+    features, errors = validator.validate(input_data)
+    if errors:
+        return 400, {
+            "error": "Validation Error",
+            "message": "Invalid input parameters",
+            "details": errors,
+            "expected_features": expected_features()
+        }
+    served = model_manager.current
+    return 200, prediction_body(served.predict_labels(features.reshape(1, -1))[0])
+
+
+async def send_json(send, status, body, headers=()):
+    payload = json.dumps(body).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+            *headers
+        ]
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+def shed(status, error, message):
+    """Load-shedding response asking the client to retry later"""
+    return status, {"error": error, "message": message}, [(b"retry-after", str(RETRY_AFTER_S).encode())]
+
+
+async def read_body(receive):
+    """Request body, or None when it exceeds MAX_BODY_BYTES"""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def home():
+    return 200, {
+        "service": SERVICE_NAME,
+        "version": API_VERSION,
+        "status": "operational",
+        "endpoints": {
+            "health_check": {"path": "/health", "method": "GET"},
+            "prediction": {"path": "/predict", "method": "POST"}
+        }
+    }, []
+
+
+def health_check():
+    served = model_manager.current
+    return 200, {
+        "service": SERVICE_NAME,
+        "status": "ready" if served else "degraded",
+        "model_loaded": served is not None,
+        "model_file": served.source if served else MODEL_FILE,
+        "model_load_seconds": served.load_seconds if served else None,
+        "model_loaded_at": served.loaded_at if served else None,
+        "admission": admission.stats()
+    }, []
+
+
+async def predict(receive):
+    if model_manager.current is None:
+        return shed(503, "Service Unavailable", "Prediction model not loaded")
+    # Admit before the first await, so requests still sending their bodies count against capacity
+    if not admission.admit():
+        return shed(429, "Too Many Requests", "Prediction queue is full, retry later")
+    try:
+        return await predict_admitted(receive)
+    finally:
+        admission.release()
+
+
+async def predict_admitted(receive):
+    body = await read_body(receive)
+    if body is None:
+        return 413, {"error": "Payload Too Large", "message": f"Request body exceeds {MAX_BODY_BYTES} bytes"}, []
+    try:
+        input_data = json.loads(body) if body else None
+    except ValueError:
+        input_data = None
+    if not input_data:
+        return 400, {"error": "Invalid Request", "message": "No JSON payload provided"}, []
+
+    try:
+        status, response = await admission.run(score, input_data)
+    except asyncio.TimeoutError:
+        admission.timed_out += 1
+        return shed(503, "Service Unavailable", "Prediction queue wait exceeded, retry later")
+    except Exception:
+        logger.exception("Prediction processing failed")
+        return 500, {"error": "Prediction Error", "message": "Could not process prediction request"}, []
+
+    if status == 200:
+        logger.info("Prediction completed - Risk: %s", response["risk_classification"])
+    return status, response, []
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            admission.executor.shutdown(wait=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    route = (scope["method"], scope["path"])
+    if route == ("GET", "/"):
+        status, body, headers = home()
+    elif route == ("GET", "/health"):
+        status, body, headers = health_check()
+    elif route == ("POST", "/predict"):
+        status, body, headers = await predict(receive)
+    elif scope["path"] in ("/", "/health", "/predict"):
+        status, body, headers = 405, {"error": "Method Not Allowed", "message": f"{scope['method']} not allowed"}, []
+    else:
+        status, body, headers = 404, {"error": "Not Found", "message": f"No route for {scope['path']}"}, []
+
+    await send_json(send, status, body, headers)
@@ -0,0 +1,261 @@
+"""
+Latency and throughput benchmark for the prediction service.
+
+Drives app.py in-process through the Flask test client and over real HTTP
+against a waitress server started as a separate process, with synthetic patients
+drawn from FEATURE_SCHEMA ranges. For each transport it runs:
+
+- single:     sequential /predict calls
+- batch:      /predict/batch calls of --batch-size records
+- concurrent: /predict calls from --threads threads at once (HTTP only)
+
+and reports p50/p95/p99 latency and requests/s (plus rows/s for batches).
+Results are written as JSON; pass --baseline with an earlier result file to
+print the change per metric and exit non-zero when a p99 latency regressed
+by more than --tolerance.
+
+    python benchmarks/serving.py --output bench.json
+    python benchmarks/serving.py --baseline bench.json --output bench_new.json
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def synthetic_patients(schema, n, seed=0):
+    """n random, valid patient records drawn uniformly from the schema ranges"""
+    rng = random.Random(seed)
+    patients = []
+    for _ in range(n):
+        patient = {}
+        for feature in schema:
+            if feature["type"] == "binary":
+                patient[feature["name"]] = rng.randint(0, 1)
+            else:
+                patient[feature["name"]] = round(rng.uniform(feature["min"], feature["max"]), 2)
+        patients.append(patient)
+    return patients
+
+
+def latency_summary(latencies, elapsed, rows_per_request=1):
+    """Percentiles in milliseconds plus request and row throughput"""
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "requests": len(ordered),
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "requests_per_s": len(ordered) / elapsed,
+        "rows_per_s": len(ordered) * rows_per_request / elapsed
+    }
+
+
+class TestClientTransport:
+    """Posts JSON through the Flask test client, with no network in between"""
+
+    name = "in_process"
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self._local = threading.local()
+
+    def post(self, path, payload):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.flask_app.test_client()
+        response = client.post(path, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)}")
+
+
+class HttpTransport:
+    """Posts JSON over keep-alive HTTP connections, one per thread"""
+
+    name = "http"
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._local = threading.local()
+
+    def post(self, path, payload):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port)
+        body = json.dumps(payload)
+        connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        data = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}: {data[:200]!r}")
+
+
+def run_sequential(transport, path, payloads, rows_per_request=1):
+    latencies = []
+    started = time.perf_counter()
+    for payload in payloads:
+        t0 = time.perf_counter()
+        transport.post(path, payload)
+        latencies.append(time.perf_counter() - t0)
+    return latency_summary(latencies, time.perf_counter() - started, rows_per_request)
+
+
+def run_concurrent(transport, path, payloads, threads):
+    def timed(payload):
+        t0 = time.perf_counter()
+        transport.post(path, payload)
+        return time.perf_counter() - t0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        latencies = list(pool.map(timed, payloads))
+    return latency_summary(latencies, time.perf_counter() - started)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_waitress(port, threads, timeout=60.0):
+    """Serve app:app with waitress in its own process and wait until the model is loaded"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "waitress", f"--listen=127.0.0.1:{port}", f"--threads={threads}", "app:app"],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"waitress exited with code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if json.loads(connection.getresponse().read()).get("model_loaded"):
+                return server
+        except OSError:
+            pass
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"waitress did not become healthy within {timeout:.0f}s")
+
+
+def run_workloads(transport, patients, args, concurrent=True):
+    batches = [patients[i:i + args.batch_size] for i in range(0, len(patients), args.batch_size)]
+    warmup = patients[:min(50, len(patients))]
+    run_sequential(transport, "/predict", warmup)
+
+    results = {
+        "single": run_sequential(transport, "/predict", patients[:args.requests]),
+        "batch": run_sequential(transport, "/predict/batch", batches[:args.batch_requests], args.batch_size)
+    }
+    if concurrent:
+        results["concurrent"] = run_concurrent(transport, "/predict", patients[:args.requests], args.threads)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print per-metric changes against a baseline; return True if any p99 regressed"""
+    regressed = False
+    for transport, workloads in results["results"].items():
+        for workload, metrics in workloads.items():
+            before = baseline.get("results", {}).get(transport, {}).get(workload)
+            if not before:
+                continue
+            for metric in ("p50_ms", "p99_ms", "requests_per_s"):
+                change = (metrics[metric] - before[metric]) / before[metric]
+                print(f"{transport}/{workload} {metric}: {before[metric]:.3f} -> {metrics[metric]:.3f} ({change:+.1%})")
+                if metric == "p99_ms" and change > tolerance:
+                    regressed = True
+    return regressed
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and throughput benchmark for app.py")
+    parser.add_argument("--requests", type=int, default=2000, help="Single and concurrent requests per run")
+    parser.add_argument("--batch-size", type=int, default=500, help="Records per /predict/batch request")
+    parser.add_argument("--batch-requests", type=int, default=20, help="/predict/batch requests per run")
+    parser.add_argument("--threads", type=int, default=8, help="Client threads for the concurrent workload")
+    parser.add_argument("--server-threads", type=int, default=8, help="waitress worker threads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed p99 regression (fraction)")
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT)
+    import logging
+    logging.disable(logging.INFO)
+    import app
+
+    if app.model_manager.current is None:
+        sys.exit("Model could not be loaded")
+
+    n_patients = max(args.requests, args.batch_size * args.batch_requests)
+    patients = synthetic_patients(app.FEATURE_SCHEMA, n_patients, args.seed)
+
+    results = {"in_process": run_workloads(TestClientTransport(app.app), patients, args, concurrent=False)}
+    port = free_port()
+    server = start_waitress(port, args.server_threads)
+    try:
+        results["http"] = run_workloads(HttpTransport("127.0.0.1", port), patients, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": vars(args),
+        "results": results
+    }
+
+    for transport, workloads in results.items():
+        for workload, metrics in workloads.items():
+            print(f"{transport:>10} {workload:>10}: p50 {metrics['p50_ms']:.2f} ms  p95 {metrics['p95_ms']:.2f} ms  "
+                  f"p99 {metrics['p99_ms']:.2f} ms  {metrics['requests_per_s']:.0f} req/s  "
+                  f"{metrics['rows_per_s']:.0f} rows/s")
+
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(report, file_obj, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file_obj:
+            if compare(report, json.load(file_obj), args.tolerance):
+                sys.exit(f"p99 latency regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Startup benchmark for the serving and training entry points.
+
+For each target module it runs a fresh interpreter with `python -X importtime`
+and reports the total import time plus the slowest modules, and for the
+serving app it also measures wall time from process launch to the first
+successful /predict response. Results are printed and optionally written as
+JSON so runs can be compared.
+
+    python benchmarks/startup.py --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_TARGETS = [
+    "app",
+    "src.components.data_ingestion",
+    "src.components.data_transformation",
+    "src.components.model_trainer",
+]
+
+SAMPLE_PATIENT = {
+    "male": 1, "age": 39, "education": 4, "currentsmoker": 0, "cigsperday": 0,
+    "bpmeds": 0, "prevalentstroke": 0, "prevalenthyp": 0, "diabetes": 0,
+    "totchol": 195, "bmi": 26.97, "heartrate": 80, "glucose": 77
+}
+
+FIRST_PREDICTION_SCRIPT = f"""
+import app
+assert app.model_manager.current is not None
+response = app.app.test_client().post('/predict', json={SAMPLE_PATIENT!r})
+assert response.status_code == 200, response.get_json()
+"""
+
+
+def _run(args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def import_profile(module, top=10):
+    """Total import time of module in a fresh interpreter and its slowest imports"""
+    stderr = _run(["-X", "importtime", "-c", f"import {module}"]).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    return {
+        "total_ms": sum(self_us for _, self_us, _ in entries) / 1000,
+        "modules_imported": len(entries),
+        "slowest": [
+            {"module": name, "self_ms": self_us / 1000, "cumulative_ms": cumulative_us / 1000}
+            for name, self_us, cumulative_us in sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+        ]
+    }
+
+
+def time_to_first_prediction():
+    """Seconds from interpreter launch to the first /predict response"""
+    started = time.perf_counter()
+    _run(["-c", FIRST_PREDICTION_SCRIPT])
+    return time.perf_counter() - started
+
+
+def summarize(samples):
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "samples": samples
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    results = {"python": sys.version.split()[0], "repeat": args.repeat, "imports": {}}
+    for module in IMPORT_TARGETS:
+        profiles = [import_profile(module) for _ in range(args.repeat)]
+        results["imports"][module] = {
+            "total_ms": summarize([p["total_ms"] for p in profiles]),
+            "modules_imported": profiles[-1]["modules_imported"],
+            "slowest": profiles[-1]["slowest"]
+        }
+        print(f"import {module}: {results['imports'][module]['total_ms']['median']:.1f} ms "
+              f"({profiles[-1]['modules_imported']} modules)")
+
+    ttfp = [time_to_first_prediction() for _ in range(args.repeat)]
+    results["time_to_first_prediction_s"] = summarize(ttfp)
+    print(f"time to first prediction: {statistics.median(ttfp):.3f} s")
+
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(results, file_obj, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
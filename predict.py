@@ -1,7 +1,42 @@
+"""
+Client library for the prediction API served by app.py.
+
+    from predict import PredictionClient
+
+    with PredictionClient("http://localhost:8000", max_in_flight=8) as client:
+        client.predict(patient)                  # one record, POST /predict
+        results = client.predict_many(patients)  # any number, chunked into /predict/batch
+        predictions, probabilities = client.predict_matrix(X)  # binary records, FEATURE_SCHEMA order
+        print(client.stats())
+
+One client holds a keep-alive connection pool and can be shared between
+threads. Large patient lists are split into batch_size chunks; at most
+max_in_flight chunks are outstanding at once and results come back in input
+order. 429 and 503 answers (overload, model not loaded yet) and connection
+errors are retried with exponential backoff, waiting at least as long as the
+server's Retry-After. Every call is timed; stats() summarizes the latencies.
+
+The client depends on requests only (numpy for predict_matrix), not on the
+server's code, so this file can be copied on its own.
+
+Running this file scores one example patient against a local server.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 
+RETRY_STATUSES = (429, 503)
 
-url = 'http://localhost:8000/predict'
+# Binary record format (src/serving/codec.py on the server): little-endian float
+# rows in, one packed (int8 prediction, float probability) result per row out
+RECORDS = "application/octet-stream"
+REJECTED = -1
 
 patient_values={
     "male": 1.0,
@@ -19,5 +54,217 @@ patient_values={
     "glucose": 77.0,
 }
 
-response=requests.post(url,json=patient_values).json()
-print(response)
+# FEATURE_SCHEMA order, the column order of predict_matrix's X
+FEATURE_NAMES = list(patient_values)
+
+
+class PredictionError(Exception):
+    """A request the server refused, or one that still failed after every retry"""
+
+    def __init__(self, message, status=None, body=None):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class LatencyStats:
+    """Thread-safe call counts and the latencies of the most recent calls"""
+
+    def __init__(self, window=10_000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def record(self, seconds, retries, failed):
+        with self.lock:
+            self.latencies.append(seconds)
+            self.requests += 1
+            self.retries += retries
+            self.failures += failed
+
+    def summary(self):
+        """Counts plus p50/p95/p99/mean latency in milliseconds over the recent window"""
+        with self.lock:
+            ordered = sorted(self.latencies)
+            counts = {"requests": self.requests, "retries": self.retries, "failures": self.failures}
+        if not ordered:
+            return counts
+
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+        return {
+            **counts,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "mean_ms": sum(ordered) / len(ordered) * 1000
+        }
+
+
+class PredictionClient:
+    """
+    Pooled, retrying client for /predict and /predict/batch.
+
+    Latencies cover the whole call including retries and backoff, as seen by
+    the caller; retries are also counted on their own.
+    """
+
+    def __init__(self, base_url="http://localhost:8000", batch_size=1000, max_in_flight=4,
+                 max_retries=5, backoff_s=0.05, max_backoff_s=5.0, timeout_s=30.0):
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.timeout_s = timeout_s
+        self.latency = LatencyStats()
+
+        # One pooled connection per concurrent chunk, reused across calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def stats(self):
+        return self.latency.summary()
+
+    def predict(self, record, explain=False):
+        """Response body of /predict for one patient record"""
+        return self._post("/predict", explain, json=record).json()
+
+    def predict_many(self, records, explain=False):
+        """One /predict/batch result per record, in input order, with indexes into records"""
+        return list(self.iter_predictions(records, explain))
+
+    def iter_predictions(self, records, explain=False):
+        """Like predict_many, but yields results as their chunks complete so memory stays bounded"""
+        def score(chunk, offset):
+            results = self._post("/predict/batch", explain, json=chunk).json()["results"]
+            for result in results:
+                result["index"] += offset
+            return results
+
+        for results in self._map_chunks(score, records):
+            yield from results
+
+    def predict_matrix(self, X, dtype="float64"):
+        """
+        Score a float matrix with FEATURE_NAMES columns as binary records.
+
+        Returns (predictions, probabilities) arrays; rejected rows have
+        prediction REJECTED and a NaN probability, as does every row of a
+        model without probabilities. dtype is float64 or float32.
+        """
+        import numpy as np
+
+        dtype = np.dtype(dtype).newbyteorder("<")
+        X = np.asarray(X, dtype=dtype)
+        if X.ndim != 2 or X.shape[1] != len(FEATURE_NAMES):
+            raise ValueError(f"Expected a (rows, {len(FEATURE_NAMES)}) matrix, got shape {X.shape}")
+        headers = {"Content-Type": f"{RECORDS}; dtype={dtype.name}", "Accept": RECORDS}
+        result_dtype = np.dtype([("prediction", "i1"), ("probability", dtype)])
+
+        def score(chunk, offset):
+            response = self._post("/predict/batch", False, data=chunk.tobytes(), headers=headers)
+            return np.frombuffer(response.content, dtype=result_dtype)
+
+        results = np.concatenate(list(self._map_chunks(score, X))) if len(X) else np.empty(0, dtype=result_dtype)
+        return results["prediction"], results["probability"]
+
+    def _map_chunks(self, score, rows):
+        """Yield score(chunk, offset) for batch_size chunks of rows in order, max_in_flight at a time"""
+        chunks = ((rows[i:i + self.batch_size], i) for i in range(0, len(rows), self.batch_size))
+        if self.max_in_flight == 1:
+            for chunk, offset in chunks:
+                yield score(chunk, offset)
+            return
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_in_flight, thread_name_prefix="prediction-client")
+        pending = deque()
+        try:
+            for chunk, offset in chunks:
+                pending.append(self._executor.submit(score, chunk, offset))
+                if len(pending) >= self.max_in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _post(self, path, explain, **kwargs):
+        """POST with retries on RETRY_STATUSES and connection errors; raises PredictionError on failure"""
+        url = self.base_url + path
+        params = {"explain": "true"} if explain else None
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = self.session.post(url, params=params, timeout=self.timeout_s, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = PredictionError(f"POST {path} failed: {e}")
+            else:
+                if response.status_code == 200:
+                    self.latency.record(time.perf_counter() - started, attempt, False)
+                    return response
+                error = PredictionError(
+                    f"POST {path} returned {response.status_code}: {response.text[:200]}",
+                    response.status_code, _error_body(response)
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    self.latency.record(time.perf_counter() - started, attempt, True)
+                    raise error
+                retry_after = _retry_after(response)
+
+            if attempt >= self.max_retries:
+                self.latency.record(time.perf_counter() - started, attempt, True)
+                raise error
+            # Exponential backoff with jitter, never sooner than the server asked
+            delay = min(self.max_backoff_s, self.backoff_s * 2 ** attempt) * random.uniform(0.5, 1.0)
+            time.sleep(max(delay, retry_after or 0.0))
+            attempt += 1
+
+
+def _retry_after(response):
+    """Retry-After in seconds, when the server sent one as a number"""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _error_body(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score an example patient against a running API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    args = parser.parse_args()
+
+    with PredictionClient(args.url) as client:
+        response = client.predict(patient_values)
+        print(response)
@@ -2,30 +2,43 @@ import os
 import sys
 from dataclasses import dataclass
 import pandas as pd
-from sklearn.model_selection import train_test_split
 from src.exception import CustomException
 from src.logger import logging
-from src.components.data_transformation import DataTransformationConfig
-from src.components.data_transformation import DataTransformation
-from src.components.model_trainer import ModelTrainer
-from src.components.model_trainer import  ModelTrainerConfig
+from src.utils import ChunkWriter
 
 @dataclass
 class DataIngestionConfig:
     # Paths for storing the data
     train_data_path: str = os.path.join("artifacts", 'train.csv')
     test_data_path: str = os.path.join("artifacts", 'test.csv')
+    val_data_path: str = os.path.join("artifacts", 'val.csv')
     raw_data_path: str = os.path.join("artifacts", 'data.csv')
+    # Source dataset and how to read it
+    source_data_path: str = os.path.join("notebook", "Data", "framingham.csv")
+    streaming: bool = False
+    chunk_size: int = 100_000
+    # "csv" or "parquet" (parquet needs pyarrow); streaming mode only
+    output_format: str = "csv"
+    save_raw_data: bool = True
+    # Streaming split fractions and the salt for the row hash that assigns splits
+    test_fraction: float = 0.20
+    val_fraction: float = 0.20
+    split_seed: int = 1
 
 class DataIngestion:
     def __init__(self):
         self.ingestion_config = DataIngestionConfig()
 
     def initiate_data_ingestion(self):
+        if self.ingestion_config.streaming:
+            return self.initiate_streaming_ingestion()
+
         logging.info("Started data ingestion process.")
         try:
+            from sklearn.model_selection import train_test_split
+
             # Read the raw data
-            df = pd.read_csv(r'D:\Projects\Heart-Disease-Prediction\Heart--Disease-Prediction\notebook\Data\framingham.csv')
+            df = pd.read_csv(self.ingestion_config.source_data_path)
             logging.info("Read the dataset as a DataFrame.")
     
 
@@ -54,17 +67,69 @@ class DataIngestion:
             logging.error(f"Error occurred during data ingestion: {str(e)}")
             raise CustomException(e, sys)
 
+    def initiate_streaming_ingestion(self):
+        """
+        Split the source file into train/val/test without loading it whole.
+
+        The source is read in chunks of chunk_size rows. Each row goes to a
+        split by a salted hash of its values, so the assignment is reproducible
+        and independent of chunking or row order, and each chunk is appended
+        to its split files before the next one is read. Peak memory is bounded
+        by the chunk size, not the input size.
+        """
+        config = self.ingestion_config
+        logging.info(f"Started streaming data ingestion from {config.source_data_path}.")
+        try:
+            paths = {
+                "train": config.train_data_path,
+                "val": config.val_data_path,
+                "test": config.test_data_path,
+                "raw": config.raw_data_path
+            }
+            if config.output_format == "parquet":
+                paths = {split: os.path.splitext(path)[0] + ".parquet" for split, path in paths.items()}
+            os.makedirs(os.path.dirname(paths["train"]), exist_ok=True)
+
+            writers = {split: ChunkWriter(path, config.output_format) for split, path in paths.items()}
+            if not config.save_raw_data:
+                del writers["raw"]
+
+            hash_key = f"{config.split_seed:016d}"[-16:]
+            try:
+                for chunk in pd.read_csv(config.source_data_path, chunksize=config.chunk_size):
+                    # Dtype inference differs per chunk (a column with NaNs turns float), so
+                    # widen numeric columns to float64 to keep row hashes and file schemas stable
+                    numeric_columns = chunk.select_dtypes("number").columns
+                    chunk = chunk.astype(dict.fromkeys(numeric_columns, "float64"))
+
+                    # Map each row's hash to [0, 1): test first, then validation, the rest is train
+                    position = pd.util.hash_pandas_object(chunk, index=False, hash_key=hash_key).to_numpy() / 2.0**64
+                    is_test = position < config.test_fraction
+                    is_val = ~is_test & (position < config.test_fraction + config.val_fraction)
+
+                    writers["test"].write(chunk[is_test])
+                    writers["val"].write(chunk[is_val])
+                    writers["train"].write(chunk[~is_test & ~is_val])
+                    if "raw" in writers:
+                        writers["raw"].write(chunk)
+            finally:
+                for writer in writers.values():
+                    writer.close()
+
+            logging.info(
+                f"Data split into train ({writers['train'].rows}), validation ({writers['val'].rows}), "
+                f"and test ({writers['test'].rows}) sets."
+            )
+            logging.info("Streaming data ingestion completed successfully.")
+
+            return paths["train"], paths["test"]
+
+        except Exception as e:
+            logging.error(f"Error occurred during streaming data ingestion: {str(e)}")
+            raise CustomException(e, sys)
+
 if __name__ == '__main__':
-    # Data Ingestion
-    obj = DataIngestion()
-    train_data_path, test_data_path = obj.initiate_data_ingestion()
-
-    # Data Transformation
-    data_transformation = DataTransformation()
-    train_arr, test_arr, preprocessor_path = data_transformation.initiate_data_transformation(
-        train_data_path, test_data_path
-    )
-    logging.info("Data transformation completed successfully.")
-
-    modeltrainer=ModelTrainer()
-    print(modeltrainer.initiate_model_trainer(train_arr,test_arr))
+    # Ingestion, transformation and model search as a resumable stage graph
+    from src.pipeline.train_pipeline import TrainPipeline
+
+    print(TrainPipeline().initiate_training())
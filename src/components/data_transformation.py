@@ -1,28 +1,45 @@
+import shutil
 import sys
 from dataclasses import dataclass
 import numpy as np
 import pandas as pd
-from sklearn.compose import ColumnTransformer
-from sklearn.impute import SimpleImputer
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.feature_extraction import DictVectorizer
 from src.exception import CustomException
 from src.logger import logging
 import os
-from src.utils import saved_obj, evaluate_models
+from src.utils import compute_fingerprint, saved_obj
+
+# Bump when the cached array layout changes so stale caches are not reused
+TRANSFORM_CACHE_VERSION = 1
+CACHED_ARRAYS = ("X_train", "y_train", "X_test", "y_test")
+
+
+def read_table(path):
+    """Read a CSV or (by extension) Parquet split written by DataIngestion"""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
 
 
 @dataclass
 class DataTransformationConfig:
     preprocessor_obj_file_path = os.path.join('artifacts', "preprocessor.pkl")
     dict_vectorizer_obj_file_path = os.path.join('artifacts', "dict_vectorizer.pkl")
+    # Transformed arrays keyed by a fingerprint of the inputs, preprocessor config and
+    # scikit-learn version; only the most recently used max_cache_entries are kept
+    cache_dir = os.path.join('artifacts', "transform_cache")
+    use_cache = True
+    max_cache_entries = 4
 class DataTransformation:
     def __init__(self):
         self.data_transformation_config = DataTransformationConfig()
 
     def get_data_transformer_object(self):
         try:
+            from sklearn.compose import ColumnTransformer
+            from sklearn.impute import SimpleImputer
+            from sklearn.pipeline import Pipeline
+            from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
             numerical_columns = ['age', 'education', 'cigsperday', 'totchol', 'bmi', 'heartrate', 'glucose']
             categorical_columns = ['male', 'currentsmoker', 'bpmeds', 'prevalentstroke', 'prevalenthyp', 'diabetes']
 
@@ -52,10 +69,38 @@ class DataTransformation:
             raise CustomException(e, sys)
 
     def initiate_data_transformation(self, train_path, test_path):
+        """
+        Fit the preprocessor on the train split and transform both splits.
+
+        Returns (X_train, y_train, X_test, y_test, preprocessor_path). Results
+        are cached as .npy files under a fingerprint of the input files, the
+        preprocessor config and the scikit-learn version (the cached
+        preprocessor is a pickle); a repeat run with unchanged inputs
+        memory-maps them instead of parsing the CSVs and refitting.
+        """
         try:
+            import sklearn
+
+            preprocessing_obj = self.get_data_transformer_object()
+            config = self.data_transformation_config
+            fingerprint = compute_fingerprint(
+                train_path, test_path,
+                extra=f"v{TRANSFORM_CACHE_VERSION}:sklearn {sklearn.__version__}:"
+                      f"{sorted(preprocessing_obj.get_params(deep=True).items())!r}"
+            )
+            cache_path = os.path.join(config.cache_dir, fingerprint)
+
+            if config.use_cache and os.path.isdir(cache_path):
+                logging.info(f"Reusing cached transformation {fingerprint[:12]}")
+                # Mark it recently used, so pruning keeps it
+                os.utime(cache_path)
+                shutil.copyfile(os.path.join(cache_path, "preprocessor.pkl"), config.preprocessor_obj_file_path)
+                arrays = [np.load(os.path.join(cache_path, f"{name}.npy"), mmap_mode="r") for name in CACHED_ARRAYS]
+                return (*arrays, config.preprocessor_obj_file_path)
+
             logging.info("Reading train and test datasets")
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
+            train_df = read_table(train_path)
+            test_df = read_table(test_path)
 
             # Standardize column names
             train_df.columns = [col.lower() for col in train_df.columns]
@@ -71,9 +116,6 @@ class DataTransformation:
             # if missing_columns:
             #     raise CustomException(f"Missing columns in training data: {missing_columns}", sys)
 
-            logging.info("Obtaining preprocessing object")
-            preprocessing_obj = self.get_data_transformer_object()
-
             # Separate features and target
             input_feature_train_df = train_df.drop(columns=[target_column_name], axis=1)
             target_feature_train_df = train_df[target_column_name]
@@ -85,17 +127,49 @@ class DataTransformation:
             input_feature_test_arr = preprocessing_obj.transform(input_feature_test_df)
 
             # Save objects
-            logging.info("Saving preprocessing object and DictVectorizer")
+            logging.info("Saving preprocessing object")
             saved_obj(
-                file_path=self.data_transformation_config.preprocessor_obj_file_path,
+                file_path=config.preprocessor_obj_file_path,
                 obj=preprocessing_obj
             )
 
-            return (
-                np.c_[input_feature_train_arr, target_feature_train_df.to_numpy()],
-                np.c_[input_feature_test_arr, target_feature_test_df.to_numpy()],
-                self.data_transformation_config.preprocessor_obj_file_path
+            arrays = (
+                np.asarray(input_feature_train_arr),
+                target_feature_train_df.to_numpy(),
+                np.asarray(input_feature_test_arr),
+                target_feature_test_df.to_numpy()
             )
+            if config.use_cache:
+                self._write_cache(cache_path, arrays)
+
+            return (*arrays, config.preprocessor_obj_file_path)
         except Exception as e:
             raise CustomException(e, sys)
 
+    def _write_cache(self, cache_path, arrays):
+        """Store transformed arrays and the fitted preprocessor, renaming the directory into place"""
+        staging_path = f"{cache_path}.tmp"
+        shutil.rmtree(staging_path, ignore_errors=True)
+        os.makedirs(staging_path)
+        for name, array in zip(CACHED_ARRAYS, arrays):
+            np.save(os.path.join(staging_path, f"{name}.npy"), array, allow_pickle=False)
+        shutil.copyfile(
+            self.data_transformation_config.preprocessor_obj_file_path,
+            os.path.join(staging_path, "preprocessor.pkl")
+        )
+        shutil.rmtree(cache_path, ignore_errors=True)
+        os.replace(staging_path, cache_path)
+        logging.info(f"Cached transformation at {cache_path}")
+        self._prune_cache()
+
+    def _prune_cache(self):
+        """Remove all but the max_cache_entries most recently used cache entries"""
+        config = self.data_transformation_config
+        entries = [
+            os.path.join(config.cache_dir, name) for name in os.listdir(config.cache_dir)
+            if not name.endswith(".tmp")
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for entry in entries[config.max_cache_entries:]:
+            logging.info(f"Removing old cached transformation {entry}")
+            shutil.rmtree(entry, ignore_errors=True)
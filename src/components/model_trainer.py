@@ -1,92 +1,138 @@
+import importlib
+import json
 import os
 import sys
 from dataclasses import dataclass
 
-from catboost import CatBoostRegressor
-from sklearn.ensemble import (
-    AdaBoostRegressor,
-    GradientBoostingRegressor,
-    RandomForestRegressor,
-)
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
-from sklearn.neighbors import KNeighborsRegressor
-from sklearn.tree import DecisionTreeRegressor
-from xgboost import XGBRegressor
-
+from src.components.data_transformation import DataTransformationConfig, read_table
 from src.exception import CustomException
 from src.logger import logging
-from src.utils import saved_obj, evaluate_models
-
+from src.serving.artifact import ArtifactError, export_artifact
+from src.utils import saved_obj, evaluate_models, load_object
+
+# Candidate models as (module, class, constructor kwargs). Each library is only
+# imported when its model is built, so importing this module stays cheap and a
+# restricted candidate list never loads catboost/xgboost at all.
+MODEL_REGISTRY = {
+    "Random Forest": ("sklearn.ensemble", "RandomForestRegressor", {}),
+    "Decision Tree": ("sklearn.tree", "DecisionTreeRegressor", {}),
+    "Gradient Boosting": ("sklearn.ensemble", "GradientBoostingRegressor", {}),
+    "Linear Regression": ("sklearn.linear_model", "LinearRegression", {}),
+    "XGBRegressor": ("xgboost", "XGBRegressor", {}),
+    "CatBoosting Regressor": ("catboost", "CatBoostRegressor", {"verbose": False}),
+    "AdaBoost Regressor": ("sklearn.ensemble", "AdaBoostRegressor", {}),
+}
+
+
+# Hyperparameter grid searched for each registered model
+MODEL_PARAMS = {
+    "Decision Tree": {
+        "criterion": ["squared_error", "friedman_mse", "absolute_error", "poisson"],
+    },
+    "Random Forest": {
+        "n_estimators": [8, 16, 32, 64, 128, 256]
+    },
+    "Gradient Boosting": {
+        "learning_rate": [0.1, 0.01, 0.05, 0.001],
+        "subsample": [0.6, 0.7, 0.75, 0.8, 0.85, 0.9],
+        "n_estimators": [8, 16, 32, 64, 128, 256]
+    },
+    "Linear Regression": {},
+    "XGBRegressor": {
+        "learning_rate": [0.1, 0.01, 0.05, 0.001],
+        "n_estimators": [8, 16, 32, 64, 128, 256]
+    },
+    "CatBoosting Regressor": {
+        "depth": [6, 8, 10],
+        "learning_rate": [0.01, 0.05, 0.1],
+        "iterations": [30, 50, 100]
+    },
+    "AdaBoost Regressor": {
+        "learning_rate": [0.1, 0.01, 0.5, 0.001],
+        "n_estimators": [8, 16, 32, 64, 128, 256]
+    }
+}
+
+
+def build_model(name):
+    """Instantiate the registered model called name, importing its library on demand"""
+    module_name, class_name, kwargs = MODEL_REGISTRY[name]
+    return getattr(importlib.import_module(module_name), class_name)(**kwargs)
 
 
 @dataclass
-
 class ModelTrainerConfig:
     trained_model_file_path = os.path.join("artifacts", "model.pkl")
-from src.exception import CustomException
-import sys
+    trained_model_artifact_path = os.path.join("artifacts", "model.artifact")
+    search_report_file_path = os.path.join("artifacts", "model_search_report.json")
+    # Names from MODEL_REGISTRY to search; None searches all of them
+    model_names: tuple = None
+    # Worker processes shared by all model searches; -1 uses every core
+    n_jobs: int = -1
+    # "grid" fits every candidate; "staged" (opt-in) scores all n_estimators/iterations
+    # values of a boosted or bagged model from a single fit
+    search: str = "grid"
+    # Optional caps on CV fits and on seconds spent starting new CV fits
+    max_fits: int = None
+    time_budget_s: float = None
 
 class ModelTrainer:
     def __init__(self):
         self.model_trainer_config = ModelTrainerConfig()
 
-    def initiate_model_trainer(self, train_array, test_array):
+    def initiate_model_trainer(self, X_train, y_train, X_test, y_test, background=None):
         """
         Train models using the transformed data and evaluate performance.
+        background is passed on to select_best_model.
         """
         try:
-            logging.info("Splitting training and test input data")
-            X_train, y_train, X_test, y_test = (
-                train_array[:, :-1],
-                train_array[:, -1],
-                test_array[:, :-1],
-                test_array[:, -1],
-            )
+            model_names = self.model_trainer_config.model_names or tuple(MODEL_REGISTRY)
+            models, model_report, search_details = self.search_models(model_names, X_train, y_train, X_test, y_test)
+            return self.select_best_model(models, model_report, search_details, X_test, y_test, background)
 
-            # Define models and hyperparameters
-            models = {
-                "Random Forest": RandomForestRegressor(),
-                "Decision Tree": DecisionTreeRegressor(),
-                "Gradient Boosting": GradientBoostingRegressor(),
-                "Linear Regression": LinearRegression(),
-                "XGBRegressor": XGBRegressor(),
-                "CatBoosting Regressor": CatBoostRegressor(verbose=False),
-                "AdaBoost Regressor": AdaBoostRegressor(),
-            }
-            params = {
-                "Decision Tree": {
-                    "criterion": ["squared_error", "friedman_mse", "absolute_error", "poisson"],
-                },
-                "Random Forest": {
-                    "n_estimators": [8, 16, 32, 64, 128, 256]
-                },
-                "Gradient Boosting": {
-                    "learning_rate": [0.1, 0.01, 0.05, 0.001],
-                    "subsample": [0.6, 0.7, 0.75, 0.8, 0.85, 0.9],
-                    "n_estimators": [8, 16, 32, 64, 128, 256]
-                },
-                "Linear Regression": {},
-                "XGBRegressor": {
-                    "learning_rate": [0.1, 0.01, 0.05, 0.001],
-                    "n_estimators": [8, 16, 32, 64, 128, 256]
-                },
-                "CatBoosting Regressor": {
-                    "depth": [6, 8, 10],
-                    "learning_rate": [0.01, 0.05, 0.1],
-                    "iterations": [30, 50, 100]
-                },
-                "AdaBoost Regressor": {
-                    "learning_rate": [0.1, 0.01, 0.5, 0.001],
-                    "n_estimators": [8, 16, 32, 64, 128, 256]
-                }
-            }
+        except CustomException:
+            raise
+        except Exception as e:
+            raise CustomException(f"Error occurred while training the model: {str(e)}", sys.exc_info())
+
+    def search_models(self, model_names, X_train, y_train, X_test, y_test):
+        """Hyperparameter search for model_names; returns (fitted best models, test R2 report, search details)"""
+        try:
+            models = {name: build_model(name) for name in model_names}
 
             # Evaluate models
-            model_report: dict = evaluate_models(
+            model_report, search_details = evaluate_models(
                 X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
-                models=models, param=params
+                models=models, param={name: MODEL_PARAMS[name] for name in models},
+                n_jobs=self.model_trainer_config.n_jobs, return_report=True,
+                search=self.model_trainer_config.search,
+                max_fits=self.model_trainer_config.max_fits,
+                time_budget_s=self.model_trainer_config.time_budget_s
             )
+            for name, details in search_details.items():
+                logging.info(
+                    f"{name}: test R2 {details['test_score']:.4f}, CV {details['mean_cv_score']:.4f}, "
+                    f"fit {details['cv_fit_time_s'] + details['refit_time_s']:.1f}s, params {details['best_params']}"
+                )
+            return models, model_report, search_details
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def select_best_model(self, models, model_report, search_details, X_test, y_test, background=None):
+        """
+        Save the best searched model, its pickle and serving artifact, and return its test R2.
+
+        background is the raw training split the artifact's explanation
+        baseline is taken from: a DataFrame or the path of the split as
+        written by DataIngestion (CSV or Parquet). None exports no baseline.
+        """
+        try:
+            with open(self.model_trainer_config.search_report_file_path, "w") as report_file:
+                json.dump(search_details, report_file, indent=2)
+
+            if not model_report:
+                raise CustomException("No model was evaluated within the search budget.", sys.exc_info())
 
             # Get best model based on score
             best_model_score = max(sorted(model_report.values()))
@@ -104,11 +150,29 @@ class ModelTrainer:
                 obj=best_model
             )
 
+            # Export model and preprocessor as a flat-array artifact for serving
+            try:
+                preprocessor = load_object(DataTransformationConfig.preprocessor_obj_file_path)
+                if isinstance(background, str):
+                    background = read_table(background)
+                if background is not None:
+                    background = background.rename(columns=str.lower)
+                export_artifact(
+                    best_model, self.model_trainer_config.trained_model_artifact_path, preprocessor,
+                    check_rows=X_test, background=background
+                )
+                logging.info(f"Model artifact saved at {self.model_trainer_config.trained_model_artifact_path}")
+            except ArtifactError as e:
+                logging.warning(f"Skipping artifact export for {best_model_name}: {e}")
+
             # Predict and calculate R2 score
+            from sklearn.metrics import r2_score
             predicted = best_model.predict(X_test)
             r2_square = r2_score(y_test, predicted)
 
             return r2_square
 
+        except CustomException:
+            raise
         except Exception as e:
             raise CustomException(f"Error occurred while training the model: {str(e)}", sys.exc_info())
@@ -1,11 +1,14 @@
 import sys
 from src.logger import logging
-import sys
-from src.logger import logging
 
 def get_error_message(error, error_detail: sys):
     try:
+        # Accept the sys module itself as well as a sys.exc_info() tuple
+        if error_detail is sys:
+            error_detail = sys.exc_info()
         _, _, exc_tb = error_detail
+        if exc_tb is None:
+            return f"Error occurred: [{str(error)}]"
         file_name = exc_tb.tb_frame.f_code.co_filename
         line_number = exc_tb.tb_lineno
         error_message = f"Error occurred in script: [{file_name}], line: [{line_number}], message: [{str(error)}]"
@@ -16,11 +19,15 @@ def get_error_message(error, error_detail: sys):
 
 class CustomException(Exception):
     def __init__(self, error, error_detail: sys):
-        # Get the detailed error message using the get_error_message function
-        error_message = get_error_message(error, error_detail)
-        
-        # Log the error message to a logging system
-        logging.error(f"CustomException: {error_message}")
+        if isinstance(error, CustomException):
+            # Re-raised from an outer frame: keep the original location and do not log it twice
+            error_message = error.error_message
+        else:
+            # Get the detailed error message using the get_error_message function
+            error_message = get_error_message(error, error_detail)
+
+            # Log the error message to a logging system
+            logging.error("CustomException: %s", error_message)
         
         # Pass the error message to the parent Exception class
         super().__init__(error_message)
@@ -2,12 +2,25 @@ import logging
 import os
 from datetime import datetime
 
+from src.logging_queue import enable_queue_logging
+
+
+class LazyFileHandler(logging.FileHandler):
+    """FileHandler that creates the log directory and file on the first record, not at import"""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
 log_dir=os.path.join(os.getcwd(),'logs')
-os.makedirs(log_dir,exist_ok=True)
 log_file=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 log_path=os.path.join(log_dir,log_file)
 logging.basicConfig(
-    filename=log_path,
+    handlers=[LazyFileHandler(log_path, delay=True)],
     format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
     level=logging.INFO
-)
\ No newline at end of file
+)
+# Handlers run on a background thread unless LOG_QUEUE=0
+if os.environ.get("LOG_QUEUE", "1") == "1":
+    enable_queue_logging()
@@ -0,0 +1,90 @@
+import atexit
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+_listener = None
+_queue_handler = None
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that hands records over unformatted.
+
+    The stock QueueHandler merges msg and args on the calling thread so the
+    record can be pickled; records here stay in-process, so the message is
+    only built by the listener thread. Exception tracebacks are still
+    rendered up front so the record does not keep the caller's frames alive.
+    """
+
+    def prepare(self, record):
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Let through roughly rate of the records reaching it (1.0 keeps all)"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+def enable_queue_logging(logger=None):
+    """
+    Move logger's handlers (the root logger by default) behind a queue.
+
+    Callers only enqueue records; a QueueListener thread formats them and
+    runs the original handlers, so slow streams or files never block request
+    threads. The listener is stopped, and the queue drained, at interpreter
+    exit or by stop_queue_logging(). Calling this again is a no-op.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+    logger = logger or logging.getLogger()
+    handlers = list(logger.handlers)
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        logger.removeHandler(handler)
+    _queue_handler = DeferredQueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+    return _listener
+
+
+def _restart_listener_in_child():
+    # fork() copies the queue, including records the parent has not written yet, but not the
+    # listener thread; give the child an empty queue of its own and a new listener thread
+    if _listener is not None:
+        log_queue = queue.SimpleQueue()
+        _queue_handler.queue = log_queue
+        _listener.queue = log_queue
+        _listener._thread = None
+        _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def stop_queue_logging():
+    """Flush queued records through their handlers and stop the listener thread"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.flush()
+    _listener = None
@@ -0,0 +1,166 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logging
+from src.serving.lifecycle import load_served_model
+from src.serving.schema import FEATURE_NAMES, FEATURE_SCHEMA
+from src.serving.validator import SchemaValidator
+from src.utils import ChunkWriter, iter_table_chunks
+
+
+@dataclass
+class PredictPipelineConfig:
+    # Same model files and loading rules as app.py
+    model_artifact_path: str = "best_model.artifact"
+    model_file_path: str = "best_model.pkl"
+    chunk_size: int = 100_000
+    # Worker processes for scoring chunks; 1 scores in this process
+    n_jobs: int = 1
+    # Input column copied to the output next to each prediction (the row number is always written)
+    id_column: str = None
+
+
+# Per-process scoring state, set up once by _init_scorer
+_scorer = {}
+
+
+def _init_scorer(artifact_path, model_path):
+    _scorer["validator"] = SchemaValidator(FEATURE_SCHEMA)
+    _scorer["model"] = load_served_model(artifact_path, model_path, FEATURE_NAMES)
+
+
+def _score_chunk(chunk, first_row, id_column):
+    """Validate and score one chunk; returns (results, rejected) DataFrames"""
+    chunk = chunk.rename(columns=str.lower)
+    values, valid, errors = _scorer["validator"].validate_table(chunk)
+    rows = np.arange(first_row, first_row + len(chunk))
+    ids = chunk[id_column.lower()].to_numpy() if id_column else None
+
+    results = {"row": rows[valid]}
+    if ids is not None:
+        results[id_column] = ids[valid]
+    # Same columns and dtypes for every chunk, so Parquet output keeps one schema
+    predictions = np.empty(0, dtype=np.int64)
+    probabilities = None
+    if valid.any():
+        served = _scorer["model"]
+        predictions = np.asarray(served.predict_labels(values[valid])).astype(np.int64)
+        probabilities = served.predict_probabilities(values[valid])
+    results["prediction"] = predictions
+    results["risk_classification"] = np.where(predictions == 1, "High Risk", "Low Risk").astype(object)
+    results["probability"] = (
+        np.asarray(probabilities, dtype=np.float64) if probabilities is not None
+        else np.full(len(predictions), np.nan)
+    )
+
+    rejected_index = sorted(errors)
+    rejected = {"row": rows[rejected_index]}
+    if ids is not None:
+        rejected[id_column] = ids[rejected_index]
+    rejected["errors"] = ["; ".join(errors[i]) for i in rejected_index]
+    return pd.DataFrame(results), pd.DataFrame(rejected)
+
+
+class PredictPipeline:
+    """
+    Offline bulk scoring of a CSV or Parquet file.
+
+    The input is read chunk_size rows at a time. Each chunk is validated
+    against FEATURE_SCHEMA column-wise and its valid rows are scored as one
+    matrix with the same model app.py serves. Predictions and rejected rows
+    (with their validation messages) are appended to their output files
+    before more input is read, so memory stays bounded by chunk_size and
+    n_jobs regardless of file size. With n_jobs > 1 chunks are scored by a
+    process pool, at most 2 * n_jobs chunks in flight, and written in input
+    order.
+    """
+
+    def __init__(self, config=None):
+        self.predict_pipeline_config = config or PredictPipelineConfig()
+
+    def initiate_bulk_scoring(self, input_path, output_path, rejected_path=None):
+        """Score input_path into output_path; returns row counts, elapsed seconds and rows/s"""
+        config = self.predict_pipeline_config
+        if rejected_path is None:
+            stem, extension = os.path.splitext(output_path)
+            rejected_path = f"{stem}.rejected{extension}"
+        output_format = "parquet" if output_path.endswith(".parquet") else "csv"
+        logging.info(f"Bulk scoring {input_path} -> {output_path} (rejected rows -> {rejected_path})")
+
+        try:
+            started = time.perf_counter()
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            results_writer = ChunkWriter(output_path, output_format)
+            rejected_writer = ChunkWriter(rejected_path, output_format)
+
+            def write(scored):
+                results, rejected = scored
+                results_writer.write(results)
+                rejected_writer.write(rejected)
+
+            args = (config.model_artifact_path, config.model_file_path)
+            chunks = iter_table_chunks(input_path, config.chunk_size)
+            first_row = 0
+            try:
+                if config.n_jobs == 1:
+                    _init_scorer(*args)
+                    for chunk in chunks:
+                        write(_score_chunk(chunk, first_row, config.id_column))
+                        first_row += len(chunk)
+                else:
+                    with ProcessPoolExecutor(config.n_jobs, initializer=_init_scorer, initargs=args) as pool:
+                        pending = deque()
+                        for chunk in chunks:
+                            pending.append(pool.submit(_score_chunk, chunk, first_row, config.id_column))
+                            first_row += len(chunk)
+                            if len(pending) >= 2 * config.n_jobs:
+                                write(pending.popleft().result())
+                        while pending:
+                            write(pending.popleft().result())
+            finally:
+                results_writer.close()
+                rejected_writer.close()
+
+            elapsed = time.perf_counter() - started
+            summary = {
+                "rows": first_row,
+                "scored": results_writer.rows,
+                "rejected": rejected_writer.rows,
+                "seconds": round(elapsed, 3),
+                "rows_per_s": round(first_row / elapsed) if elapsed > 0 else None
+            }
+            logging.info(f"Bulk scoring completed: {summary}")
+            return summary
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    config = PredictPipelineConfig()
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of patients in bulk")
+    parser.add_argument("--input", required=True, help="CSV or .parquet file with the FEATURE_SCHEMA columns")
+    parser.add_argument("--output", required=True, help="Predictions file (.csv or .parquet)")
+    parser.add_argument("--rejected", help="Rejected rows file (default: <output>.rejected.<ext>)")
+    parser.add_argument("--chunk-size", type=int, default=config.chunk_size)
+    parser.add_argument("--n-jobs", type=int, default=config.n_jobs, help="Scoring processes")
+    parser.add_argument("--id-column", help="Input column to copy into both output files")
+    args = parser.parse_args()
+
+    config.chunk_size, config.n_jobs, config.id_column = args.chunk_size, args.n_jobs, args.id_column
+    summary = PredictPipeline(config).initiate_bulk_scoring(args.input, args.output, args.rejected)
+    print(
+        f"{summary['rows']} rows ({summary['scored']} scored, {summary['rejected']} rejected) "
+        f"in {summary['seconds']}s: {summary['rows_per_s']} rows/s"
+    )
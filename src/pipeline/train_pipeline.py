@@ -0,0 +1,308 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src import utils
+from src.components import data_ingestion, data_transformation, model_trainer
+from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+from src.components.data_transformation import (
+    CACHED_ARRAYS, TRANSFORM_CACHE_VERSION, DataTransformation, DataTransformationConfig
+)
+from src.components.model_trainer import MODEL_PARAMS, MODEL_REGISTRY, ModelTrainer, ModelTrainerConfig
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import compute_fingerprint, load_object, saved_obj
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory is not recorded
+    resource = None
+
+# Bump when stage outputs change layout so earlier runs are not reused
+TRAIN_PIPELINE_VERSION = 1
+
+
+@dataclass
+class TrainPipelineConfig:
+    # Fingerprints, outputs and timings of completed stages, rewritten after each stage
+    state_file_path: str = os.path.join("artifacts", "train_pipeline_state.json")
+    transformed_dir: str = os.path.join("artifacts", "transformed")
+    search_dir: str = os.path.join("artifacts", "model_search")
+    # Stage processes running at once; None uses every core
+    max_workers: int = None
+    # Run every stage even when its fingerprint is unchanged
+    force: bool = False
+
+
+@dataclass
+class Stage:
+    """
+    One node of the training graph: fn(*args) reads the inputs and writes
+    the outputs. A stage depends on the stages producing its inputs, and
+    its fingerprint covers the contents of its inputs plus params.
+    """
+    name: str
+    fn: object
+    args: tuple
+    inputs: tuple
+    outputs: tuple
+    params: str = ""
+
+
+def _run_stage(fn, args):
+    """Run one stage in a fresh worker process; returns (result, wall seconds, peak RSS in MB)"""
+    started = time.perf_counter()
+    try:
+        result = fn(*args)
+    except Exception as e:
+        # CustomException does not survive pickling back to the parent process
+        raise RuntimeError(str(e)) from None
+    elapsed = time.perf_counter() - started
+    peak_mb = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_mb = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    return result, elapsed, peak_mb
+
+
+def _ingest():
+    DataIngestion().initiate_data_ingestion()
+
+
+def _transform(train_path, test_path, transformed_dir):
+    arrays = DataTransformation().initiate_data_transformation(train_path, test_path)[:len(CACHED_ARRAYS)]
+    os.makedirs(transformed_dir, exist_ok=True)
+    for name, array in zip(CACHED_ARRAYS, arrays):
+        np.save(os.path.join(transformed_dir, f"{name}.npy"), np.asarray(array), allow_pickle=False)
+
+
+def _load_arrays(transformed_dir):
+    return [np.load(os.path.join(transformed_dir, f"{name}.npy"), mmap_mode="r") for name in CACHED_ARRAYS]
+
+
+def _search_paths(search_dir, model_name):
+    stem = os.path.join(search_dir, model_name.lower().replace(" ", "_"))
+    return f"{stem}.pkl", f"{stem}.json"
+
+
+def _search(model_name, transformed_dir, search_dir, n_jobs):
+    trainer = ModelTrainer()
+    trainer.model_trainer_config.n_jobs = n_jobs
+    models, model_report, search_details = trainer.search_models((model_name,), *_load_arrays(transformed_dir))
+    model_path, report_path = _search_paths(search_dir, model_name)
+    saved_obj(model_path, models[model_name])
+    # A model the fit budget left unevaluated is recorded without a score and not selected
+    with open(report_path, "w") as report_file:
+        json.dump({"test_score": model_report.get(model_name), "details": search_details.get(model_name)}, report_file)
+
+
+def _select(model_names, transformed_dir, search_dir, train_path):
+    models, model_report, search_details = {}, {}, {}
+    for name in model_names:
+        model_path, report_path = _search_paths(search_dir, name)
+        with open(report_path) as report_file:
+            report = json.load(report_file)
+        if report["test_score"] is None:
+            continue
+        models[name] = load_object(model_path)
+        model_report[name], search_details[name] = report["test_score"], report["details"]
+    _, _, X_test, y_test = _load_arrays(transformed_dir)
+    return ModelTrainer().select_best_model(models, model_report, search_details, X_test, y_test, train_path)
+
+
+class TrainPipeline:
+    """
+    Training as a graph of stages: ingestion, transformation, one
+    hyperparameter search per model and the final model selection.
+
+    Each stage declares the files it reads and writes under artifacts/. A
+    stage whose fingerprint (input file contents, code and config) matches
+    its last completed run, with all outputs still in place, is skipped, so
+    a failed run picks up after the last stage that completed and a change
+    only re-runs the stages downstream of it. Stages run in their own
+    processes as soon as their inputs exist, so the model searches run in
+    parallel. Each stage's wall time and peak memory (resident set size of
+    its process) are recorded in the state file next to its fingerprint.
+    """
+
+    def __init__(self, config=None):
+        self.train_pipeline_config = config or TrainPipelineConfig()
+
+    def build_stages(self):
+        config = self.train_pipeline_config
+        ingestion_config = DataIngestionConfig()
+        trainer_config = ModelTrainerConfig()
+        train_path, test_path = ingestion_config.train_data_path, ingestion_config.test_data_path
+        ingestion_outputs = [train_path, test_path]
+        if ingestion_config.streaming:
+            ingestion_outputs.append(ingestion_config.val_data_path)
+        if ingestion_config.save_raw_data or not ingestion_config.streaming:
+            ingestion_outputs.append(ingestion_config.raw_data_path)
+        if ingestion_config.streaming and ingestion_config.output_format == "parquet":
+            ingestion_outputs = [os.path.splitext(path)[0] + ".parquet" for path in ingestion_outputs]
+            train_path, test_path = ingestion_outputs[:2]
+        arrays = tuple(os.path.join(config.transformed_dir, f"{name}.npy") for name in CACHED_ARRAYS)
+        preprocessor_path = DataTransformationConfig.preprocessor_obj_file_path
+
+        stages = [
+            Stage(
+                "ingest", _ingest, (),
+                inputs=(ingestion_config.source_data_path, data_ingestion.__file__),
+                outputs=tuple(ingestion_outputs), params=repr(ingestion_config)
+            ),
+            Stage(
+                "transform", _transform, (train_path, test_path, config.transformed_dir),
+                inputs=(train_path, test_path, data_transformation.__file__),
+                outputs=arrays + (preprocessor_path,), params=f"v{TRANSFORM_CACHE_VERSION}"
+            )
+        ]
+
+        # Split the cores between the searches that can run at once. A search depends on
+        # evaluate_models and its model's registry entry and grid, not on the rest of
+        # model_trainer.py, so editing model selection does not re-run the searches
+        model_names = trainer_config.model_names or tuple(MODEL_REGISTRY)
+        max_workers = config.max_workers or os.cpu_count() or 1
+        search_jobs = max(1, (os.cpu_count() or 1) // min(max_workers, len(model_names)))
+        search_outputs = []
+        for name in model_names:
+            outputs = _search_paths(config.search_dir, name)
+            search_outputs.extend(outputs)
+            stages.append(Stage(
+                f"search:{name}", _search, (name, config.transformed_dir, config.search_dir, search_jobs),
+                inputs=arrays + (utils.__file__,), outputs=outputs,
+                params=repr((MODEL_REGISTRY[name], MODEL_PARAMS[name], trainer_config.search,
+                             trainer_config.max_fits, trainer_config.time_budget_s))
+            ))
+
+        stages.append(Stage(
+            "select", _select, (model_names, config.transformed_dir, config.search_dir, train_path),
+            inputs=tuple(search_outputs) + arrays + (preprocessor_path, train_path, model_trainer.__file__),
+            outputs=(
+                trainer_config.trained_model_file_path,
+                trainer_config.search_report_file_path,
+                os.path.join(trainer_config.trained_model_artifact_path, "manifest.json")
+            )
+        ))
+        return stages
+
+    def initiate_training(self):
+        """Run every stage that is not up to date; returns {stage: status, seconds, peak MB}"""
+        config = self.train_pipeline_config
+        logging.info("Started training pipeline.")
+        try:
+            stages = self.build_stages()
+            state = self._load_state()
+            producers = {path: stage.name for stage in stages for path in stage.outputs}
+            depends_on = {stage.name: {producers[p] for p in stage.inputs if p in producers} for stage in stages}
+
+            pending, running, completed, summary = list(stages), {}, set(), {}
+            failures = []
+            with ProcessPoolExecutor(config.max_workers, max_tasks_per_child=1) as pool:
+                while pending or running:
+                    # Start (or skip) every stage whose inputs are ready; skips can free more stages
+                    ready = [s for s in pending if depends_on[s.name] <= completed] if not failures else []
+                    for stage in ready:
+                        pending.remove(stage)
+                        fingerprint = self._fingerprint(stage)
+                        if not config.force and self._is_current(stage, fingerprint, state):
+                            logging.info(f"Stage {stage.name} is up to date, skipping")
+                            completed.add(stage.name)
+                            summary[stage.name] = {"status": "skipped"}
+                        else:
+                            logging.info(f"Stage {stage.name} started")
+                            running[pool.submit(_run_stage, stage.fn, stage.args)] = (stage, fingerprint)
+                    if ready and not running:
+                        continue
+                    if not running:
+                        if pending and not failures:
+                            raise ValueError(f"Stages with unmet inputs: {', '.join(s.name for s in pending)}")
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, fingerprint = running.pop(future)
+                        try:
+                            result, elapsed, peak_mb = future.result()
+                        except Exception as e:
+                            # Let running stages finish and keep their results; start no new ones
+                            logging.error(f"Stage {stage.name} failed: {e}")
+                            summary[stage.name] = {"status": "failed", "error": str(e)}
+                            failures.append(stage.name)
+                            continue
+                        record = {
+                            "fingerprint": fingerprint,
+                            "outputs": {path: compute_fingerprint(path) for path in stage.outputs},
+                            "wall_time_s": round(elapsed, 3),
+                            "peak_memory_mb": round(peak_mb, 1) if peak_mb is not None else None,
+                            "completed_at": datetime.now(timezone.utc).isoformat()
+                        }
+                        state["stages"][stage.name] = record
+                        self._save_state(state)
+                        completed.add(stage.name)
+                        summary[stage.name] = {
+                            "status": "completed", "wall_time_s": record["wall_time_s"],
+                            "peak_memory_mb": record["peak_memory_mb"]
+                        }
+                        if result is not None:
+                            summary[stage.name]["result"] = result
+                        logging.info(
+                            f"Stage {stage.name} completed in {elapsed:.1f}s, peak memory {record['peak_memory_mb']} MB"
+                        )
+
+            if failures:
+                raise RuntimeError(
+                    f"Stages failed: {', '.join(failures)}; re-run to resume after the completed stages"
+                )
+            logging.info(f"Training pipeline completed: {summary}")
+            return summary
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _fingerprint(self, stage):
+        return compute_fingerprint(*stage.inputs, extra=f"v{TRAIN_PIPELINE_VERSION}:{stage.name}:{stage.params}")
+
+    def _is_current(self, stage, fingerprint, state):
+        """True when the last completed run had this fingerprint and its outputs are unchanged"""
+        record = state["stages"].get(stage.name)
+        if record is None or record["fingerprint"] != fingerprint:
+            return False
+        return all(
+            os.path.exists(path) and compute_fingerprint(path) == record["outputs"].get(path)
+            for path in stage.outputs
+        )
+
+    def _load_state(self):
+        path = self.train_pipeline_config.state_file_path
+        if not os.path.exists(path):
+            return {"stages": {}}
+        with open(path) as state_file:
+            return json.load(state_file)
+
+    def _save_state(self, state):
+        """Write the state file atomically, so an interrupted run never leaves it half written"""
+        path = self.train_pipeline_config.state_file_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "w") as state_file:
+            json.dump(state, state_file, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    config = TrainPipelineConfig()
+    parser = argparse.ArgumentParser(description="Run the training pipeline, skipping up-to-date stages")
+    parser.add_argument("--force", action="store_true", help="Run every stage")
+    parser.add_argument("--max-workers", type=int, default=config.max_workers, help="Stage processes at once")
+    args = parser.parse_args()
+
+    config.force, config.max_workers = args.force, args.max_workers
+    for name, outcome in TrainPipeline(config).initiate_training().items():
+        print(f"{name:>32}: {outcome}")
@@ -0,0 +1,299 @@
+"""
+Versioned, checksummed model artifact made of flat NumPy arrays.
+
+An artifact is a directory holding manifest.json plus one .npy file per
+array (coefficients, tree node tables, imputer/scaler statistics). Loading
+it only needs NumPy: arrays are opened with np.load(mmap_mode='r'), so
+workers share the pages through the OS page cache and never import sklearn,
+xgboost or catboost.
+
+Export from a pickled model with:
+
+    python -m src.serving.artifact --model best_model.pkl --output best_model.artifact
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.serving.preprocessing import FlatPreprocessor, from_column_transformer, fuse_linear
+from src.serving.scorer import CompiledLinearScorer
+from src.serving.tree_engine import TreeEnsemble, check_conversion, from_model
+
+ARTIFACT_FORMAT = "heart-disease-model"
+ARTIFACT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactError(Exception):
+    """Raised when an artifact is missing, corrupt or of an unsupported version"""
+
+
+class ModelArtifact:
+    """
+    Model (and optional preprocessor) loaded from an artifact directory.
+
+    A linear model trained behind a preprocessor is fused with it on load,
+    so raw feature rows are scored with a single matrix product. Models
+    that cannot be fused exactly (see fuse_linear) keep the preprocessor.
+    """
+
+    def __init__(self, manifest, engine, preprocessor=None):
+        self.manifest = manifest
+        self.feature_names = manifest["feature_names"]
+        self.fused = False
+        if preprocessor is not None and isinstance(engine, CompiledLinearScorer):
+            try:
+                engine, preprocessor = fuse_linear(preprocessor, engine, len(self.feature_names)), None
+                self.fused = True
+            except ValueError as e:
+                logger.warning("Scoring through the preprocessor, not fused: %s", e)
+        self.engine = engine
+        self.preprocessor = preprocessor
+        self.classes = getattr(engine, "classes", None)
+
+    def _features(self, X):
+        return self.preprocessor.transform(X) if self.preprocessor is not None else X
+
+    def decision_function(self, X):
+        return self.engine.decision_function(self._features(X))
+
+    def predict(self, X):
+        return self.engine.predict(self._features(X))
+
+    def predict_proba(self, X):
+        return self.engine.predict_proba(self._features(X))
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file_obj:
+        for chunk in iter(lambda: file_obj.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _model_engine(model, feature_names):
+    """Return (kind, engine) for a fitted model"""
+    if hasattr(model, "coef_"):
+        classes = getattr(model, "classes_", None)
+        if classes is not None and (len(classes) != 2 or np.shape(model.coef_)[0] != 1):
+            raise ArtifactError(f"Only binary linear classifiers can be exported, got {type(model).__name__}")
+        return "linear", CompiledLinearScorer.from_model(model, feature_names)
+    try:
+        return "tree_ensemble", from_model(model)
+    except ValueError as e:
+        raise ArtifactError(str(e)) from e
+
+
+def _default_feature_names(model, preprocessor):
+    """Raw input columns the artifact expects, in the order they were fitted"""
+    if preprocessor is not None:
+        used = {c for name, _, columns in preprocessor.transformers_ if name != "remainder" for c in columns}
+        return [c for c in preprocessor.feature_names_in_ if c in used]
+    if hasattr(model, "feature_names_in_"):
+        return list(model.feature_names_in_)
+    raise ArtifactError("feature_names are required when the model was fitted without column names")
+
+
+def export_artifact(model, output_dir, preprocessor=None, feature_names=None, check_rows=None,
+                    background=None):
+    """
+    Write model (and the ColumnTransformer it was trained behind, if any) to
+    output_dir as a flat-array artifact. The directory is written next to the
+    target, so readers never see a partial artifact. A directory cannot be
+    renamed over another, so an existing artifact is first renamed aside to
+    output_dir + ".old", the new one renamed into place and only then the old
+    one removed; output_dir is missing only between those two renames, and
+    wait_for_artifact() waits that out.
+
+    check_rows, if given, are model input rows (after the preprocessor) on
+    which a flattened tree ensemble must match the model within the engine's
+    documented tolerance; ArtifactError is raised otherwise.
+
+    background, if given, holds raw training rows (a DataFrame, or an array
+    in feature_names order). Their column means are stored as the baseline
+    that linear-model explanations are measured from.
+    """
+    if feature_names is None:
+        feature_names = _default_feature_names(model, preprocessor)
+    feature_names = [str(name) for name in feature_names]
+
+    kind, engine = _model_engine(model, None if preprocessor is not None else feature_names)
+    if kind == "tree_ensemble" and check_rows is not None:
+        try:
+            check_conversion(model, engine, check_rows)
+        except ValueError as e:
+            raise ArtifactError(str(e)) from e
+    if kind == "linear":
+        model_arrays, params = engine.to_arrays(), {}
+    else:
+        model_arrays, params = engine.to_arrays()
+
+    arrays = {f"model.{key}": value for key, value in model_arrays.items()}
+    preprocessor_params = None
+    if preprocessor is not None:
+        flat_arrays, preprocessor_params = from_column_transformer(preprocessor, feature_names).to_arrays()
+        arrays.update({f"preprocessor.{key}": value for key, value in flat_arrays.items()})
+
+    staging_dir = f"{output_dir}.tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+
+    array_entries = {}
+    for key, value in arrays.items():
+        value = np.ascontiguousarray(value)
+        file_name = f"{key}.npy"
+        file_path = os.path.join(staging_dir, file_name)
+        np.save(file_path, value, allow_pickle=False)
+        array_entries[key] = {
+            "file": file_name,
+            "sha256": _file_sha256(file_path),
+            "dtype": value.dtype.str,
+            "shape": list(value.shape)
+        }
+
+    background_mean = None
+    if background is not None:
+        if hasattr(background, "columns"):
+            background = background[feature_names]
+        background_mean = np.nanmean(np.asarray(background, dtype=np.float64), axis=0).tolist()
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "estimator": type(model).__name__,
+        "kind": kind,
+        "params": params,
+        "feature_names": feature_names,
+        "preprocessor": preprocessor_params,
+        "background_mean": background_mean,
+        "arrays": array_entries
+    }
+    with open(os.path.join(staging_dir, MANIFEST_FILE), "w") as file_obj:
+        json.dump(manifest, file_obj, indent=2)
+
+    aside_dir = _aside_dir(output_dir)
+    shutil.rmtree(aside_dir, ignore_errors=True)
+    if os.path.isdir(output_dir):
+        os.replace(output_dir, aside_dir)
+    os.replace(staging_dir, output_dir)
+    shutil.rmtree(aside_dir, ignore_errors=True)
+    return output_dir
+
+
+def _aside_dir(path):
+    """Where export_artifact keeps the previous artifact while swapping a new one in"""
+    return f"{path}.old"
+
+
+def wait_for_artifact(path, timeout_s=1.0):
+    """
+    True if an artifact directory is at path. While export_artifact is
+    swapping one in (the previous one is aside), wait up to timeout_s for it
+    rather than report it missing.
+    """
+    deadline = time.monotonic() + timeout_s
+    while not os.path.isdir(path):
+        if not os.path.isdir(_aside_dir(path)) or time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+# Loads retried when export_artifact swaps the directory mid-load
+_LOAD_ATTEMPTS = 3
+
+
+def load_artifact(path, verify=True, mmap_mode="r"):
+    """
+    Load an artifact directory into a ModelArtifact.
+
+    With verify=True every array file is checked against its manifest
+    checksum before use. Arrays are memory-mapped read-only by default.
+    A load that export_artifact swapped a new directory in under (so its
+    files may come from both) is retried.
+    """
+    for attempt in range(_LOAD_ATTEMPTS):
+        wait_for_artifact(path)
+        before = _directory_identity(path)
+        try:
+            artifact = _load_artifact(path, verify, mmap_mode)
+        except (ArtifactError, OSError):
+            if _directory_identity(path) == before or attempt == _LOAD_ATTEMPTS - 1:
+                raise
+            continue
+        if _directory_identity(path) == before:
+            return artifact
+    raise ArtifactError(f"{path} was replaced during every load attempt")
+
+
+def _directory_identity(path):
+    """Changes when a different directory is renamed to path"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_ctime_ns
+
+
+def _load_artifact(path, verify, mmap_mode):
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    try:
+        with open(manifest_path) as file_obj:
+            manifest = json.load(file_obj)
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Cannot read artifact manifest {manifest_path}: {e}") from e
+
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ArtifactError(f"{path} is not a {ARTIFACT_FORMAT} artifact")
+    if manifest.get("version", 0) > ARTIFACT_VERSION:
+        raise ArtifactError(
+            f"Artifact version {manifest['version']} is newer than supported version {ARTIFACT_VERSION}"
+        )
+
+    arrays = {}
+    for key, entry in manifest["arrays"].items():
+        file_path = os.path.join(path, entry["file"])
+        if verify and _file_sha256(file_path) != entry["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {file_path}")
+        arrays[key] = np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+
+    def group(prefix):
+        return {key[len(prefix):]: value for key, value in arrays.items() if key.startswith(prefix)}
+
+    model_arrays = group("model.")
+    if manifest["kind"] == "linear":
+        engine = CompiledLinearScorer.from_arrays(model_arrays, manifest["feature_names"])
+    elif manifest["kind"] == "tree_ensemble":
+        engine = TreeEnsemble.from_arrays(model_arrays, manifest["params"])
+    else:
+        raise ArtifactError(f"Unknown model kind {manifest['kind']}")
+
+    preprocessor = None
+    if manifest.get("preprocessor"):
+        preprocessor = FlatPreprocessor.from_arrays(group("preprocessor."), **manifest["preprocessor"])
+
+    return ModelArtifact(manifest, engine, preprocessor)
+
+
+if __name__ == "__main__":
+    from src.utils import load_object
+
+    parser = argparse.ArgumentParser(description="Export a pickled model as a flat-array artifact")
+    parser.add_argument("--model", required=True, help="Pickled fitted model")
+    parser.add_argument("--output", required=True, help="Artifact directory to write")
+    parser.add_argument("--preprocessor", help="Pickled ColumnTransformer the model was trained behind")
+    args = parser.parse_args()
+
+    preprocessor = load_object(args.preprocessor) if args.preprocessor else None
+    print(f"Artifact written to {export_artifact(load_object(args.model), args.output, preprocessor)}")
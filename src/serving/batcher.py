@@ -0,0 +1,126 @@
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.serving.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+QUEUE_WAIT_BUCKETS_US = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000]
+
+# How long predict() waits for its batch, so a caller cannot hang on a stuck worker
+PREDICT_TIMEOUT_S = 30.0
+
+
+class _Pending:
+    __slots__ = ("row", "score_fn", "future", "enqueued")
+
+    def __init__(self, row, score_fn):
+        self.row = row
+        self.score_fn = score_fn
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row scoring calls into vectorized batches.
+
+    Request threads call submit() with one feature row and block on the
+    returned future. A background thread takes the oldest pending row, keeps
+    collecting until max_batch_size rows are queued or max_wait_us has passed
+    since that row arrived, then scores the stacked matrix with one call to
+    score_fn and hands each caller its own result. A caller may pass its own
+    score_fn (e.g. the predict method of the model its request started with);
+    rows are then scored in one call per distinct function.
+
+    A forked process starts with an empty queue, fresh statistics and its
+    own worker, as the parent's thread does not survive the fork.
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_us=500):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1e6
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            # Weakly, so the hook does not keep a discarded batcher alive
+            batcher = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: batcher() and batcher()._reset())
+
+    def _reset(self):
+        # Histogram locks may have been held by the parent's worker when it forked
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_us = Histogram(QUEUE_WAIT_BUCKETS_US)
+        self._queue = queue.SimpleQueue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, row, score_fn=None):
+        """Queue one feature row for scoring and return a Future for its result"""
+        if self._worker is None or not self._worker.is_alive():
+            self._start()
+        pending = _Pending(row, score_fn or self.score_fn)
+        self._queue.put(pending)
+        return pending.future
+
+    def predict(self, row, score_fn=None, timeout=PREDICT_TIMEOUT_S):
+        """Score one feature row, blocking until its batch has been processed (TimeoutError after timeout)"""
+        return self.submit(row, score_fn).result(timeout=timeout)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_us": int(self.max_wait * 1e6),
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_us": self.queue_wait_us.snapshot()
+        }
+
+    def _start(self):
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = batch[0].enqueued + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    if timeout > 0:
+                        batch.append(self._queue.get(timeout=timeout))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        started = time.perf_counter()
+        self.batch_sizes.observe(len(batch))
+        for pending in batch:
+            self.queue_wait_us.observe((started - pending.enqueued) * 1e6)
+
+        groups = {}
+        for pending in batch:
+            groups.setdefault(pending.score_fn, []).append(pending)
+        for score_fn, group in groups.items():
+            try:
+                results = score_fn(np.vstack([pending.row for pending in group]))
+            except Exception as e:
+                logger.exception("Batched scoring failed")
+                for pending in group:
+                    pending.future.set_exception(e)
+                continue
+
+            for pending, result in zip(group, results):
+                pending.future.set_result(result)
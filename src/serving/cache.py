@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions with a per-entry time to live.
+
+    Keys are validated feature rows rounded to `decimals` places, so the same
+    patient record submitted again (as 50, 50.0 or 50.0000001) hits the same
+    entry. Entries belong to one model generation (ServedModel.generation):
+    invalidate(generation) switches to the generation of the model now served
+    and drops every entry, and get() and put() take the generation of the
+    model a request is scored with, so a request still holding the old model
+    neither reads nor stores entries of the new one. All methods are safe to
+    call from many request threads.
+    """
+
+    def __init__(self, max_entries=10000, ttl_s=300.0, decimals=6):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.decimals = decimals
+        self.generation = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, features):
+        """Canonical key for one validated feature row"""
+        # Adding 0.0 folds -0.0 into 0.0 so both encode to the same bytes
+        return (np.round(features, self.decimals) + 0.0).tobytes()
+
+    def get(self, key, generation):
+        """Cached value for key, or None on a miss or when generation is not the current one"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key) if generation == self.generation else None
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation):
+        """Store value unless generation is not the current one (the model was swapped meanwhile)"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl_s)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, generation):
+        """Drop all entries and start generation; call whenever the served model changes"""
+        with self._lock:
+            self.generation = generation
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else None
+            }
@@ -0,0 +1,94 @@
+"""
+Compact request and response bodies for high-volume clients.
+
+Besides JSON, the prediction endpoints accept and return:
+
+- Fixed-layout records (application/octet-stream): little-endian floats,
+  one record per len(FEATURE_SCHEMA) values in FEATURE_SCHEMA order, with
+  no header or padding. float64 by default; send
+  "Content-Type: application/octet-stream; dtype=float32" for float32. The
+  body is viewed in place with np.frombuffer and scored as that matrix.
+  A NaN value stands for a missing one.
+- MessagePack (application/msgpack), the same documents as the JSON API,
+  when the optional msgpack package is installed.
+
+Record results are a packed array of RESULT_FIELDS per input record: an
+int8 prediction (-1 for a record that failed validation) followed by the
+probability in the request's float type (NaN when the model has none or
+the record was rejected). A client reads them back with
+np.frombuffer(body, dtype=result_dtype(np.float64)).
+"""
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:  # optional: MessagePack bodies are refused without it
+    msgpack = None
+
+JSON = "application/json"
+RECORDS = "application/octet-stream"
+MSGPACK = "application/msgpack"
+MSGPACK_ALIASES = (MSGPACK, "application/x-msgpack")
+RECORD_DTYPES = {"float64": np.dtype("<f8"), "float32": np.dtype("<f4")}
+REJECTED = -1
+
+
+def body_format(mimetype):
+    """JSON, RECORDS or MSGPACK for a request Content-Type (anything else counts as JSON)"""
+    if mimetype == RECORDS:
+        return RECORDS
+    if mimetype in MSGPACK_ALIASES:
+        return MSGPACK
+    return JSON
+
+
+def response_formats():
+    """Response types the server can produce, for Accept negotiation"""
+    return (JSON, RECORDS, MSGPACK) if msgpack is not None else (JSON, RECORDS)
+
+
+def record_dtype(params):
+    """Record float type from Content-Type parameters; ValueError for an unknown dtype"""
+    name = params.get("dtype", "float64").lower()
+    if name not in RECORD_DTYPES:
+        raise ValueError(f"Unsupported record dtype '{name}' (expected one of: {', '.join(RECORD_DTYPES)})")
+    return RECORD_DTYPES[name]
+
+
+def decode_records(body, dtype, n_features):
+    """Read-only (records, n_features) view of a fixed-layout body, without copying it"""
+    record_size = dtype.itemsize * n_features
+    if not body or len(body) % record_size:
+        raise ValueError(
+            f"Body of {len(body)} bytes is not a whole number of {record_size}-byte records "
+            f"({n_features} x {dtype.name})"
+        )
+    return np.frombuffer(body, dtype=dtype).reshape(-1, n_features)
+
+
+def result_dtype(dtype):
+    """Packed layout of one record result"""
+    return np.dtype([("prediction", "i1"), ("probability", dtype)])
+
+
+def encode_results(valid, predictions, probabilities, dtype):
+    """Record results for every input record; rejected records get REJECTED and NaN"""
+    results = np.empty(len(valid), dtype=result_dtype(dtype))
+    results["prediction"] = REJECTED
+    results["probability"] = np.nan
+    results["prediction"][valid] = predictions
+    if probabilities is not None:
+        results["probability"][valid] = probabilities
+    return results.tobytes()
+
+
+def unpack(body):
+    """Decode a MessagePack body; ValueError when it is malformed"""
+    try:
+        return msgpack.unpackb(body)
+    except Exception as e:
+        raise ValueError(f"Invalid MessagePack payload: {e}") from e
+
+
+def pack(document):
+    return msgpack.packb(document)
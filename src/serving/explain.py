@@ -0,0 +1,208 @@
+"""
+Per-feature explanations for served models, computed in batches.
+
+Both explainers return (base_value, contributions): contributions has one
+column per raw input feature and every row satisfies
+
+    base_value + contributions.sum(axis=1) == model output
+
+where the output is the log-odds for logistic models, the probability for
+tree classifiers that average leaf probabilities, and the prediction for
+regressors (see output_space). Everything that only depends on the model is
+computed once when the explainer is built, which happens on the first
+explanation a served model is asked for.
+"""
+import numpy as np
+
+from src.serving.scorer import CompiledLinearScorer, FusedLinearScorer
+from src.serving.tree_engine import TreeEnsemble
+
+# Rows x path slots x quadrature nodes evaluated at once by TreeExplainer, bounding its temporary arrays
+_TREE_CHUNK_CELLS = 1 << 20
+
+# Largest ensemble TreeExplainer accepts, in path slots (leaves x deepest path). Memory
+# and per-row cost grow with slots x depth: at the bound about 7 MB and 5-7 ms a row,
+# while a 256-tree forest grown to full depth (93k leaves x 15) would need over 300 MB
+# and 0.4 s a row, so such models are served without explanations
+MAX_EXPLAIN_CELLS = 1 << 16
+
+
+class LinearExplainer:
+    """
+    Exact contributions for a linear model: coef * (x - background mean).
+
+    The base value is the model output at the background mean, which for a
+    linear model is also the mean output over the background rows.
+    """
+
+    def __init__(self, scorer, mean):
+        self.coef = np.asarray(scorer.coef, dtype=np.float64).reshape(-1)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.base_value = float(scorer.intercept[0] + self.coef @ self.mean)
+        self.output_space = "log_odds" if scorer.classes is not None else "prediction"
+
+    def explain(self, X):
+        return self.base_value, (X - self.mean) * self.coef
+
+
+class TreeExplainer:
+    """
+    Path-dependent TreeSHAP over a flattened TreeEnsemble.
+
+    Each leaf is reduced to the features on its path. For each one, x
+    either satisfies all of the path's splits on that feature or it does
+    not (o), and z is the share of training cover that follows the path's
+    splits on it. A leaf then adds value * prod(o_j for j in S, z_j for j
+    not in S) to the expected output given features S. That product game
+    has closed-form Shapley values
+
+        phi_i = value * (o_i - z_i) * integral_0^1 prod_{j != i} (z_j (1 - t) + o_j t) dt
+
+    (the Shapley weights k! (D - 1 - k)! / D! are Beta integrals). The
+    integrand is a polynomial of degree < D, so Gauss-Legendre quadrature
+    on ceil(D / 2) nodes is exact, and a batch is explained with a few array
+    operations over (rows, leaves, depth, nodes) instead of a per-row
+    recursion. Paths are padded to a common depth with o = z = 1 players,
+    which are null players and change nothing. Cost per row grows with the
+    total number of leaves times depth, not with the number of trees.
+
+    Only ensembles whose output is a (weighted) sum or mean of their trees
+    can be explained, the node cover must be known and leaves x depth must
+    be within MAX_EXPLAIN_CELLS (ValueError otherwise). With a
+    FlatPreprocessor, raw rows are transformed first and the contributions
+    of the columns each raw feature expands into are added up.
+    """
+
+    def __init__(self, ensemble, n_features, preprocessor=None):
+        if ensemble.cover is None:
+            raise ValueError("Tree ensemble has no node cover; re-export the model to explain it")
+        if ensemble.aggregation == "mean":
+            tree_weight, base_value = 1.0 / len(ensemble.roots), 0.0
+        elif ensemble.aggregation == "sum":
+            tree_weight, base_value = ensemble.scale, ensemble.base_score
+        else:
+            raise ValueError(f"Cannot explain {ensemble.aggregation} aggregation")
+        self.output_space = {"logistic": "log_odds", "proba": "probability"}.get(ensemble.link, "prediction")
+        self.input_dtype = ensemble.input_dtype
+        self.preprocessor = preprocessor
+
+        # Every leaf has depth >= 1, so refuse oversized ensembles before walking their paths
+        if np.count_nonzero(ensemble.left == np.arange(len(ensemble.left))) > MAX_EXPLAIN_CELLS:
+            raise ValueError(f"Tree ensemble too large to explain: more than MAX_EXPLAIN_CELLS={MAX_EXPLAIN_CELLS} leaves")
+        paths = []
+        for root in ensemble.roots:
+            _collect_paths(ensemble, root, {}, paths)
+        # Path slots are stored (depth, leaves) so every per-slot array is contiguous
+        depth = max(1, max(len(splits) for _, splits in paths))
+        n_leaves = len(paths)
+        if n_leaves * depth > MAX_EXPLAIN_CELLS:
+            raise ValueError(
+                f"Tree ensemble too large to explain: {n_leaves} leaves x depth {depth} "
+                f"exceeds MAX_EXPLAIN_CELLS={MAX_EXPLAIN_CELLS}"
+            )
+        self.feature = np.zeros((depth, n_leaves), dtype=np.intp)
+        self.lower = np.full((depth, n_leaves), -np.inf)
+        self.upper = np.full((depth, n_leaves), np.inf)
+        self.share = np.ones((depth, n_leaves))
+        self.value = np.empty(n_leaves)
+        real = np.zeros((depth, n_leaves), dtype=bool)
+        for i, (value, splits) in enumerate(paths):
+            self.value[i] = value * tree_weight
+            for j, (feature, (lower, upper, share)) in enumerate(splits.items()):
+                self.feature[j, i] = feature
+                self.lower[j, i], self.upper[j, i], self.share[j, i] = lower, upper, share
+                real[j, i] = True
+        # The expected output: each leaf weighted by the cover share that reaches it
+        self.base_value = float(base_value + self.share.prod(axis=0) @ self.value)
+
+        # Quadrature nodes on [0, 1]. Path factors are laid out (depth, nodes, leaves):
+        # off_factor where o = 0, on_factor where o = 1. A zero off_factor (o = z = 0)
+        # zeroes the whole leaf, so dividing it back out by 1 instead gives the right 0
+        nodes, weights = np.polynomial.legendre.leggauss((depth + 1) // 2)
+        nodes = (nodes[:, None] + 1.0) / 2.0
+        self.quadrature_weights = weights / 2.0
+        self.off_factor = self.share[:, None, :] * (1.0 - nodes)
+        self.on_factor = self.off_factor + nodes
+        self.off_divisor = np.where(self.off_factor > 0, self.off_factor, 1.0)
+
+        # Slot values are summed per ensemble input column, then mapped to raw features
+        # (one-hot columns add up onto the feature they expand)
+        if preprocessor is None:
+            self.column_mapping = np.eye(n_features)
+        else:
+            output_columns = preprocessor.output_columns()
+            self.column_mapping = np.zeros((len(output_columns), n_features))
+            self.column_mapping[np.arange(len(output_columns)), output_columns] = 1.0
+        slot_column = np.where(real, self.feature, -1).reshape(-1)
+        self.slot_order = np.flatnonzero(slot_column >= 0)
+        self.slot_order = self.slot_order[np.argsort(slot_column[self.slot_order], kind="stable")]
+        sorted_columns = slot_column[self.slot_order]
+        self.slot_starts = np.flatnonzero(np.r_[True, sorted_columns[1:] != sorted_columns[:-1]])
+        self.slot_mapping = self.column_mapping[sorted_columns[self.slot_starts]]
+
+    def explain(self, X):
+        if self.preprocessor is not None:
+            X = self.preprocessor.transform(X)
+        X = np.asarray(X, dtype=self.input_dtype)
+        contributions = np.empty((X.shape[0], self.column_mapping.shape[1]))
+        step = max(1, _TREE_CHUNK_CELLS // self.off_factor.size)
+        for start in range(0, X.shape[0], step):
+            rows = X[start:start + step]
+            slots = self._slot_values(rows).reshape(len(rows), -1)[:, self.slot_order]
+            contributions[start:start + step] = np.add.reduceat(slots, self.slot_starts, axis=1) @ self.slot_mapping
+        return self.base_value, contributions
+
+    def _slot_values(self, X):
+        """Shapley value of every (path feature, leaf) slot for each row, shape (rows, depth, leaves)"""
+        x = X[:, self.feature]
+        follows = (x > self.lower) & (x <= self.upper)
+        depth = len(self.share)
+        on = [follows[:, j, None, :] for j in range(depth)]
+
+        product = np.where(on[0], self.on_factor[0], self.off_factor[0])
+        for j in range(1, depth):
+            product *= np.where(on[j], self.on_factor[j], self.off_factor[j])
+
+        values = np.empty(follows.shape)
+        for i in range(depth):
+            # Integrand without player i, summed over the quadrature nodes
+            without_i = product / np.where(on[i], self.on_factor[i], self.off_divisor[i])
+            values[:, i] = np.einsum("rql,q->rl", without_i, self.quadrature_weights)
+        return (follows - self.share) * values * self.value
+
+
+def _collect_paths(ensemble, node, splits, paths):
+    """Append (leaf value, {feature: (lower, upper, cover share)}) for every leaf under node"""
+    left, right = ensemble.left[node], ensemble.right[node]
+    if left == node:
+        paths.append((ensemble.value[node], dict(splits)))
+        return
+    feature, threshold = int(ensemble.feature[node]), ensemble.threshold[node]
+    cover = ensemble.cover[node]
+    lower, upper, share = splits.get(feature, (-np.inf, np.inf, 1.0))
+    for child, bounds in ((left, (lower, min(upper, threshold))), (right, (max(lower, threshold), upper))):
+        child_share = ensemble.cover[child] / cover if cover > 0 else 0.0
+        _collect_paths(ensemble, child, {**splits, feature: (*bounds, share * child_share)}, paths)
+
+
+def make_explainer(model):
+    """
+    Build the explainer for a loaded ModelArtifact, or return None when its
+    model cannot be explained (no background mean for a linear model, no
+    node cover or a non-additive aggregation for trees).
+    """
+    engine = getattr(model, "engine", None)
+    if isinstance(engine, CompiledLinearScorer):
+        mean = model.manifest.get("background_mean")
+        # Coefficients must be over raw columns: unfused preprocessors and one-hot lookups are not
+        if mean is None or model.preprocessor is not None or (
+            isinstance(engine, FusedLinearScorer) and engine.onehot_source is not None
+        ):
+            return None
+        return LinearExplainer(engine, mean)
+    if isinstance(engine, TreeEnsemble):
+        try:
+            return TreeExplainer(engine, len(model.feature_names), model.preprocessor)
+        except ValueError:
+            return None
+    return None
@@ -0,0 +1,230 @@
+import itertools
+import logging
+import os
+import pickle
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.serving.artifact import MANIFEST_FILE, ArtifactError, load_artifact, wait_for_artifact
+from src.serving.explain import make_explainer
+from src.serving.scorer import compile_scorer
+
+logger = logging.getLogger(__name__)
+
+_generations = itertools.count(1)
+
+
+class ServedModel:
+    """
+    One loaded model together with the scorer used for it.
+
+    Instances are never mutated after construction, so a request that took a
+    reference keeps scoring with the same model even if another one has been
+    swapped in meanwhile. The one exception is the explainer: with
+    explainable=True it is built from the model on first use, once, and
+    cached.
+    """
+
+    def __init__(self, model, scorer, source, feature_names, load_seconds, explainable=False):
+        self.model = model
+        self.scorer = scorer
+        self.explainable = explainable
+        self._explainer = None
+        self._explainer_built = not explainable
+        self._explainer_lock = threading.Lock()
+        self.source = source
+        self.feature_names = feature_names
+        self.load_seconds = load_seconds
+        # Unique per load, so results (e.g. cached predictions) can be tied to the model that made them
+        self.generation = next(_generations)
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+
+    @property
+    def estimator(self):
+        if hasattr(self.model, "manifest"):
+            return self.model.manifest["estimator"]
+        return type(self.model).__name__
+
+    def predict_labels(self, X):
+        """Predicted class for each row of a float matrix in feature_names order"""
+        if self.scorer is not None:
+            return self.scorer.predict(X)
+        import pandas as pd
+        return self.model.predict(pd.DataFrame(X, columns=self.feature_names))
+
+    def predict_probabilities(self, X):
+        """Positive-class probability for each row, or None if the model has no predict_proba"""
+        if self.scorer is not None:
+            return self.scorer.predict_proba(X)[:, 1]
+        if not hasattr(self.model, "predict_proba"):
+            return None
+        import pandas as pd
+        return self.model.predict_proba(pd.DataFrame(X, columns=self.feature_names))[:, 1]
+
+    @property
+    def explainer(self):
+        """The model's explainer, built on first access; None if the model cannot be explained"""
+        if not self._explainer_built:
+            with self._explainer_lock:
+                if not self._explainer_built:
+                    started = time.perf_counter()
+                    self._explainer = make_explainer(self.model)
+                    self._explainer_built = True
+                    logger.info(
+                        "Explainer for %s: %s (%.2fs)", self.source,
+                        self._explainer.output_space if self._explainer else "unavailable",
+                        time.perf_counter() - started
+                    )
+        return self._explainer
+
+    def explain(self, X):
+        """(base_value, per-feature contributions) for each row, in explainer.output_space units"""
+        return self.explainer.explain(X)
+
+    def describe(self):
+        return {
+            "source": self.source,
+            "estimator": self.estimator,
+            "scorer": "artifact" if self.scorer is self.model else ("compiled" if self.scorer else "sklearn"),
+            # Reported without building the explainer; "deferred" until the first explanation
+            "explanations": (
+                (self._explainer.output_space if self._explainer else None)
+                if self._explainer_built else "deferred"
+            ),
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds
+        }
+
+
+def load_served_model(artifact_path, model_path, feature_names, scorer_mode="compiled", explain=True):
+    """
+    Load the flat-array artifact if present (and scorer_mode allows it),
+    otherwise the pickled model. Raises on any failure. With explain=True
+    the artifact can be explained; its explainer is built on first use.
+    """
+    started = time.perf_counter()
+    if scorer_mode != "sklearn" and wait_for_artifact(artifact_path):
+        artifact = load_artifact(artifact_path)
+        if artifact.feature_names != feature_names:
+            raise ArtifactError(f"Artifact features {artifact.feature_names} do not match FEATURE_SCHEMA")
+        return ServedModel(
+            artifact, artifact, artifact_path, feature_names, time.perf_counter() - started, explain
+        )
+
+    with open(model_path, "rb") as file_obj:
+        model = pickle.load(file_obj)
+    scorer = compile_scorer(model, feature_names) if scorer_mode == "compiled" else None
+    return ServedModel(model, scorer, model_path, feature_names, time.perf_counter() - started)
+
+
+class ModelManager:
+    """
+    Owns the served model and replaces it without interrupting requests.
+
+    load() builds a candidate with loader(), scores warmup_rows with it and
+    only then publishes it by rebinding self.current, a single reference
+    assignment that request threads read without locking. The model it
+    replaces is kept as self.previous so rollback() can swap straight back.
+    reload_async() does the same on a background thread, and watch() polls
+    the given files and reloads when any of them changes. on_swap(served) is
+    called after every swap.
+    """
+
+    def __init__(self, loader, warmup_rows=None, on_swap=None):
+        self.loader = loader
+        self.warmup_rows = warmup_rows
+        self.on_swap = on_swap
+        self.current = None
+        self.previous = None
+        self.last_reload = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+
+    def _warm(self, candidate):
+        if self.warmup_rows is None:
+            return
+        labels = np.asarray(candidate.predict_labels(self.warmup_rows))
+        if labels.shape != (len(self.warmup_rows),):
+            raise ValueError(f"Warmup returned shape {labels.shape} for {len(self.warmup_rows)} rows")
+        probabilities = candidate.predict_probabilities(self.warmup_rows)
+        if probabilities is not None and not np.all(np.isfinite(probabilities)):
+            raise ValueError("Warmup produced non-finite probabilities")
+
+    def _publish(self, served):
+        self.previous, self.current = self.current, served
+        if self.on_swap:
+            self.on_swap(served)
+
+    def load(self):
+        """Load, warm and swap in a new model; returns True on success, keeping the old model otherwise"""
+        with self._reload_lock:
+            started = datetime.now(timezone.utc).isoformat()
+            try:
+                candidate = self.loader()
+                self._warm(candidate)
+            except Exception as e:
+                logger.exception("Model reload failed, keeping the current model")
+                self.last_reload = {"started_at": started, "status": "failed", "error": str(e)}
+                return False
+            self._publish(candidate)
+            self.last_reload = {"started_at": started, "status": "ok", "model": candidate.describe()}
+            logger.info("Model swapped in from %s (%s)", candidate.source, candidate.estimator)
+            return True
+
+    def reload_async(self):
+        """Start load() in the background; returns False if a reload is already running"""
+        if self._reload_lock.locked():
+            return False
+        threading.Thread(target=self.load, name="model-reload", daemon=True).start()
+        return True
+
+    def rollback(self):
+        """Swap the previous model back in; returns False when there is none"""
+        with self._reload_lock:
+            if self.previous is None:
+                return False
+            self._publish(self.previous)
+            logger.info("Rolled back to model from %s loaded at %s", self.current.source, self.current.loaded_at)
+            return True
+
+    def watch(self, paths, interval_s):
+        """Reload whenever the modification time of any of paths changes, checking every interval_s"""
+        if self._watcher is not None:
+            return
+        if hasattr(os, "register_at_fork"):
+            # A forked worker inherits the manager but not the thread; give it its own watcher
+            os.register_at_fork(after_in_child=lambda: self._start_watcher(paths, interval_s))
+        self._start_watcher(paths, interval_s)
+
+    def _start_watcher(self, paths, interval_s):
+        def signature():
+            return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in paths)
+
+        def run():
+            seen = signature()
+            while True:
+                time.sleep(interval_s)
+                current = signature()
+                if current != seen:
+                    seen = current
+                    logger.info("Model files changed, reloading")
+                    self.load()
+
+        self._watcher = threading.Thread(target=run, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def status(self):
+        return {
+            "current": self.current.describe() if self.current else None,
+            "previous": self.previous.describe() if self.previous else None,
+            "reload_in_progress": self._reload_lock.locked(),
+            "last_reload": self.last_reload
+        }
+
+
+def model_watch_paths(artifact_path, model_path):
+    """Files whose replacement means a new model has been deployed"""
+    return [os.path.join(artifact_path, MANIFEST_FILE), model_path]
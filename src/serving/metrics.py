@@ -0,0 +1,209 @@
+import bisect
+import threading
+import time
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram, safe to update from many threads.
+
+    bounds are the inclusive upper edges of each bucket; values above the last
+    bound land in an overflow bucket reported as "+Inf".
+    """
+
+    def __init__(self, bounds):
+        self.bounds = sorted(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """Per-bucket counts plus total count and sum"""
+        with self._lock:
+            counts = list(self._counts)
+            total, value_sum = self._count, self._sum
+        labels = [str(b) for b in self.bounds] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, counts)),
+            "count": total,
+            "sum": value_sum
+        }
+
+
+# Request-stage latencies, 50us to 1s
+LATENCY_BUCKETS_S = [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0]
+
+
+class _Shard:
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms that are updated without locks.
+
+    Each thread writes to its own shard, created the first time it records
+    anything; shards are only merged when metrics are read, so request
+    threads never contend with each other or with a scrape. Metric keys are
+    (name, labels) where labels is a tuple of (label, value) pairs.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._meta = {}
+        self._bounds = {}
+        self._gauges = {}
+
+    def describe(self, name, kind, help_text, bounds=None):
+        """Declare a metric; histograms need their bucket bounds"""
+        self._meta[name] = (kind, help_text)
+        if bounds is not None:
+            self._bounds[name] = sorted(bounds)
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def increment(self, name, labels=(), value=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        bounds = self._bounds[name]
+        state = histograms.get(key)
+        if state is None:
+            state = histograms[key] = [[0] * (len(bounds) + 1), 0.0]
+        state[0][bisect.bisect_left(bounds, value)] += 1
+        state[1] += value
+
+    def set_gauge(self, name, value, labels=()):
+        self._gauges[(name, labels)] = value
+
+    def clock(self, name, labels=()):
+        """StageClock recording each lap into histogram name"""
+        return StageClock(self, name, labels)
+
+    def counters(self):
+        """Counter totals merged across threads, keyed by (name, labels)"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        totals = {}
+        for shard in shards:
+            for key, value in list(shard.counters.items()):
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def histograms(self):
+        """Histogram snapshots merged across threads, keyed by (name, labels)"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged = {}
+        for shard in shards:
+            for key, (counts, value_sum) in list(shard.histograms.items()):
+                state = merged.setdefault(key, [[0] * len(counts), 0.0])
+                state[0] = [a + b for a, b in zip(state[0], counts)]
+                state[1] += value_sum
+
+        snapshots = {}
+        for (name, labels), (counts, value_sum) in merged.items():
+            bucket_labels = [str(b) for b in self._bounds[name]] + ["+Inf"]
+            snapshots[(name, labels)] = {
+                "buckets": dict(zip(bucket_labels, counts)),
+                "count": sum(counts),
+                "sum": value_sum
+            }
+        return snapshots
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        by_name = {}
+        for (name, labels), value in sorted(self.counters().items()):
+            by_name.setdefault(name, []).append(_sample(name, labels, value))
+        for (name, labels), value in sorted(self._gauges.items()):
+            by_name.setdefault(name, []).append(_sample(name, labels, value))
+        for (name, labels), snapshot in sorted(self.histograms().items()):
+            by_name.setdefault(name, []).extend(histogram_samples(name, snapshot, labels))
+
+        lines = []
+        for name in sorted(by_name):
+            kind, help_text = self._meta.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(by_name[name])
+        return "\n".join(lines) + "\n"
+
+
+class StageClock:
+    """Times consecutive stages of one request: each lap() records the time since the previous one"""
+
+    __slots__ = ("registry", "name", "labels", "last")
+
+    def __init__(self, registry, name, labels=()):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.registry.observe(self.name, now - self.last, self.labels + (("stage", stage),))
+        self.last = now
+
+
+class _NullClock:
+    """Stands in for StageClock when metrics are disabled"""
+
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+
+NULL_CLOCK = _NullClock()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _sample(name, labels, value):
+    return f"{name}{_format_labels(labels)} {value}"
+
+
+def histogram_samples(name, snapshot, labels=()):
+    """Prometheus _bucket/_sum/_count lines for a Histogram.snapshot()"""
+    samples = []
+    cumulative = 0
+    for bound, count in snapshot["buckets"].items():
+        cumulative += count
+        samples.append(_sample(f"{name}_bucket", labels + (("le", bound),), cumulative))
+    samples.append(_sample(f"{name}_sum", labels, snapshot["sum"]))
+    samples.append(_sample(f"{name}_count", labels, snapshot["count"]))
+    return samples
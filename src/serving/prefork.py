@@ -0,0 +1,253 @@
+"""
+Pre-fork serving: one listening socket, N waitress worker processes.
+
+The supervisor imports the WSGI module once, so the model is loaded in the
+parent, then binds the port and forks the workers. Each worker inherits the
+socket and shares the parent's model memory copy-on-write (artifact arrays
+are memory-mapped, so their pages are shared through the page cache on top
+of that). The kernel spreads incoming connections across the workers, so
+scoring runs on as many cores as there are workers.
+
+The supervisor restarts workers that exit unexpectedly, stops them all on
+SIGTERM/SIGINT, and on SIGHUP reloads the model in the parent and replaces
+the workers one at a time (a rolling restart with no gap in service).
+
+A worker told to stop (SIGTERM) drains first: it stops accepting and closes
+its copy of the listening socket, so new connections go to the other
+workers, lets the requests it has already accepted finish, closing idle
+keep-alive connections, and exits once none are left or after
+drain_timeout_s. The supervisor waits for that before moving on and kills a
+worker that is still running drain_timeout_s plus kill_grace_s later.
+
+    python -m src.serving.prefork --workers 4 --port 8000
+
+Per-process state such as /metrics counters and the prediction cache is
+kept separately in every worker. POSIX only (uses os.fork).
+"""
+import argparse
+import importlib
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from dataclasses import dataclass
+
+from src.logging_queue import stop_queue_logging
+
+logger = logging.getLogger(__name__)
+
+# A draining worker closes connections with no request in progress once they have been quiet this long;
+# a connection it has just accepted gets this long to send its request
+_DRAIN_IDLE_S = 1.0
+
+
+@dataclass
+class PreforkConfig:
+    app: str = "app:app"
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = int(os.environ.get("WEB_WORKERS", os.cpu_count() or 1))
+    threads: int = int(os.environ.get("WEB_THREADS", "4"))
+    backlog: int = 1024
+    # A worker dying sooner than this after starting is treated as a crash loop and restarted after a pause
+    min_worker_uptime_s: float = 1.0
+    restart_backoff_s: float = 1.0
+    # Longest a stopping worker waits for its open requests, and the supervisor's margin before SIGKILL
+    drain_timeout_s: float = float(os.environ.get("WORKER_DRAIN_TIMEOUT_S", "30"))
+    kill_grace_s: float = 5.0
+
+
+class PreforkServer:
+    """Supervises a fixed number of forked waitress workers sharing one listening socket"""
+
+    def __init__(self, config):
+        self.config = config
+        self.module = None
+        self.application = None
+        self.socket = None
+        self.workers = {}  # pid -> (slot, started_at)
+        self._stopping = False
+        self._reload_requested = False
+
+    def _load_application(self):
+        module_name, _, attribute = self.config.app.partition(":")
+        sys.path.insert(0, os.getcwd())
+        self.module = importlib.import_module(module_name)
+        self.application = getattr(self.module, attribute or "app")
+
+    def _bind(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.config.host, self.config.port))
+        sock.listen(self.config.backlog)
+        sock.setblocking(False)
+        self.socket = sock
+
+    def _spawn(self, slot):
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker(slot)
+        self.workers[pid] = (slot, time.monotonic())
+        logger.info("Started worker %d (pid %d)", slot, pid)
+        return pid
+
+    def _run_worker(self, slot):
+        # Child process: serve until terminated, never return into the supervisor loop
+        code = 0
+        try:
+            from waitress import create_server, wasyncore
+
+            stop_requested = []
+            signal.signal(signal.SIGTERM, lambda *_: stop_requested.append(True))
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGHUP, signal.SIG_DFL)
+            socket_map = {}
+            server = create_server(
+                self.application, map=socket_map, sockets=[self.socket], threads=self.config.threads,
+                ident=f"prefork-worker-{slot}"
+            )
+            # server.run() with a check for SIGTERM after every poll (at most asyncore_loop_timeout apart)
+            while not stop_requested:
+                wasyncore.loop(
+                    timeout=server.adj.asyncore_loop_timeout, map=socket_map,
+                    use_poll=server.adj.asyncore_use_poll, count=1
+                )
+            self._drain(server, socket_map, slot)
+        except SystemExit as e:
+            code = e.code or 0
+        except BaseException:
+            logger.exception("Worker %d failed", slot)
+            code = 1
+        finally:
+            stop_queue_logging()
+            logging.shutdown()
+            os._exit(code)
+
+    def _drain(self, server, socket_map, slot):
+        """Stop accepting, finish the requests already accepted (up to drain_timeout_s), stop the threads"""
+        from waitress import wasyncore
+
+        # Closes only this worker's copy of the socket; the other workers keep accepting on it
+        server.accepting = False
+        server.del_channel()
+        server.socket.close()
+        deadline = time.monotonic() + self.config.drain_timeout_s
+        while server.active_channels and time.monotonic() < deadline:
+            idle_since = time.time() - _DRAIN_IDLE_S
+            for channel in list(server.active_channels.values()):
+                # Idle keep-alive connections: nothing being read, run or written
+                if (not channel.requests and channel.request is None and not channel.total_outbufs_len
+                        and channel.last_activity < idle_since):
+                    channel.will_close = True
+            wasyncore.loop(timeout=0.05, map=socket_map, use_poll=server.adj.asyncore_use_poll, count=1)
+        if server.active_channels:
+            logger.warning(
+                "Worker %d stopping with %d connection(s) still open after %.0fs",
+                slot, len(server.active_channels), self.config.drain_timeout_s
+            )
+        server.task_dispatcher.shutdown(timeout=self.config.kill_grace_s / 2)
+
+    def _wait_for_exit(self, pid):
+        """Wait for a worker sent SIGTERM to drain and exit, killing it if it outlives the drain timeout"""
+        deadline = time.monotonic() + self.config.drain_timeout_s + self.config.kill_grace_s
+        while os.waitpid(pid, os.WNOHANG)[0] == 0:
+            if time.monotonic() >= deadline:
+                logger.error("Worker pid %d did not stop after %.0fs; killing it", pid, self.config.drain_timeout_s)
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                break
+            time.sleep(0.05)
+        self.workers.pop(pid, None)
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reload_requested = True
+
+    def _reap(self):
+        """Collect exited workers; returns their slots and whether each died too soon"""
+        exited = []
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            slot, started_at = self.workers.pop(pid, (None, None))
+            if slot is None:
+                continue
+            uptime = time.monotonic() - started_at
+            code = os.waitstatus_to_exitcode(status)
+            logger.warning("Worker %d (pid %d) exited with code %d after %.1fs", slot, pid, code, uptime)
+            exited.append((slot, uptime < self.config.min_worker_uptime_s))
+        return exited
+
+    def _rolling_restart(self):
+        """Reload the model in the parent, then replace workers one by one"""
+        load_model = getattr(self.module, "load_model", None)
+        if load_model is not None and not load_model():
+            logger.error("Model reload failed; keeping the current workers")
+            return
+        # The old worker drains its open requests before the next one is replaced
+        for pid, (slot, _) in list(self.workers.items()):
+            self._spawn(slot)
+            os.kill(pid, signal.SIGTERM)
+            self._wait_for_exit(pid)
+        logger.info("Rolling restart completed")
+
+    def _shutdown(self):
+        # Signal every worker first, so they all drain at once
+        for pid in list(self.workers):
+            os.kill(pid, signal.SIGTERM)
+        for pid in list(self.workers):
+            self._wait_for_exit(pid)
+        self.workers.clear()
+        self.socket.close()
+        logger.info("All workers stopped")
+
+    def run(self):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Pre-fork serving needs os.fork; use waitress-serve on this platform")
+
+        self._load_application()
+        self._bind()
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        logger.info(
+            "Serving %s on %s:%d with %d workers x %d threads",
+            self.config.app, self.config.host, self.config.port, self.config.workers, self.config.threads
+        )
+        for slot in range(self.config.workers):
+            self._spawn(slot)
+
+        while not self._stopping:
+            time.sleep(0.2)
+            if self._reload_requested:
+                self._reload_requested = False
+                self._rolling_restart()
+            for slot, crashed_early in self._reap():
+                if self._stopping:
+                    break
+                if crashed_early:
+                    time.sleep(self.config.restart_backoff_s)
+                self._spawn(slot)
+
+        self._shutdown()
+
+
+if __name__ == "__main__":
+    config = PreforkConfig()
+    parser = argparse.ArgumentParser(description="Serve a WSGI app from pre-forked waitress workers")
+    parser.add_argument("--app", default=config.app, help="module:attribute of the WSGI application")
+    parser.add_argument("--host", default=config.host)
+    parser.add_argument("--port", type=int, default=config.port)
+    parser.add_argument("--workers", type=int, default=config.workers, help="Worker processes (WEB_WORKERS)")
+    parser.add_argument("--threads", type=int, default=config.threads, help="Threads per worker (WEB_THREADS)")
+    args = parser.parse_args()
+
+    config.app, config.host, config.port = args.app, args.host, args.port
+    config.workers, config.threads = args.workers, args.threads
+    PreforkServer(config).run()
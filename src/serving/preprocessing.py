@@ -0,0 +1,199 @@
+import numpy as np
+
+from src.serving.scorer import FusedLinearScorer
+
+
+class FlatPreprocessor:
+    """
+    ColumnTransformer replayed from flat arrays.
+
+    Each block selects input columns, fills NaNs with the fitted imputer
+    statistics, optionally expands them one-hot against the fitted categories
+    and optionally applies the fitted StandardScaler mean/scale. Blocks are
+    concatenated in transformer order, matching ColumnTransformer output.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    @classmethod
+    def from_arrays(cls, arrays, n_blocks):
+        blocks = []
+        for i in range(n_blocks):
+            prefix = f"block{i}_"
+            blocks.append({
+                key[len(prefix):]: value for key, value in arrays.items() if key.startswith(prefix)
+            })
+        return cls(blocks)
+
+    def to_arrays(self):
+        arrays = {}
+        for i, block in enumerate(self.blocks):
+            for key, value in block.items():
+                arrays[f"block{i}_{key}"] = value
+        return arrays, {"n_blocks": len(self.blocks)}
+
+    def output_columns(self):
+        """Raw feature index behind each transformed column"""
+        return np.concatenate([
+            block["columns"][block["onehot_source"]] if "onehot_source" in block else block["columns"]
+            for block in self.blocks
+        ])
+
+    def transform(self, X):
+        """Transform a raw float matrix laid out in the artifact's feature order"""
+        outputs = []
+        for block in self.blocks:
+            x = X[:, block["columns"]]
+            if "fill" in block:
+                x = np.where(np.isnan(x), block["fill"], x)
+            if "onehot_source" in block:
+                x = (x[:, block["onehot_source"]] == block["onehot_values"]).astype(np.float64)
+            if "mean" in block:
+                x = x - block["mean"]
+            if "scale" in block:
+                x = x / block["scale"]
+            outputs.append(x)
+        return np.hstack(outputs)
+
+
+def from_column_transformer(preprocessor, feature_names):
+    """
+    Convert a fitted ColumnTransformer whose pipelines use SimpleImputer,
+    OneHotEncoder and StandardScaler steps into a FlatPreprocessor that reads
+    columns from a matrix ordered as feature_names.
+    """
+    index = {name: j for j, name in enumerate(feature_names)}
+    blocks = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop" or name == "remainder":
+            continue
+        if transformer == "passthrough":
+            blocks.append({"columns": np.array([index[c] for c in columns])})
+            continue
+
+        steps = transformer.steps if hasattr(transformer, "steps") else [(name, transformer)]
+        block = {"columns": np.array([index[c] for c in columns])}
+        for _, step in steps:
+            step_type = type(step).__name__
+            if step_type == "SimpleImputer" and len(block) == 1:
+                block["fill"] = np.asarray(step.statistics_, dtype=np.float64)
+            elif step_type == "OneHotEncoder" and "mean" not in block and "scale" not in block:
+                if step.drop_idx_ is not None:
+                    raise ValueError("OneHotEncoder with drop is not supported")
+                block["onehot_source"] = np.concatenate([
+                    np.full(len(categories), j) for j, categories in enumerate(step.categories_)
+                ])
+                block["onehot_values"] = np.concatenate(step.categories_).astype(np.float64)
+            elif step_type == "StandardScaler":
+                if step.mean_ is not None and step.with_mean:
+                    block["mean"] = np.asarray(step.mean_, dtype=np.float64)
+                if step.scale_ is not None and step.with_std:
+                    block["scale"] = np.asarray(step.scale_, dtype=np.float64)
+            else:
+                raise ValueError(f"Unsupported preprocessing step {step_type} in {name}")
+        blocks.append(block)
+    return FlatPreprocessor(blocks)
+
+
+def probe_rows(preprocessor, n_features):
+    """
+    Raw rows that exercise every column of preprocessor: the fill values,
+    each column moved off its fill value (or set to each category), and one
+    all-NaN row for the imputers.
+    """
+    base = np.zeros(n_features)
+    values = [[] for _ in range(n_features)]
+    for block in preprocessor.blocks:
+        if "fill" in block:
+            base[block["columns"]] = block["fill"]
+        if "onehot_source" in block:
+            for source, value in zip(block["onehot_source"], block["onehot_values"]):
+                values[block["columns"][source]].append(value)
+    rows = [base, np.full(n_features, np.nan)]
+    for j in range(n_features):
+        for value in values[j] or [base[j] + 1.0, base[j] - 2.5]:
+            row = base.copy()
+            row[j] = value
+            rows.append(row)
+    return np.array(rows)
+
+
+def fuse_linear(preprocessor, scorer, n_features, atol=1e-6):
+    """
+    Fold a FlatPreprocessor into the CompiledLinearScorer trained on its
+    output, returning a FusedLinearScorer over the n_features raw columns.
+
+    For an output column o, w_o * (z_o - mean_o) / scale_o is rewritten as a
+    raw-column coefficient plus an intercept term. A one-hot column with
+    categories {a, b} is linear in x on those two values, so it folds the
+    same way. The result is checked against preprocessor.transform followed
+    by scorer on probe_rows. ValueError is raised when the decision values
+    differ by more than atol, when the coefficients do not match the
+    transformed width, or when the model is too ill-conditioned for that
+    check to mean anything: collinear one-hot columns can leave huge
+    coefficients that cancel, and once float64 rounding of the terms alone
+    can exceed atol the fused model is refused rather than trusted.
+    """
+    weights = np.asarray(scorer.coef, dtype=np.float64).reshape(-1)
+    coef = np.zeros(n_features)
+    fill = np.zeros(n_features)
+    intercept = float(scorer.intercept[0])
+    lookup_source, lookup_values, lookup_weights = [], [], []
+
+    offset = 0
+    for block in preprocessor.blocks:
+        columns = block["columns"]
+        if "fill" in block:
+            fill[columns] = block["fill"]
+        width = len(block["onehot_values"]) if "onehot_source" in block else len(columns)
+        if offset + width > len(weights):
+            raise ValueError(f"Model has {len(weights)} coefficients, preprocessor produces more")
+        w = weights[offset:offset + width].copy()
+        offset += width
+        if "scale" in block:
+            w /= block["scale"]
+        if "mean" in block:
+            intercept -= float(w @ block["mean"])
+
+        if "onehot_source" not in block:
+            np.add.at(coef, columns, w)
+            continue
+        sources, values = block["onehot_source"], block["onehot_values"]
+        for source in np.unique(sources):
+            members = np.flatnonzero(sources == source)
+            column = columns[source]
+            if len(members) == 2:
+                (a, b), (w_a, w_b) = values[members], w[members]
+                slope = (w_b - w_a) / (b - a)
+                coef[column] += slope
+                intercept += w_a - slope * a
+            else:
+                lookup_source.extend([column] * len(members))
+                lookup_values.extend(values[members])
+                lookup_weights.extend(w[members])
+    if offset != len(weights):
+        raise ValueError(f"Model has {len(weights)} coefficients, preprocessor produces {offset}")
+
+    lookup = {}
+    if lookup_source:
+        lookup = {
+            "onehot_source": np.array(lookup_source),
+            "onehot_values": np.array(lookup_values, dtype=np.float64),
+            "onehot_weights": np.array(lookup_weights, dtype=np.float64)
+        }
+    fused = FusedLinearScorer(coef.reshape(1, -1), intercept, fill, scorer.classes, scorer.feature_names, **lookup)
+
+    probe = probe_rows(preprocessor, n_features)
+    transformed = preprocessor.transform(probe)
+    magnitude = np.abs(transformed) @ np.abs(weights) + abs(float(scorer.intercept[0]))
+    rounding = np.finfo(np.float64).eps * len(weights) * magnitude.max()
+    if rounding > atol:
+        raise ValueError(
+            f"Model is too ill-conditioned to fuse: terms up to {magnitude.max():.3g} "
+            f"cannot be checked to {atol:g}"
+        )
+    error = np.abs(fused.decision_function(probe) - scorer.decision_function(transformed))
+    if not (error <= atol).all():
+        raise ValueError(f"Fused scorer differs from preprocessor + model by up to {error.max():.3g}")
+    return fused
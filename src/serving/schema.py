@@ -0,0 +1,68 @@
+import numpy as np
+
+# Feature schema with validation rules
+FEATURE_SCHEMA = [
+    {"name": "male", "type": "binary", "description": "Gender (1=male, 0=female)"},
+    {"name": "age", "type": "numeric", "min": 30, "max": 100, "description": "Age in years"},
+    {"name": "education", "type": "numeric", "min": 1, "max": 4, "description": "Education level"},
+    {"name": "currentsmoker", "type": "binary", "description": "Current smoker status"},
+    {"name": "cigsperday", "type": "numeric", "min": 0, "max": 100, "description": "Cigarettes per day"},
+    {"name": "bpmeds", "type": "binary", "description": "Blood pressure medication"},
+    {"name": "prevalentstroke", "type": "binary", "description": "History of stroke"},
+    {"name": "prevalenthyp", "type": "binary", "description": "Hypertensive status"},
+    {"name": "diabetes", "type": "binary", "description": "Diabetic status"},
+    {"name": "totchol", "type": "numeric", "min": 100, "max": 400, "description": "Total cholesterol"},
+    {"name": "bmi", "type": "numeric", "min": 15, "max": 50, "description": "Body Mass Index"},
+    {"name": "heartrate", "type": "numeric", "min": 40, "max": 120, "description": "Resting heart rate"},
+    {"name": "glucose", "type": "numeric", "min": 50, "max": 400, "description": "Blood glucose level"}
+]
+FEATURE_NAMES = [f["name"] for f in FEATURE_SCHEMA]
+
+
+def expected_features():
+    """FEATURE_SCHEMA as reported to clients in validation error responses"""
+    return [{
+        "name": f["name"],
+        "type": f["type"],
+        "description": f["description"],
+        "constraints": {
+            "min": f.get("min"),
+            "max": f.get("max")
+        }
+    } for f in FEATURE_SCHEMA]
+
+
+def prediction_body(prediction):
+    """Response body for one prediction"""
+    return {
+        "prediction": int(prediction),
+        "risk_classification": "High Risk" if prediction == 1 else "Low Risk",
+        "interpretation": (
+            "High risk indicates potential heart disease condition"
+            if prediction == 1 else
+            "Low risk indicates no significant heart disease indicators"
+        )
+    }
+
+
+def explanation_body(probability, base_value, contributions, output_space):
+    """Risk score and per-feature contributions for one explained prediction"""
+    return {
+        "probability": float(probability) if probability is not None else None,
+        "explanation": {
+            "output": output_space,
+            "base_value": float(base_value),
+            "contributions": {name: float(value) for name, value in zip(FEATURE_NAMES, contributions)}
+        }
+    }
+
+
+def warmup_rows():
+    """A few valid feature rows spanning FEATURE_SCHEMA, scored before a new model goes live"""
+    rows = []
+    for fraction in (0.0, 0.5, 1.0):
+        rows.append([
+            round(fraction) if f["type"] == "binary" else f["min"] + fraction * (f["max"] - f["min"])
+            for f in FEATURE_SCHEMA
+        ])
+    return np.array(rows, dtype=np.float64)
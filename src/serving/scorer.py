@@ -0,0 +1,121 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledLinearScorer:
+    """
+    Scores a fitted linear model with plain NumPy.
+
+    The coefficients are held in contiguous arrays, so each call is a single
+    matrix product plus a threshold, with no pandas or sklearn input
+    validation in between. For a binary LogisticRegression the decision
+    function is computed with the same operations sklearn uses, so predict()
+    returns identical labels. Without classes the model is treated as a
+    regressor and predict() returns the decision function.
+    """
+
+    def __init__(self, coef, intercept, classes=None, feature_names=None):
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.coef_T = self.coef.T
+        self.intercept = np.ascontiguousarray(np.atleast_1d(intercept), dtype=np.float64)
+        self.classes = np.asarray(classes) if classes is not None else None
+
+    @classmethod
+    def from_model(cls, model, feature_names):
+        names_in = getattr(model, "feature_names_in_", None)
+        if names_in is not None and feature_names is not None and list(names_in) != list(feature_names):
+            raise ValueError(
+                f"Model features {list(names_in)} do not match schema order {list(feature_names)}"
+            )
+        return cls(model.coef_, model.intercept_, getattr(model, "classes_", None), feature_names)
+
+    @classmethod
+    def from_arrays(cls, arrays, feature_names=None):
+        return cls(arrays["coef"], arrays["intercept"], arrays.get("classes"), feature_names)
+
+    def to_arrays(self):
+        arrays = {"coef": self.coef, "intercept": self.intercept}
+        if self.classes is not None:
+            arrays["classes"] = self.classes
+        return arrays
+
+    def decision_function(self, X):
+        """Signed distance to the hyperplane for each row of X"""
+        scores = X @ self.coef_T + self.intercept
+        return scores.reshape(-1)
+
+    def predict(self, X):
+        """Class labels (or regression outputs) for each row of X"""
+        scores = self._finite_scores(X)
+        if self.classes is None:
+            return scores
+        indices = (scores > 0).astype(np.intp)
+        return self.classes[indices]
+
+    def predict_proba(self, X):
+        """Class probabilities for each row of X, ordered as self.classes"""
+        prob = 1.0 / (1.0 + np.exp(-self._finite_scores(X)))
+        return np.column_stack([1.0 - prob, prob])
+
+    def _finite_scores(self, X):
+        """decision_function, raising like sklearn instead of turning NaN input into a label"""
+        scores = self.decision_function(X)
+        if np.isnan(scores).any():
+            raise ValueError("Input X contains NaN")
+        return scores
+
+
+class FusedLinearScorer(CompiledLinearScorer):
+    """
+    Linear model with its preprocessing folded into the coefficients.
+
+    Scores raw feature rows with one matrix product: scaling and two-valued
+    one-hot columns are already part of coef/intercept. Rows holding NaN
+    are rescored after imputing with fill, and one-hot columns with other
+    category counts add a lookup term per category.
+    """
+
+    def __init__(self, coef, intercept, fill, classes=None, feature_names=None,
+                 onehot_source=None, onehot_values=None, onehot_weights=None):
+        super().__init__(coef, intercept, classes, feature_names)
+        self.fill = np.ascontiguousarray(fill, dtype=np.float64)
+        self.onehot_source = onehot_source
+        self.onehot_values = onehot_values
+        self.onehot_weights = onehot_weights
+
+    def decision_function(self, X):
+        scores = super().decision_function(X)
+        # A NaN anywhere in a row makes its score NaN, so clean batches skip imputation entirely
+        missing = np.isnan(scores)
+        if missing.any():
+            rows = X[missing]
+            scores[missing] = super().decision_function(np.where(np.isnan(rows), self.fill, rows))
+        if self.onehot_source is not None:
+            X = np.where(np.isnan(X), self.fill, X)
+            scores += ((X[:, self.onehot_source] == self.onehot_values) * self.onehot_weights).sum(axis=1)
+        return scores
+
+
+def compile_scorer(model, feature_names):
+    """
+    Build a CompiledLinearScorer for model, or return None when the model is
+    not a binary linear classifier and has to be scored through sklearn.
+    """
+    coef = getattr(model, "coef_", None)
+    classes = getattr(model, "classes_", None)
+    if coef is None or classes is None or len(classes) != 2 or np.ndim(coef) != 2 or coef.shape[0] != 1:
+        logger.info(f"No compiled scorer for {type(model).__name__}, using model.predict")
+        return None
+    if coef.shape[1] != len(feature_names):
+        logger.warning(f"Model expects {coef.shape[1]} features, schema has {len(feature_names)}")
+        return None
+
+    try:
+        return CompiledLinearScorer.from_model(model, feature_names)
+    except ValueError as e:
+        logger.warning(f"Compiled scorer disabled: {e}")
+        return None
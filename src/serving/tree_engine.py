@@ -0,0 +1,362 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Converted ensembles reproduce their library's predict()/predict_proba() to within
+# np.allclose(..., rtol=RTOL, atol=ATOL). Splits are taken on float32 inputs exactly as
+# the libraries do, so every row reaches the same leaves; the remaining difference
+# comes from summing leaf values in float64 where xgboost accumulates in float32.
+RTOL = 1e-5
+ATOL = 1e-6
+
+# Per-family parameters that are not arrays; stored in the artifact manifest
+_PARAM_KEYS = ("max_depth", "aggregation", "base_score", "scale", "link", "input_dtype")
+
+
+class TreeEnsemble:
+    """
+    Tree ensemble flattened into one array-of-nodes table.
+
+    All trees share the feature/threshold/left/right/value arrays; roots holds
+    the index of each tree's root node. Leaves point back at themselves, so
+    walking max_depth levels for every (row, tree) pair lands each one on its
+    leaf without per-node branching. Per-tree leaf values are then combined
+    with the ensemble's aggregation ("mean", "sum" or "weighted_median") and
+    link ("identity", "proba" or "logistic"). cover, when known, holds the
+    training weight that reached each node; explanations need it.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth,
+                 aggregation="mean", weights=None, base_score=0.0, scale=1.0,
+                 link="identity", classes=None, input_dtype="float32", cover=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.aggregation = aggregation
+        self.weights = np.asarray(weights, dtype=np.float64) if weights is not None else None
+        self.base_score = float(base_score)
+        self.scale = float(scale)
+        self.link = link
+        self.classes = np.asarray(classes) if classes is not None else None
+        self.input_dtype = np.dtype(input_dtype)
+        self.cover = np.ascontiguousarray(cover, dtype=np.float64) if cover is not None else None
+
+    @classmethod
+    def from_arrays(cls, arrays, params):
+        return cls(
+            arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"],
+            arrays["value"], arrays["roots"], weights=arrays.get("weights"),
+            classes=arrays.get("classes"), cover=arrays.get("cover"), **{k: params[k] for k in _PARAM_KEYS}
+        )
+
+    def to_arrays(self):
+        arrays = {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value": self.value,
+            "roots": self.roots
+        }
+        if self.weights is not None:
+            arrays["weights"] = self.weights
+        if self.classes is not None:
+            arrays["classes"] = self.classes
+        if self.cover is not None:
+            arrays["cover"] = self.cover
+        params = {
+            "max_depth": self.max_depth,
+            "aggregation": self.aggregation,
+            "base_score": self.base_score,
+            "scale": self.scale,
+            "link": self.link,
+            "input_dtype": self.input_dtype.name
+        }
+        return arrays, params
+
+    def tree_values(self, X):
+        """Leaf value reached by each row in each tree, shape (n_rows, n_trees)"""
+        X = np.asarray(X, dtype=self.input_dtype)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0]))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node]
+
+    def raw_predict(self, X):
+        """Aggregated ensemble output before the link function"""
+        values = self.tree_values(X)
+        if self.aggregation == "mean":
+            return values.mean(axis=1)
+        if self.aggregation == "sum":
+            return self.base_score + self.scale * values.sum(axis=1)
+        if self.aggregation == "weighted_median":
+            return _weighted_median(values, self.weights)
+        raise ValueError(f"Unknown aggregation: {self.aggregation}")
+
+    def decision_function(self, X):
+        return self.raw_predict(X)
+
+    def predict_proba(self, X):
+        """Class probabilities [P(classes[0]), P(classes[1])] for a binary classifier"""
+        raw = self.raw_predict(X)
+        prob = 1.0 / (1.0 + np.exp(-raw)) if self.link == "logistic" else raw
+        return np.column_stack([1.0 - prob, prob])
+
+    def predict(self, X):
+        """Class labels for classifiers, regression outputs otherwise"""
+        if self.classes is None:
+            return self.raw_predict(X)
+        return self.classes[(self.predict_proba(X)[:, 1] > 0.5).astype(np.intp)]
+
+
+def _weighted_median(values, weights):
+    """Per-row weighted median of tree outputs, as AdaBoostRegressor computes it"""
+    sorted_idx = np.argsort(values, axis=1)
+    weight_cdf = np.cumsum(weights[sorted_idx], axis=1)
+    median_idx = (weight_cdf >= 0.5 * weight_cdf[:, -1][:, np.newaxis]).argmax(axis=1)
+    rows = np.arange(values.shape[0])
+    return values[rows, sorted_idx[rows, median_idx]]
+
+
+def _flatten_sklearn_trees(estimators, positive_class=False):
+    """Concatenate fitted sklearn tree_ structures into shared node arrays"""
+    feature, threshold, left, right, value, cover, roots = [], [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count) + offset
+        is_leaf = tree.children_left < 0
+
+        if positive_class:
+            counts = tree.value[:, 0, :]
+            leaf_value = counts[:, 1] / counts.sum(axis=1)
+        else:
+            leaf_value = tree.value[:, 0, 0]
+
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+        left.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+        right.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+        value.append(leaf_value)
+        cover.append(tree.weighted_n_node_samples)
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return (np.concatenate(feature), np.concatenate(threshold), np.concatenate(left),
+            np.concatenate(right), np.concatenate(value), np.array(roots), max_depth), np.concatenate(cover)
+
+
+def from_sklearn(model):
+    """
+    Convert a fitted sklearn tree model into a TreeEnsemble.
+
+    Supports DecisionTree, RandomForest and ExtraTrees (regressors and binary
+    classifiers), GradientBoosting (regressor and binary classifier) and
+    AdaBoostRegressor. Raises ValueError for anything else.
+    """
+    name = type(model).__name__
+    classes = getattr(model, "classes_", None)
+    if classes is not None and len(classes) != 2:
+        raise ValueError(f"Only binary classifiers can be flattened, {name} has {len(classes)} classes")
+    is_classifier = classes is not None
+
+    if name in ("DecisionTreeRegressor", "DecisionTreeClassifier"):
+        arrays, cover = _flatten_sklearn_trees([model], is_classifier)
+        return TreeEnsemble(*arrays, link="proba" if is_classifier else "identity", classes=classes, cover=cover)
+
+    if name in ("RandomForestRegressor", "RandomForestClassifier",
+                "ExtraTreesRegressor", "ExtraTreesClassifier"):
+        arrays, cover = _flatten_sklearn_trees(model.estimators_, is_classifier)
+        return TreeEnsemble(*arrays, link="proba" if is_classifier else "identity", classes=classes, cover=cover)
+
+    if name in ("GradientBoostingRegressor", "GradientBoostingClassifier"):
+        arrays, cover = _flatten_sklearn_trees(model.estimators_[:, 0])
+        # Raw prediction of the init estimator is constant, so read it off one row
+        base_score = model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0, 0]
+        return TreeEnsemble(
+            *arrays, aggregation="sum", base_score=base_score, scale=model.learning_rate,
+            link="logistic" if is_classifier else "identity", classes=classes, cover=cover
+        )
+
+    if name == "AdaBoostRegressor":
+        arrays, _ = _flatten_sklearn_trees(model.estimators_)
+        weights = model.estimator_weights_[:len(model.estimators_)]
+        return TreeEnsemble(*arrays, aggregation="weighted_median", weights=weights)
+
+    raise ValueError(f"Cannot flatten model of type {name}")
+
+
+def _tree_depth(left, right):
+    """Depth of one tree given its child index arrays (-1 marks a leaf)"""
+    depth, level = 0, [0]
+    while True:
+        level = [child for node in level for child in (left[node], right[node]) if child >= 0]
+        if not level:
+            return depth
+        depth += 1
+
+
+def _classes(model):
+    # CatBoostRegressor also has a classes_ attribute
+    return model.classes_ if hasattr(model, "predict_proba") else None
+
+
+_XGB_LINKS = {
+    "reg:squarederror": "identity",
+    "reg:absoluteerror": "identity",
+    "reg:pseudohubererror": "identity",
+    "reg:logistic": "logistic",
+    "binary:logistic": "logistic"
+}
+
+
+def from_xgboost(model):
+    """
+    Convert a fitted XGBRegressor or binary XGBClassifier (gbtree booster,
+    numeric splits) into a TreeEnsemble, read from the booster's JSON dump.
+    """
+    dump = json.loads(model.get_booster().save_raw("json"))["learner"]
+    objective = dump["objective"]["name"]
+    booster = dump["gradient_booster"]
+    if booster["name"] != "gbtree":
+        raise ValueError(f"Only gbtree xgboost boosters can be flattened, got {booster['name']}")
+    if objective not in _XGB_LINKS:
+        raise ValueError(f"Unsupported xgboost objective {objective}")
+    link = _XGB_LINKS[objective]
+
+    trees = booster["model"]["trees"]
+    try:
+        # predict() stops at the early-stopping iteration when there is one
+        trees = trees[:booster["model"]["iteration_indptr"][model.best_iteration + 1]]
+    except AttributeError:
+        pass
+
+    feature, threshold, left, right, value, cover, roots = [], [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for tree in trees:
+        if any(tree["split_type"]):
+            raise ValueError("Categorical xgboost splits cannot be flattened")
+        children_left = np.array(tree["left_children"])
+        children_right = np.array(tree["right_children"])
+        conditions = np.array(tree["split_conditions"], dtype=np.float32)
+        node_ids = np.arange(len(children_left)) + offset
+        is_leaf = children_left < 0
+
+        # xgboost sends x < condition left; on float32 inputs that is x <= the next float32 down
+        feature.append(np.where(is_leaf, 0, tree["split_indices"]))
+        threshold.append(np.where(is_leaf, 0.0, np.nextafter(conditions, np.float32(-np.inf))))
+        left.append(np.where(is_leaf, node_ids, children_left + offset))
+        right.append(np.where(is_leaf, node_ids, children_right + offset))
+        value.append(np.where(is_leaf, conditions, 0.0))
+        cover.append(tree["sum_hessian"])
+        roots.append(offset)
+        offset += len(children_left)
+        max_depth = max(max_depth, _tree_depth(children_left, children_right))
+
+    # base_score is stored as a probability for logistic objectives
+    base_score = float(dump["learner_model_param"]["base_score"])
+    if link == "logistic":
+        base_score = np.log(base_score / (1.0 - base_score))
+    return TreeEnsemble(
+        np.concatenate(feature), np.concatenate(threshold), np.concatenate(left),
+        np.concatenate(right), np.concatenate(value), np.array(roots), max_depth,
+        aggregation="sum", base_score=base_score, link=link,
+        classes=_classes(model), cover=np.concatenate(cover)
+    )
+
+
+def from_catboost(model):
+    """
+    Convert a fitted CatBoostRegressor or binary CatBoostClassifier with only
+    numeric features into a TreeEnsemble.
+
+    CatBoost trees are oblivious: level d of a tree splits every node on the
+    same feature and border, and the leaf index has bit d set when x > border.
+    Each tree is expanded into a complete binary tree of the same depth.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "model.json")
+        model.save_model(path, format="json")
+        with open(path) as file_obj:
+            dump = json.load(file_obj)
+
+    flat_index = {f["feature_index"]: f["flat_feature_index"] for f in dump["features_info"]["float_features"]}
+    scale, bias = dump["scale_and_bias"]
+    if len(bias) != 1:
+        raise ValueError("Only single-output CatBoost models can be flattened")
+
+    feature, threshold, left, right, value, cover, roots = [], [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for tree in dump["oblivious_trees"]:
+        splits = tree.get("splits") or []
+        if any(split["split_type"] != "FloatFeature" for split in splits):
+            raise ValueError("Only numeric CatBoost splits can be flattened")
+        depth = len(splits)
+        leaf_weights = np.asarray(tree["leaf_weights"], dtype=np.float64)
+        # Node (level d, leaf bits b so far) sits at offset + 2**d - 1 + b
+        for d in range(depth):
+            split = splits[d]
+            bits = np.arange(2 ** d)
+            nodes_below = offset + 2 ** (d + 1) - 1
+            feature.append(np.full(2 ** d, flat_index[split["float_feature_index"]]))
+            threshold.append(np.full(2 ** d, split["border"]))
+            left.append(nodes_below + bits)
+            right.append(nodes_below + (bits | 1 << d))
+            value.append(np.zeros(2 ** d))
+            # Nodes at level d gather the leaves sharing their low d bits
+            cover.append(leaf_weights.reshape(-1, 2 ** d).sum(axis=0))
+        leaf_ids = offset + 2 ** depth - 1 + np.arange(2 ** depth)
+        feature.append(np.zeros(2 ** depth, dtype=int))
+        threshold.append(np.zeros(2 ** depth))
+        left.append(leaf_ids)
+        right.append(leaf_ids)
+        value.append(np.asarray(tree["leaf_values"], dtype=np.float64))
+        cover.append(leaf_weights)
+        roots.append(offset)
+        offset += 2 ** (depth + 1) - 1
+        max_depth = max(max_depth, depth)
+
+    classes = _classes(model)
+    return TreeEnsemble(
+        np.concatenate(feature), np.concatenate(threshold), np.concatenate(left),
+        np.concatenate(right), np.concatenate(value), np.array(roots), max_depth,
+        aggregation="sum", base_score=bias[0], scale=scale,
+        link="logistic" if classes is not None else "identity", classes=classes, cover=np.concatenate(cover)
+    )
+
+
+def from_model(model):
+    """
+    Convert any supported fitted tree model into a TreeEnsemble, picking the
+    converter by the model's library without importing xgboost or catboost.
+    """
+    library = type(model).__module__.split(".")[0]
+    if library == "xgboost":
+        return from_xgboost(model)
+    if library == "catboost":
+        return from_catboost(model)
+    return from_sklearn(model)
+
+
+def check_conversion(model, ensemble, X):
+    """
+    Raise ValueError unless ensemble reproduces model on rows X within RTOL/ATOL
+    (class probabilities for classifiers, predictions for regressors).
+    """
+    if ensemble.classes is not None:
+        expected, actual = model.predict_proba(X)[:, 1], ensemble.predict_proba(X)[:, 1]
+    else:
+        expected, actual = np.ravel(model.predict(X)), ensemble.predict(X)
+    if not np.allclose(actual, expected, rtol=RTOL, atol=ATOL):
+        error = np.max(np.abs(actual - expected))
+        raise ValueError(f"Flattened {type(model).__name__} differs from the model by up to {error:.3g}")
+    return float(np.max(np.abs(actual - expected), initial=0.0))
@@ -0,0 +1,192 @@
+import numpy as np
+
+_NUMBER_TYPES = {int, float, bool}
+
+
+class SchemaValidator:
+    """
+    Input validator compiled once from a feature schema.
+
+    The schema is turned into a name->column map, a binary-feature mask and
+    min/max bound arrays, so a record (or a whole batch of records) is checked
+    with a handful of array comparisons instead of a per-feature dict walk.
+    Error messages match the original per-record validate_input.
+    """
+
+    def __init__(self, schema):
+        self.schema = list(schema)
+        self.names = [f["name"] for f in self.schema]
+        self.index = {name: j for j, name in enumerate(self.names)}
+        self.expected_keys = frozenset(self.names)
+        self.binary = np.array([f["type"] == "binary" for f in self.schema])
+        self.numeric = ~self.binary
+        self.mins = np.array([f.get("min", -np.inf) for f in self.schema], dtype=float)
+        self.maxs = np.array([f.get("max", np.inf) for f in self.schema], dtype=float)
+        # Combined bounds for the single-record fast path: (x - lower) * (upper - x)
+        # is >= 0 exactly when x is in range, and 0 for a binary flag set to 0 or 1
+        self.lower = np.where(self.binary, 0.0, self.mins)
+        self.upper = np.where(self.binary, 1.0, self.maxs)
+        self.slack_cap = np.where(self.binary, 0.0, np.inf)
+
+    def validate(self, record):
+        """Validate one record, returning its float feature row and error list"""
+        if type(record) is dict and record.keys() == self.expected_keys:
+            row = [record[name] for name in self.names]
+            if all(type(value) in _NUMBER_TYPES for value in row):
+                values = np.array(row, dtype=float)
+                slack = (values - self.lower) * (self.upper - values)
+                if ((slack >= 0) & (slack <= self.slack_cap)).all():
+                    return values, []
+
+        # Something is wrong; let the batch path work out the exact messages
+        values, errors = self.validate_batch([record])
+        return values[0], errors[0]
+
+    def validate_batch(self, records):
+        """
+        Validate a list of records in one pass.
+
+        Returns a float matrix with one row per record (NaN where a value is
+        missing or unusable) and a list of per-row error lists.
+        """
+        n_rows, n_features = len(records), len(self.names)
+        values = np.full((n_rows, n_features), np.nan)
+        present = np.ones((n_rows, n_features), dtype=bool)
+        parsed = np.ones((n_rows, n_features), dtype=bool)
+        is_number = np.ones((n_rows, n_features), dtype=bool)
+        errors = [[] for _ in range(n_rows)]
+
+        clean_rows, clean_index = [], []
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors[i].append("Record must be a JSON object")
+                present[i] = False
+                continue
+
+            # Common case: exactly the schema keys, all plain numbers
+            if record.keys() == self.expected_keys:
+                row = [record[name] for name in self.names]
+                if all(type(value) in _NUMBER_TYPES for value in row):
+                    clean_rows.append(row)
+                    clean_index.append(i)
+                    continue
+            else:
+                input_keys = record.keys()
+                if missing := self.expected_keys - input_keys:
+                    errors[i].append(f"Missing features: {', '.join(sorted(missing))}")
+                if extra := input_keys - self.expected_keys:
+                    errors[i].append(f"Unexpected features: {', '.join(sorted(extra))}")
+
+            self._coerce_record(record, i, values, present, parsed, is_number)
+
+        if clean_rows:
+            values[clean_index] = np.array(clean_rows, dtype=float)
+
+        # json.loads accepts a bare NaN; it is a missing value, not a number to score
+        not_a_number = present & parsed & np.isnan(values)
+        not_binary = present & self.binary & ~not_a_number & ~(is_number & ((values == 0) | (values == 1)))
+        bad_format = present & self.numeric & ~parsed
+        with np.errstate(invalid="ignore"):
+            below = parsed & self.numeric & (values < self.mins)
+            above = parsed & self.numeric & (values > self.maxs)
+        failed = not_a_number | not_binary | bad_format | below | above
+
+        for i in np.flatnonzero(failed.any(axis=1)):
+            for j in np.flatnonzero(failed[i]):
+                feature = self.schema[j]
+                name = feature["name"]
+                if not_a_number[i, j]:
+                    errors[i].append(f"'{name}' is missing")
+                elif not_binary[i, j]:
+                    errors[i].append(f"'{name}' must be 0 or 1")
+                elif bad_format[i, j]:
+                    errors[i].append(f"'{name}' has invalid numeric format")
+                else:
+                    num_value = float(values[i, j])
+                    if below[i, j]:
+                        errors[i].append(f"'{name}' value {num_value} below minimum {feature['min']}")
+                    if above[i, j]:
+                        errors[i].append(f"'{name}' value {num_value} above maximum {feature['max']}")
+        return values, errors
+
+    def validate_table(self, frame):
+        """
+        Validate a DataFrame holding one record per row, column by column.
+
+        For files rather than JSON: every schema column must exist (KeyError
+        otherwise), other columns are ignored, numeric strings are accepted
+        and empty cells are reported as missing. Returns the float matrix, a
+        boolean mask of valid rows and {row: [messages]} for the rest.
+        """
+        import pandas as pd
+
+        n_rows, n_features = len(frame), len(self.names)
+        if missing := self.expected_keys - set(frame.columns):
+            raise KeyError(f"Missing features: {', '.join(sorted(missing))}")
+
+        values = np.empty((n_rows, n_features))
+        empty = np.empty((n_rows, n_features), dtype=bool)
+        for j, name in enumerate(self.names):
+            column = frame[name]
+            empty[:, j] = column.isna().to_numpy()
+            values[:, j] = pd.to_numeric(column, errors="coerce").to_numpy(dtype=float)
+
+        unparsed = np.isnan(values) & ~empty
+        valid, errors = self._check_matrix(values, empty, unparsed)
+        return values, valid, errors
+
+    def validate_matrix(self, values):
+        """
+        Validate a float matrix already in schema column order, such as a
+        binary request body, without copying it. NaN cells are reported as
+        missing. Returns a boolean mask of valid rows and {row: [messages]}.
+        """
+        empty = np.isnan(values)
+        return self._check_matrix(values, empty, np.zeros_like(empty))
+
+    def _check_matrix(self, values, empty, unparsed):
+        """Valid-row mask and per-row messages for a parsed matrix"""
+        with np.errstate(invalid="ignore"):
+            not_binary = self.binary & ~empty & ~((values == 0) | (values == 1))
+            below = self.numeric & (values < self.mins)
+            above = self.numeric & (values > self.maxs)
+        failed = empty | not_binary | (unparsed & self.numeric) | below | above
+        valid = ~failed.any(axis=1)
+        if valid.all():
+            return valid, {}
+
+        errors = {}
+        for i in np.flatnonzero(~valid):
+            messages = []
+            for j in np.flatnonzero(failed[i]):
+                feature = self.schema[j]
+                name = feature["name"]
+                if empty[i, j]:
+                    messages.append(f"'{name}' is missing")
+                elif not_binary[i, j]:
+                    messages.append(f"'{name}' must be 0 or 1")
+                elif unparsed[i, j]:
+                    messages.append(f"'{name}' has invalid numeric format")
+                elif below[i, j]:
+                    messages.append(f"'{name}' value {float(values[i, j])} below minimum {feature['min']}")
+                else:
+                    messages.append(f"'{name}' value {float(values[i, j])} above maximum {feature['max']}")
+            errors[int(i)] = messages
+        return valid, errors
+
+    def _coerce_record(self, record, i, values, present, parsed, is_number):
+        """Fill row i cell by cell for records that miss the all-numeric fast path"""
+        present[i] = False
+        parsed[i] = False
+        is_number[i] = False
+        for name, value in record.items():
+            j = self.index.get(name)
+            if j is None:
+                continue
+            present[i, j] = True
+            is_number[i, j] = isinstance(value, (int, float))
+            try:
+                values[i, j] = float(value)
+                parsed[i, j] = True
+            except (TypeError, ValueError):
+                pass
@@ -1,20 +1,37 @@
+import contextlib
+import hashlib
+import itertools
 import os
 import sys
-
-import numpy as np 
-import pandas as pd
-import dill
 import pickle
-from sklearn.metrics import r2_score
-from sklearn.model_selection import GridSearchCV
+import time
+
+import numpy as np
 
 from src.exception import CustomException
+from src.logger import logging
+
+def compute_fingerprint(*file_paths, extra=""):
+    """sha256 over the contents of file_paths plus an extra config string"""
+    try:
+        digest = hashlib.sha256()
+        for file_path in file_paths:
+            with open(file_path, "rb") as file_obj:
+                for chunk in iter(lambda: file_obj.read(1 << 20), b""):
+                    digest.update(chunk)
+            digest.update(b"\0")
+        digest.update(extra.encode())
+        return digest.hexdigest()
+
+    except Exception as e:
+        raise CustomException(e, sys)
 
 def saved_obj(file_path, obj):
     try:
         dir_path = os.path.dirname(file_path)
 
-        os.makedirs(dir_path, exist_ok=True)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
 
         with open(file_path, "wb") as file_obj:
             pickle.dump(obj, file_obj)
@@ -23,21 +40,190 @@ def saved_obj(file_path, obj):
         raise CustomException(e, sys)
     
     
-def evaluate_models(X_train, y_train,X_test,y_test,models,param):
+# Hyperparameters that set the number of boosting/bagging stages. In "staged"
+# search one fit at the largest value scores every smaller value from its
+# truncated predictions, instead of training each value from scratch.
+STAGE_PARAMS = ("n_estimators", "iterations")
+STAGED_MODELS = {
+    "GradientBoostingRegressor", "GradientBoostingClassifier",
+    "AdaBoostRegressor", "AdaBoostClassifier",
+    "RandomForestRegressor", "RandomForestClassifier",
+    "ExtraTreesRegressor", "ExtraTreesClassifier",
+    "XGBRegressor", "XGBClassifier",
+    "CatBoostRegressor", "CatBoostClassifier",
+}
+
+
+def _staged_predictions(estimator, stages, X):
+    """Predictions of a fitted ensemble truncated to each (ascending) stage count"""
+    name = type(estimator).__name__
+    if name.startswith("XGB"):
+        return [estimator.predict(X, iteration_range=(0, n)) for n in stages]
+    if name.startswith("CatBoost"):
+        return [estimator.predict(X, ntree_end=n) for n in stages]
+    if name.startswith(("RandomForest", "ExtraTrees")):
+        # Forest output is the mean over trees, so accumulate trees stage by stage
+        is_classifier = hasattr(estimator, "classes_")
+        predictions, total, done = [], 0.0, 0
+        for n in stages:
+            for tree in estimator.estimators_[done:n]:
+                total = total + (tree.predict_proba(X) if is_classifier else tree.predict(X))
+            done = n
+            mean = total / n
+            predictions.append(estimator.classes_[mean.argmax(axis=1)] if is_classifier else mean)
+        return predictions
+
+    # GradientBoosting / AdaBoost; AdaBoost can stop early, so reuse its last stage
+    wanted, predictions, last = list(stages), [], None
+    for i, prediction in enumerate(estimator.staged_predict(X), start=1):
+        last = prediction
+        while wanted and wanted[0] == i:
+            predictions.append(prediction)
+            wanted.pop(0)
+    return predictions + [last] * len(wanted)
+
+
+def _search_units(model, grid, search):
+    """
+    Split a model's grid into fit units of (fit params, candidate indices, stage key).
+
+    In grid search every candidate is its own unit. In staged search candidates
+    that differ only in their stage parameter share one unit fitted at the
+    largest stage count.
+    """
+    from sklearn.model_selection import ParameterGrid
+
+    candidates = list(ParameterGrid(grid))
+    key = next((k for k in STAGE_PARAMS if k in grid), None)
+    if search != "staged" or key is None or type(model).__name__ not in STAGED_MODELS:
+        return candidates, [(params, [i], None) for i, params in enumerate(candidates)]
+
+    groups = {}
+    for i, params in enumerate(candidates):
+        groups.setdefault(repr(sorted((k, v) for k, v in params.items() if k != key)), []).append(i)
+
+    units = []
+    for indices in groups.values():
+        indices.sort(key=lambda i: candidates[i][key])
+        units.append((candidates[indices[-1]], indices, key))
+    return candidates, units
+
+
+def _fit_and_score(model, params, stages, X, y, train_idx, test_idx, deadline=None):
+    """
+    Fit a clone of model with params on one CV fold.
+
+    Returns (scores, fit seconds, fitted): one score for a plain fit, or one
+    per stage count in stages for a staged fit. Past the deadline nothing is
+    fitted and every score is NaN.
+    """
+    from sklearn.base import clone, is_classifier
+    from sklearn.metrics import accuracy_score, r2_score
+
+    n_scores = len(stages) if stages else 1
+    if deadline is not None and time.time() > deadline:
+        return [float("nan")] * n_scores, 0.0, False
+
+    estimator = clone(model).set_params(**params)
+    started = time.perf_counter()
     try:
-        report = {}
+        estimator.fit(X[train_idx], y[train_idx])
+        if stages:
+            metric = accuracy_score if is_classifier(estimator) else r2_score
+            scores = [metric(y[test_idx], p) for p in _staged_predictions(estimator, stages, X[test_idx])]
+        else:
+            scores = [estimator.score(X[test_idx], y[test_idx])]
+    except Exception:
+        # Same as GridSearchCV's default error_score=np.nan: a failing candidate just loses
+        scores = [float("nan")] * n_scores
+    return scores, time.perf_counter() - started, True
 
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
-            para=param[list(models.keys())[i]]
 
-            gs = GridSearchCV(model,para,cv=3)
-            gs.fit(X_train,y_train)
+def _refit(model, params, X, y):
+    """Fit a clone of model with params on the full training set"""
+    from sklearn.base import clone
 
-            model.set_params(**gs.best_params_)
-            model.fit(X_train,y_train)
+    estimator = clone(model).set_params(**params)
+    started = time.perf_counter()
+    estimator.fit(X, y)
+    return estimator, time.perf_counter() - started
 
-            #model.fit(X_train, y_train)  # Train model
+
+def evaluate_models(X_train, y_train,X_test,y_test,models,param,n_jobs=1,return_report=False,
+                    search="grid",max_fits=None,time_budget_s=None):
+    """
+    Grid-search every model with 3-fold CV and score the refitted winner on the test set.
+
+    All CV fits of all models go into one task list, interleaved model by
+    model so a large grid cannot starve the others, and run on a process pool
+    of n_jobs workers (n_jobs=1 runs them in this process). Each model in
+    models is replaced by its refitted best estimator.
+
+    search="staged" fits boosted/bagged models once per setting of the other
+    hyperparameters, at the largest n_estimators/iterations in the grid, and
+    scores every smaller value from staged predictions. max_fits caps the
+    number of CV fits and time_budget_s stops starting new ones after that
+    many seconds; candidates left unevaluated simply cannot win, and a model
+    with no evaluated candidate is neither refitted nor reported.
+
+    Returns {model name: test R2}, or with return_report=True a tuple of that
+    dict and a per-model report with CV scores, best params and fit times.
+    """
+    try:
+        from joblib import Parallel, delayed, parallel_backend
+        from sklearn.metrics import r2_score
+        from sklearn.model_selection import KFold
+
+        folds = list(KFold(n_splits=3).split(X_train))
+        grids, units = {}, {}
+        for name in models:
+            grids[name], units[name] = _search_units(models[name], param[name], search)
+
+        # Interleave units across models, then apply the fit budget unit by unit
+        ordered_units = [
+            unit for batch in itertools.zip_longest(*[[(name, u) for u in units[name]] for name in models])
+            for unit in batch if unit
+        ]
+        if max_fits is not None:
+            ordered_units = ordered_units[:max(0, max_fits) // len(folds)]
+        tasks = [(name, unit, f) for name, unit in ordered_units for f in range(len(folds))]
+        deadline = time.time() + time_budget_s if time_budget_s is not None else None
+
+        with parallel_backend("loky", inner_max_num_threads=1) if n_jobs != 1 else contextlib.nullcontext():
+            fold_results = Parallel(n_jobs=n_jobs)(
+                delayed(_fit_and_score)(
+                    models[name], fit_params, [grids[name][i][key] for i in indices] if key else None,
+                    X_train, y_train, *folds[f], deadline
+                )
+                for name, (fit_params, indices, key), f in tasks
+            )
+
+            cv_scores = {name: np.full((len(grids[name]), len(folds)), np.nan) for name in models}
+            cv_fit_time = dict.fromkeys(models, 0.0)
+            cv_fits = dict.fromkeys(models, 0)
+            for (name, (_, indices, _), f), (scores, fit_time, fitted) in zip(tasks, fold_results):
+                cv_scores[name][indices, f] = scores
+                cv_fit_time[name] += fit_time
+                cv_fits[name] += fitted
+
+            # First candidate with the best mean score wins, as in GridSearchCV
+            mean_scores = {name: cv_scores[name].mean(axis=1) for name in models}
+            evaluated = [name for name in models if not np.isnan(mean_scores[name]).all()]
+            for name in models:
+                if name not in evaluated:
+                    logging.warning(f"{name}: no candidate evaluated within the fit budget, left out")
+            best_index = {
+                name: int(np.argmax(np.nan_to_num(mean_scores[name], nan=-np.inf))) for name in evaluated
+            }
+            refits = Parallel(n_jobs=n_jobs)(
+                delayed(_refit)(models[name], grids[name][best_index[name]], X_train, y_train)
+                for name in evaluated
+            )
+
+        report = {}
+        details = {}
+        for name, (model, refit_time) in zip(evaluated, refits):
+            models[name] = model
 
             y_train_pred = model.predict(X_train)
 
@@ -47,9 +233,22 @@ def evaluate_models(X_train, y_train,X_test,y_test,models,param):
 
             test_model_score = r2_score(y_test, y_test_pred)
 
-            report[list(models.keys())[i]] = test_model_score
+            report[name] = test_model_score
+            best = best_index[name]
+            details[name] = {
+                "test_score": float(test_model_score),
+                "train_score": float(train_model_score),
+                "best_params": grids[name][best],
+                "cv_scores": cv_scores[name][best].tolist(),
+                "mean_cv_score": float(cv_scores[name][best].mean()),
+                "n_candidates": len(grids[name]),
+                "n_candidates_evaluated": int((~np.isnan(cv_scores[name]).any(axis=1)).sum()),
+                "cv_fits": cv_fits[name],
+                "cv_fit_time_s": cv_fit_time[name],
+                "refit_time_s": refit_time
+            }
 
-        return report
+        return (report, details) if return_report else report
 
     except Exception as e:
         raise CustomException(e, sys)
@@ -61,3 +260,55 @@ def load_object(file_path):
 
     except Exception as e:
         raise CustomException(e, sys)
+
+def iter_table_chunks(file_path, chunk_size):
+    """Yield a CSV or Parquet file as DataFrames of at most chunk_size rows"""
+    import pandas as pd
+
+    if file_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+
+class ChunkWriter:
+    """
+    Appends DataFrame chunks to one CSV or Parquet file.
+
+    Empty chunks are skipped, as the file schema comes from the first chunk
+    written; if every chunk was empty, close() writes the header/schema alone.
+    """
+
+    def __init__(self, path, output_format):
+        self.path = path
+        self.output_format = output_format
+        self.rows = 0
+        self._parquet_writer = None
+        self._empty = None
+
+    def write(self, df):
+        if df.empty:
+            self._empty = df
+            return
+        self._write(df)
+
+    def _write(self, df):
+        if self.output_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", index=False, header=self.rows == 0)
+        self.rows += len(df)
+
+    def close(self):
+        if self.rows == 0 and self._empty is not None and self._parquet_writer is None:
+            self._write(self._empty)
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
@@ -0,0 +1,18 @@
+import json
+
+import app
+from src.serving.schema import FEATURE_NAMES, warmup_rows
+
+RECORD = dict(zip(FEATURE_NAMES, warmup_rows()[0].tolist()))
+
+
+def test_ndjson_string_records_are_not_parse_errors():
+    lines = [json.dumps(RECORD), json.dumps("Invalid JSON line: not really"), "{bad", json.dumps(RECORD)]
+    response = app.app.test_client().post(
+        "/predict/batch", data="\n".join(lines), content_type="application/x-ndjson"
+    )
+    results = response.get_json()["results"]
+
+    assert [("prediction" in result) for result in results] == [True, False, False, True]
+    assert results[1]["details"] == ["Record must be a JSON object"]
+    assert results[2]["details"][0].startswith("Invalid JSON line: ")
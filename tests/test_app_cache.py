@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import app
+from src.serving.batcher import MicroBatcher
+from src.serving.cache import PredictionCache
+from src.serving.lifecycle import load_served_model
+from src.serving.schema import FEATURE_NAMES, warmup_rows
+
+RECORD = dict(zip(FEATURE_NAMES, warmup_rows()[0].tolist()))
+
+
+def _served(label):
+    """A freshly loaded model (its own generation) that predicts label for every row"""
+    served = load_served_model(app.MODEL_ARTIFACT, app.MODEL_FILE, FEATURE_NAMES)
+    served.predict_labels = lambda X: np.full(len(X), label)
+    return served
+
+
+@pytest.fixture
+def swap_during_validation(monkeypatch):
+    """Serve old; the first validation of a request swaps new in, after the request took old"""
+    old, new = _served(1), _served(0)
+    monkeypatch.setattr(app, "cache", PredictionCache())
+    monkeypatch.setattr(app.model_manager, "current", None)
+    monkeypatch.setattr(app.model_manager, "previous", None)
+    app.model_manager._publish(old)
+
+    validate = app.validator.validate
+
+    def validate_then_swap(record):
+        if app.model_manager.current is old:
+            app.model_manager._publish(new)
+        return validate(record)
+
+    monkeypatch.setattr(app.validator, "validate", validate_then_swap)
+    return old, new
+
+
+@pytest.mark.parametrize("micro_batching", [False, True])
+def test_swap_mid_request_scores_with_and_caches_for_the_request_model(swap_during_validation, monkeypatch,
+                                                                      micro_batching):
+    old, new = swap_during_validation
+    monkeypatch.setattr(app, "batcher", MicroBatcher(app.predict_labels) if micro_batching else None)
+    client = app.app.test_client()
+
+    # Scored by the model the request started with, and not cached under the new one
+    assert client.post("/predict", json=RECORD).get_json()["prediction"] == 1
+    assert app.cache.stats()["size"] == 0
+
+    assert client.post("/predict", json=RECORD).get_json()["prediction"] == 0
+    assert app.cache.stats()["size"] == 1
+    assert app.cache.get(app.cache.key(np.array(list(RECORD.values()), dtype=float)), old.generation) is None
+
+
+def test_cache_keeps_generations_apart():
+    cache = PredictionCache()
+    cache.invalidate(1)
+    cache.put(b"key", 1, 1)
+    assert cache.get(b"key", 1) == 1
+    assert cache.get(b"key", 2) is None
+
+    cache.invalidate(2)
+    cache.put(b"key", 1, 1)
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from src.serving.artifact import export_artifact, wait_for_artifact
+from src.serving.lifecycle import load_served_model
+
+FEATURES = ["a", "b", "c"]
+
+
+def test_readers_never_miss_an_artifact_being_replaced(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    models = [LogisticRegression().fit(X, (X[:, j] > 0).astype(int)) for j in range(3)]
+    path = str(tmp_path / "model.artifact")
+    export_artifact(models[0], path, feature_names=FEATURES)
+
+    stop, failures, loads = threading.Event(), [], [0]
+
+    def read():
+        while not stop.is_set():
+            try:
+                # No pickle to fall back to: a missing artifact fails the load
+                load_served_model(path, str(tmp_path / "missing.pkl"), FEATURES)
+                loads[0] += 1
+            except Exception as e:
+                failures.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    deadline = time.monotonic() + 1.0
+    exports = 0
+    while time.monotonic() < deadline:
+        export_artifact(models[exports % 3], path, feature_names=FEATURES)
+        exports += 1
+        time.sleep(0.01)
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert exports > 10 and loads[0] > 10
+    assert failures == []
+    assert sorted(os.listdir(tmp_path)) == ["model.artifact"]
+
+
+def test_wait_for_artifact(tmp_path):
+    path = str(tmp_path / "model.artifact")
+    assert not wait_for_artifact(path)
+
+    # Mid-swap: only the previous artifact, aside
+    os.makedirs(f"{path}.old")
+    threading.Timer(0.1, os.makedirs, (path,)).start()
+    started = time.monotonic()
+    assert wait_for_artifact(path)
+    assert time.monotonic() - started >= 0.05
+
+    os.rmdir(path)
+    assert not wait_for_artifact(path, timeout_s=0.05)
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+
+import asgi
+from src.serving.schema import FEATURE_NAMES, warmup_rows
+
+RECORD = json.dumps(dict(zip(FEATURE_NAMES, warmup_rows()[0].tolist()))).encode()
+
+
+async def call(receive):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi.app({"type": "http", "method": "POST", "path": "/predict"}, receive, send)
+    return sent[0]["status"], dict(sent[0]["headers"]), json.loads(sent[1]["body"])
+
+
+def slow_body(body, arrived):
+    """receive() that only delivers the body once arrived is set"""
+    async def receive():
+        await arrived.wait()
+        return {"type": "http.request", "body": body, "more_body": False}
+    return receive
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    # One scoring thread and one queued request
+    control = asgi.AdmissionControl(1, 1, 1.0)
+    monkeypatch.setattr(asgi, "admission", control)
+    yield control
+    control.executor.shutdown()
+
+
+def test_requests_reading_their_body_hold_a_slot(admission):
+    async def scenario():
+        arrived = asyncio.Event()
+        senders = [asyncio.create_task(call(slow_body(RECORD, arrived))) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert admission.admitted == 2
+
+        status, headers, body = await call(slow_body(RECORD, asyncio.Event()))
+        assert status == 429
+        assert b"retry-after" in headers
+        arrived.set()
+        return [await sender for sender in senders]
+
+    results = asyncio.run(scenario())
+    assert [status for status, _, _ in results] == [200, 200]
+    assert (admission.admitted, admission.rejected) == (0, 1)
+
+
+def test_slot_is_released_on_early_errors(admission):
+    async def scenario():
+        arrived = asyncio.Event()
+        arrived.set()
+        too_large = await call(slow_body(b" " * (asgi.MAX_BODY_BYTES + 1), arrived))
+        empty = await call(slow_body(b"", arrived))
+        return too_large[0], empty[0]
+
+    assert asyncio.run(scenario()) == (413, 400)
+    assert admission.admitted == 0
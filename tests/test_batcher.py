@@ -0,0 +1,42 @@
+import os
+import threading
+from concurrent.futures import TimeoutError
+
+import numpy as np
+import pytest
+
+from src.serving.batcher import MicroBatcher
+
+
+def _sum_rows(X):
+    return X.sum(axis=1)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_gets_its_own_worker():
+    batcher = MicroBatcher(_sum_rows)
+    assert batcher.predict(np.ones(3)) == 3
+
+    pid = os.fork()
+    if pid == 0:
+        # The parent's worker thread is gone here; a reply means the child started its own
+        try:
+            ok = batcher.predict(np.ones(4), timeout=5) == 4 and batcher.batch_sizes.snapshot()["count"] == 1
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert batcher.predict(np.ones(2)) == 2
+
+
+def test_predict_times_out_on_a_stuck_worker():
+    release = threading.Event()
+
+    def stuck(X):
+        release.wait()
+        return _sum_rows(X)
+
+    batcher = MicroBatcher(stuck)
+    with pytest.raises(TimeoutError):
+        batcher.predict(np.ones(3), timeout=0.1)
+    release.set()
@@ -0,0 +1,56 @@
+import os
+
+import pandas as pd
+import pytest
+import sklearn
+
+from src.components.data_transformation import DataTransformation
+
+
+@pytest.fixture
+def transformation(tmp_path):
+    transformation = DataTransformation()
+    config = transformation.data_transformation_config
+    config.preprocessor_obj_file_path = str(tmp_path / "preprocessor.pkl")
+    config.cache_dir = str(tmp_path / "transform_cache")
+    config.max_cache_entries = 2
+    return transformation
+
+
+def _splits(tmp_path, name, rows):
+    frame = pd.read_csv("artifacts/train.csv")
+    train_path, test_path = str(tmp_path / f"{name}_train.csv"), str(tmp_path / f"{name}_test.csv")
+    frame.iloc[:rows].to_csv(train_path, index=False)
+    frame.iloc[rows:rows + 100].to_csv(test_path, index=False)
+    return train_path, test_path
+
+
+def _entries(transformation):
+    return sorted(os.listdir(transformation.data_transformation_config.cache_dir))
+
+
+def test_sklearn_version_is_part_of_the_cache_key(transformation, tmp_path, monkeypatch):
+    splits = _splits(tmp_path, "a", 300)
+    transformation.initiate_data_transformation(*splits)
+    cached = _entries(transformation)
+    transformation.initiate_data_transformation(*splits)
+    assert _entries(transformation) == cached
+
+    monkeypatch.setattr(sklearn, "__version__", "0.0.0")
+    transformation.initiate_data_transformation(*splits)
+    assert len(_entries(transformation)) == 2
+
+
+def test_least_recently_used_entries_are_removed(transformation, tmp_path):
+    splits = {name: _splits(tmp_path, name, rows) for name, rows in (("a", 300), ("b", 400), ("c", 500))}
+    transformation.initiate_data_transformation(*splits["a"])
+    first = _entries(transformation)
+    transformation.initiate_data_transformation(*splits["b"])
+    # Reusing a's entry makes b's the least recently used
+    transformation.initiate_data_transformation(*splits["a"])
+    second = sorted(set(_entries(transformation)) - set(first))
+
+    transformation.initiate_data_transformation(*splits["c"])
+    entries = _entries(transformation)
+    assert len(entries) == 2
+    assert set(first) < set(entries) and not set(second) & set(entries)
@@ -0,0 +1,82 @@
+import itertools
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.ensemble import AdaBoostRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from src import utils
+from src.utils import evaluate_models
+
+GRIDS = {
+    "Random Forest": {"n_estimators": [4, 8, 16]},
+    "Gradient Boosting": {"learning_rate": [0.1, 0.3], "subsample": [0.8, 1.0], "n_estimators": [8, 16, 32]},
+    "AdaBoost Regressor": {"learning_rate": [0.1, 1.0], "n_estimators": [4, 8, 16]},
+    "Linear Regression": {},
+}
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 5))
+    y = X[:, 0] * 2 - X[:, 1] + np.sin(3 * X[:, 2]) + rng.normal(scale=0.3, size=300)
+    return X[:200], y[:200], X[200:], y[200:]
+
+
+def _models():
+    return {
+        "Random Forest": RandomForestRegressor(max_depth=4, random_state=0),
+        "Gradient Boosting": GradientBoostingRegressor(max_depth=2, random_state=0),
+        "AdaBoost Regressor": AdaBoostRegressor(random_state=0),
+        "Linear Regression": LinearRegression(),
+    }
+
+
+def _evaluate(data, models=None, **kwargs):
+    models = models or _models()
+    report, details = evaluate_models(*data, models, GRIDS, return_report=True, **kwargs)
+    return models, report, details
+
+
+def test_staged_search_picks_the_grid_winners(data):
+    _, grid_report, grid_details = _evaluate(data, search="grid")
+    _, staged_report, staged_details = _evaluate(data, search="staged")
+
+    for name in GRIDS:
+        assert staged_details[name]["best_params"] == grid_details[name]["best_params"]
+        np.testing.assert_allclose(staged_details[name]["cv_scores"], grid_details[name]["cv_scores"])
+        assert staged_report[name] == pytest.approx(grid_report[name])
+    # Staged search fits each boosted/bagged model once per setting of the other parameters
+    assert staged_details["Gradient Boosting"]["cv_fits"] == 4 * 3
+    assert grid_details["Gradient Boosting"]["cv_fits"] == 12 * 3
+
+
+def test_max_fits_caps_the_search(data):
+    _, report, details = _evaluate(data, max_fits=12)
+
+    assert sum(d["cv_fits"] for d in details.values()) == 12
+    # Units are interleaved model by model, so every model gets one candidate
+    assert set(report) == set(GRIDS)
+    assert all(d["n_candidates_evaluated"] == 1 for d in details.values())
+
+
+def test_models_without_an_evaluated_candidate_are_left_out(data):
+    # Three units of three folds: Linear Regression, last in the interleaving, gets none
+    models, report, details = _evaluate(data, max_fits=9)
+
+    assert set(report) == set(details) == {"Random Forest", "Gradient Boosting", "AdaBoost Regressor"}
+    assert not hasattr(models["Linear Regression"], "coef_")
+
+
+def test_time_budget_stops_starting_fits(data, monkeypatch):
+    # A clock that ticks one second per reading: the deadline is read first, then once per fit
+    clock = itertools.count()
+    monkeypatch.setattr(utils, "time", SimpleNamespace(time=lambda: next(clock), perf_counter=time.perf_counter))
+    _, report, details = _evaluate(data, time_budget_s=5.5)
+
+    # Five fits start: all of Random Forest's first candidate, two folds of Gradient Boosting's
+    assert set(report) == {"Random Forest"}
+    assert details["Random Forest"]["cv_fits"] == 3
@@ -0,0 +1,165 @@
+import itertools
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from xgboost import XGBClassifier
+
+from src.components.data_transformation import DataTransformationConfig
+from src.components.model_trainer import ModelTrainer
+from src.serving import explain
+from src.serving.artifact import export_artifact
+from src.serving.explain import MAX_EXPLAIN_CELLS, TreeExplainer
+from src.serving.lifecycle import load_served_model
+from src.serving.tree_engine import from_model
+from src.utils import load_object
+
+FEATURES = ["a", "b", "c", "d"]
+TARGET = "tenyearchd"
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = np.round(rng.normal(size=(500, 4)), 1)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=500) > 0).astype(int)
+    return X, y
+
+
+def test_explainer_is_built_on_first_use(data, tmp_path):
+    X, y = data
+    model = RandomForestClassifier(n_estimators=8, max_depth=4, random_state=0).fit(X, y)
+    export_artifact(model, str(tmp_path / "model.artifact"), feature_names=FEATURES)
+    served = load_served_model(str(tmp_path / "model.artifact"), None, FEATURES)
+
+    assert served.describe()["explanations"] == "deferred"
+    assert served._explainer is None
+    base_value, contributions = served.explain(X[:20])
+    assert served.describe()["explanations"] == "probability"
+    np.testing.assert_allclose(base_value + contributions.sum(axis=1), model.predict_proba(X[:20])[:, 1])
+    assert served.explainer is served.explainer
+
+    unexplained = load_served_model(str(tmp_path / "model.artifact"), None, FEATURES, explain=False)
+    assert unexplained.explainer is None
+    assert unexplained.describe()["explanations"] is None
+
+
+def test_oversized_ensemble_is_refused(data, tmp_path):
+    X, y = data
+    model = RandomForestClassifier(n_estimators=64, random_state=0).fit(X, y)
+    ensemble = from_model(model)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(explain, "MAX_EXPLAIN_CELLS", MAX_EXPLAIN_CELLS // 16)
+        with pytest.raises(ValueError, match="too large to explain"):
+            TreeExplainer(ensemble, len(FEATURES))
+        export_artifact(model, str(tmp_path / "model.artifact"), feature_names=FEATURES)
+        served = load_served_model(str(tmp_path / "model.artifact"), None, FEATURES)
+        assert served.explainer is None
+        assert served.describe()["explanations"] is None
+
+
+def test_chunked_explanations_match(data, monkeypatch):
+    X, y = data
+    model = RandomForestClassifier(n_estimators=8, max_depth=6, random_state=0).fit(X, y)
+    explainer = TreeExplainer(from_model(model), len(FEATURES))
+    _, whole = explainer.explain(X)
+    # A few rows per chunk
+    monkeypatch.setattr(explain, "_TREE_CHUNK_CELLS", explainer.off_factor.size * 3)
+    _, chunked = explainer.explain(X)
+    np.testing.assert_allclose(chunked, whole)
+
+
+def _expected_output(ensemble, x, known):
+    """
+    Expected ensemble output given only the features in known: follow x at
+    their splits and average the children by cover at every other split.
+    """
+    def walk(node):
+        left, right = ensemble.left[node], ensemble.right[node]
+        if left == node:
+            return ensemble.value[node]
+        feature = ensemble.feature[node]
+        if feature in known:
+            return walk(left if x[feature] <= ensemble.threshold[node] else right)
+        return (ensemble.cover[left] * walk(left) + ensemble.cover[right] * walk(right)) / ensemble.cover[node]
+
+    total = sum(walk(root) for root in ensemble.roots)
+    if ensemble.aggregation == "mean":
+        return total / len(ensemble.roots)
+    return ensemble.base_score + ensemble.scale * total
+
+
+def _exact_shapley(ensemble, x, n_features):
+    """Shapley values of _expected_output by enumerating every coalition"""
+    phi = np.zeros(n_features)
+    for i in range(n_features):
+        others = [j for j in range(n_features) if j != i]
+        for size in range(n_features):
+            weight = math.factorial(size) * math.factorial(n_features - size - 1) / math.factorial(n_features)
+            for known in itertools.combinations(others, size):
+                phi[i] += weight * (
+                    _expected_output(ensemble, x, {*known, i}) - _expected_output(ensemble, x, set(known))
+                )
+    return phi
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=8, max_depth=4, random_state=0),
+    GradientBoostingRegressor(n_estimators=10, max_depth=3, random_state=0),
+    XGBClassifier(n_estimators=10, max_depth=3, random_state=0),
+], ids=["random_forest", "gradient_boosting", "xgboost"])
+def test_tree_contributions_are_exact_shapley_values(data, model):
+    X, y = data
+    ensemble = from_model(model.fit(X, y))
+    explainer = TreeExplainer(ensemble, len(FEATURES))
+    rows = np.asarray(X[:10], dtype=ensemble.input_dtype)
+    base_value, contributions = explainer.explain(rows)
+
+    assert base_value == pytest.approx(_expected_output(ensemble, rows[0], set()))
+    for row, row_contributions in zip(rows, contributions):
+        np.testing.assert_allclose(row_contributions, _exact_shapley(ensemble, row, len(FEATURES)), atol=1e-9)
+
+
+@pytest.fixture(scope="module")
+def splits():
+    train = pd.read_csv("artifacts/train.csv").rename(columns=str.lower)
+    test = pd.read_csv("artifacts/test.csv").rename(columns=str.lower)
+    return train, test
+
+
+@pytest.mark.parametrize("source", ["parquet", "frame", None])
+def test_background_comes_from_the_caller(splits, tmp_path, source):
+    train, test = splits
+    # A split that only exists where the caller says, as streaming ingestion writes it
+    shifted = train.assign(age=train["age"] + 10)
+    background = {"parquet": str(tmp_path / "train.parquet"), "frame": shifted, None: None}[source]
+    if source == "parquet":
+        shifted.to_parquet(background)
+
+    preprocessor = load_object(DataTransformationConfig.preprocessor_obj_file_path)
+    X_train = preprocessor.transform(train.drop(columns=[TARGET]))
+    X_test = preprocessor.transform(test.drop(columns=[TARGET]))
+    model = LogisticRegression(max_iter=1000).fit(X_train, train[TARGET])
+
+    trainer = ModelTrainer()
+    config = trainer.model_trainer_config
+    config.trained_model_file_path = str(tmp_path / "model.pkl")
+    config.trained_model_artifact_path = str(tmp_path / "model.artifact")
+    config.search_report_file_path = str(tmp_path / "model_search_report.json")
+    trainer.select_best_model(
+        {"Logistic": model}, {"Logistic": 0.9}, {"Logistic": {}}, X_test, test[TARGET], background
+    )
+    with open(os.path.join(tmp_path, "model.artifact", "manifest.json")) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if source is None:
+        assert manifest["background_mean"] is None
+    else:
+        age = manifest["feature_names"].index("age")
+        assert manifest["background_mean"][age] == pytest.approx(np.nanmean(shifted["age"]))
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+
+from src.components.data_transformation import DataTransformation
+from src.serving.artifact import export_artifact, load_artifact
+from src.serving.preprocessing import from_column_transformer, fuse_linear
+from src.serving.scorer import CompiledLinearScorer
+
+TARGET = "tenyearchd"
+
+
+@pytest.fixture(scope="module")
+def splits():
+    train = pd.read_csv("artifacts/train.csv").rename(columns=str.lower)
+    test = pd.read_csv("artifacts/test.csv").rename(columns=str.lower)
+    preprocessor = DataTransformation().get_data_transformer_object()
+    X_train = preprocessor.fit_transform(train.drop(columns=[TARGET]))
+    return preprocessor, X_train, train[TARGET].to_numpy(), test.drop(columns=[TARGET])
+
+
+def _raw(preprocessor, frame):
+    feature_names = [c for name, _, columns in preprocessor.transformers_ if name != "remainder" for c in columns]
+    return feature_names, frame[feature_names].to_numpy(dtype=np.float64)
+
+
+def test_fused_logistic_regression_matches_transform_and_model(splits, tmp_path):
+    preprocessor, X_train, y_train, test = splits
+    model = LogisticRegression(max_iter=1000).fit(X_train, y_train)
+    feature_names, raw = _raw(preprocessor, test)
+    expected = model.decision_function(preprocessor.transform(test))
+
+    fused = fuse_linear(
+        from_column_transformer(preprocessor, feature_names),
+        CompiledLinearScorer.from_model(model, None), len(feature_names)
+    )
+    np.testing.assert_allclose(fused.decision_function(raw), expected, rtol=0, atol=1e-6)
+
+    export_artifact(model, str(tmp_path / "model.artifact"), preprocessor)
+    artifact = load_artifact(str(tmp_path / "model.artifact"))
+    assert artifact.fused
+    raw = test[artifact.feature_names].to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(artifact.predict(raw), model.predict(preprocessor.transform(test)))
+    np.testing.assert_allclose(
+        artifact.predict_proba(raw), model.predict_proba(preprocessor.transform(test)), rtol=0, atol=1e-9
+    )
+
+
+def test_ill_conditioned_linear_regression_is_not_fused(splits, tmp_path):
+    # Unregularized regression on collinear one-hot columns leaves huge, cancelling coefficients
+    preprocessor, X_train, y_train, test = splits
+    model = LinearRegression().fit(X_train, y_train)
+    feature_names, raw = _raw(preprocessor, test)
+
+    with pytest.raises(ValueError, match="ill-conditioned"):
+        fuse_linear(
+            from_column_transformer(preprocessor, feature_names),
+            CompiledLinearScorer.from_model(model, None), len(feature_names)
+        )
+
+    export_artifact(model, str(tmp_path / "model.artifact"), preprocessor)
+    artifact = load_artifact(str(tmp_path / "model.artifact"))
+    assert not artifact.fused
+    raw = test[artifact.feature_names].to_numpy(dtype=np.float64)
+    transformed = preprocessor.transform(test)
+    # Such a model's own output is only defined up to float64 rounding of its terms
+    noise = np.finfo(np.float64).eps * len(model.coef_) * (
+        np.abs(transformed) @ np.abs(model.coef_) + abs(model.intercept_)
+    )
+    assert (np.abs(artifact.predict(raw) - model.predict(transformed)) <= noise).all()
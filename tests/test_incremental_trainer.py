@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.incremental_trainer import IncrementalTrainer
+from src.utils import load_object
+
+SOURCE = "notebook/Data/preprocessing.csv"
+
+
+@pytest.fixture
+def lines():
+    with open(SOURCE, "rb") as source_file:
+        return source_file.readlines()
+
+
+def _trainer(tmp_path, name):
+    trainer = IncrementalTrainer()
+    config = trainer.incremental_trainer_config
+    config.data_path = str(tmp_path / "data.csv")
+    config.chunk_size = 500
+    config.model_file_path = str(tmp_path / f"{name}.pkl")
+    config.state_file_path = str(tmp_path / f"{name}.state.pkl")
+    return trainer
+
+
+def _write(path, lines):
+    with open(path, "wb") as data_file:
+        data_file.writelines(lines)
+
+
+def test_resume_matches_a_single_run(tmp_path, lines):
+    # Resume at a chunk boundary, so both runs see the same partial_fit batches
+    header, rows = lines[0], lines[1:]
+    _write(tmp_path / "data.csv", [header] + rows)
+    whole = _trainer(tmp_path, "whole")
+    assert whole.initiate_incremental_training() == len(rows)
+
+    _write(tmp_path / "data.csv", [header] + rows[:3000])
+    resumed = _trainer(tmp_path, "resumed")
+    assert resumed.initiate_incremental_training() == 3000
+    _write(tmp_path / "data.csv", [header] + rows)
+    assert resumed.initiate_incremental_training() == len(rows) - 3000
+    assert resumed.initiate_incremental_training() == 0
+
+    state = load_object(resumed.incremental_trainer_config.state_file_path)
+    assert (state["rows_seen"], state["offset"]) == (len(rows), sum(len(line) for line in lines))
+    expected = load_object(whole.incremental_trainer_config.model_file_path)
+    model = load_object(resumed.incremental_trainer_config.model_file_path)
+    np.testing.assert_allclose(model.coef_, expected.coef_)
+    np.testing.assert_allclose(model.intercept_, expected.intercept_)
+
+    frame = pd.read_csv(SOURCE).drop(columns=["tenyearchd"])
+    background = resumed.background()
+    assert list(background.columns) == list(frame.columns)
+    np.testing.assert_allclose(background.iloc[0], frame.mean())
+
+
+def test_rewritten_file_starts_fresh(tmp_path, lines):
+    header, rows = lines[0], lines[1:]
+    _write(tmp_path / "data.csv", [header] + rows[:1000])
+    trainer = _trainer(tmp_path, "model")
+    trainer.initiate_incremental_training()
+
+    # Same header, different rows before the offset
+    _write(tmp_path / "data.csv", [header] + rows[1000:2500])
+    assert trainer.initiate_incremental_training() == 1500
+
+    # Truncated below the offset
+    _write(tmp_path / "data.csv", [header] + rows[1000:1200])
+    assert trainer.initiate_incremental_training() == 200
+
+
+def test_changed_columns_start_fresh(tmp_path, lines):
+    _write(tmp_path / "data.csv", lines[:1001])
+    trainer = _trainer(tmp_path, "model")
+    trainer.initiate_incremental_training()
+    frame = pd.read_csv(tmp_path / "data.csv")
+    frame[["age", *frame.columns.drop("age")]].to_csv(tmp_path / "data.csv", index=False)
+    assert trainer.initiate_incremental_training() == 1000
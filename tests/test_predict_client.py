@@ -0,0 +1,190 @@
+import threading
+import time
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+from waitress import wasyncore
+from waitress.server import create_server
+
+import app
+from predict import FEATURE_NAMES, REJECTED, LatencyStats, PredictionClient, PredictionError
+from src.serving import codec, schema
+from src.serving.cache import PredictionCache
+from src.serving.lifecycle import load_served_model
+from src.serving.schema import warmup_rows
+
+AGE = FEATURE_NAMES.index("age")
+
+
+class StandIn:
+    """
+    WSGI wrapper around the real app.py, serving a rule-based model (High Risk
+    from age 60), with hooks for delays, injected 429/503 answers and
+    measuring concurrent requests.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.delay_s = 0.0
+        self.failures = []  # (status, retry_after) answered before the app sees the request
+        self.batch_sizes = []  # rows scored per call of the model
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def __call__(self, environ, start_response):
+        with self.lock:
+            if self.failures:
+                status, retry_after = self.failures.pop(0)
+                headers = [("Content-Type", "application/json")]
+                if retry_after is not None:
+                    headers.append(("Retry-After", str(retry_after)))
+                start_response(f"{status} {HTTPStatus(status).phrase}", headers)
+                return [b'{"error": "Busy"}']
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return app.app(environ, start_response)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def predict_labels(self, X):
+        time.sleep(self.delay_s)
+        with self.lock:
+            self.batch_sizes.append(len(X))
+        return (X[:, AGE] >= 60).astype(int)
+
+    def predict_probabilities(self, X):
+        return X[:, AGE] / 100.0
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    stand_in = StandIn()
+    served = load_served_model(app.MODEL_ARTIFACT, app.MODEL_FILE, schema.FEATURE_NAMES)
+    served.predict_labels, served.predict_probabilities = stand_in.predict_labels, stand_in.predict_probabilities
+    monkeypatch.setattr(app, "cache", PredictionCache())
+    monkeypatch.setattr(app.model_manager, "current", None)
+    monkeypatch.setattr(app.model_manager, "previous", None)
+    app.model_manager._publish(served)
+
+    server = create_server(stand_in, host="127.0.0.1", port=0, threads=16)
+    stopping = threading.Event()
+
+    def serve():
+        # server.run() has no way to stop; loop in short steps until told to
+        while not stopping.is_set():
+            wasyncore.loop(timeout=0.05, map=server._map, count=1)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    stand_in.url = f"http://127.0.0.1:{server.effective_port}"
+    yield stand_in
+    # Only close the sockets once the loop is no longer selecting on them
+    stopping.set()
+    thread.join()
+    wasyncore.close_all(server._map)
+    server.task_dispatcher.shutdown()
+
+
+def test_client_wire_format_matches_the_server():
+    assert FEATURE_NAMES == schema.FEATURE_NAMES
+    assert REJECTED == codec.REJECTED
+
+
+def _patients(n):
+    rows = np.tile(warmup_rows(), (n // 3 + 1, 1))[:n]
+    rows[:, AGE] = 30 + np.arange(n) % 70
+    return [dict(zip(FEATURE_NAMES, row.tolist())) for row in rows]
+
+
+def test_chunks_keep_input_order(stand_in):
+    patients = _patients(2500)
+    patients[1234] = {"age": 5}
+    with PredictionClient(stand_in.url, batch_size=300, max_in_flight=4) as client:
+        results = client.predict_many(patients)
+
+    assert sorted(stand_in.batch_sizes) == sorted([300] * 7 + [299, 100])
+    assert [r["index"] for r in results] == list(range(2500))
+    assert results[1234]["error"] == "Validation Error"
+    for i in (0, 299, 300, 1233, 1235, 2499):
+        assert results[i]["prediction"] == int(patients[i]["age"] >= 60)
+        assert results[i]["risk_classification"] == ("High Risk" if patients[i]["age"] >= 60 else "Low Risk")
+
+
+def test_in_flight_window_is_bounded(stand_in):
+    stand_in.delay_s = 0.05
+    with PredictionClient(stand_in.url, batch_size=10, max_in_flight=3) as client:
+        results = list(client.iter_predictions(_patients(150)))
+    assert len(results) == 150
+    assert stand_in.peak_in_flight == 3
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retries_honour_retry_after(stand_in, status):
+    stand_in.failures = [(status, 0.2), (status, 0.2)]
+    with PredictionClient(stand_in.url, max_retries=3, backoff_s=0.001) as client:
+        started = time.perf_counter()
+        assert client.predict(_patients(1)[0])["prediction"] == 0
+        elapsed = time.perf_counter() - started
+        stats = client.stats()
+    assert elapsed >= 0.4
+    assert (stats["requests"], stats["retries"], stats["failures"]) == (1, 2, 0)
+
+
+def test_retries_back_off_without_retry_after(stand_in):
+    stand_in.failures = [(503, None)] * 3
+    with PredictionClient(stand_in.url, max_retries=2, backoff_s=0.1) as client:
+        started = time.perf_counter()
+        with pytest.raises(PredictionError) as raised:
+            client.predict(_patients(1)[0])
+        elapsed = time.perf_counter() - started
+        stats = client.stats()
+    # Two waits of 0.5-1x the 0.1s and 0.2s backoff steps
+    assert 0.15 <= elapsed < 1.0
+    assert raised.value.status == 503
+    assert (stats["retries"], stats["failures"]) == (2, 1)
+
+
+def test_client_errors_are_not_retried(stand_in):
+    with PredictionClient(stand_in.url) as client:
+        with pytest.raises(PredictionError) as raised:
+            client.predict({"age": 5})
+        assert client.stats()["retries"] == 0
+    assert raised.value.status == 400
+    assert raised.value.body["error"] == "Validation Error"
+
+
+def test_stats_percentiles(stand_in):
+    stand_in.delay_s = 0.01
+    with PredictionClient(stand_in.url) as client:
+        for patient in _patients(20):
+            client.predict(patient)
+        stats = client.stats()
+    assert stats["requests"] == 20
+    assert 10 <= stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+    latency = LatencyStats()
+    for ms in range(1, 101):
+        latency.record(ms / 1000, 0, False)
+    summary = latency.summary()
+    assert summary["p50_ms"] == pytest.approx(51)
+    assert summary["p95_ms"] == pytest.approx(95)
+    assert summary["p99_ms"] == pytest.approx(99)
+    assert summary["mean_ms"] == pytest.approx(50.5)
+
+
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_predict_matrix_uses_binary_records(stand_in, dtype):
+    X = np.array([[p[name] for name in FEATURE_NAMES] for p in _patients(250)])
+    X[7, AGE] = np.nan
+    with PredictionClient(stand_in.url, batch_size=100, max_in_flight=2) as client:
+        predictions, probabilities = client.predict_matrix(X, dtype)
+
+    assert sorted(stand_in.batch_sizes) == [50, 99, 100]
+    expected = (X[:, AGE] >= 60).astype(int)
+    expected[7] = REJECTED
+    np.testing.assert_array_equal(predictions, expected)
+    assert np.isnan(probabilities[7])
+    np.testing.assert_allclose(np.delete(probabilities, 7), np.delete(X[:, AGE], 7) / 100, rtol=1e-6)
@@ -0,0 +1,98 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SLOW_APP = '''
+import os
+import time
+from urllib.parse import parse_qs
+
+
+def app(environ, start_response):
+    time.sleep(float(parse_qs(environ["QUERY_STRING"]).get("sleep", ["0"])[0]))
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [str(os.getpid()).encode()]
+'''
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork serving needs os.fork")
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "slow_app.py").write_text(SLOW_APP)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.serving.prefork", "--app", "slow_app:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", "1", "--threads", "1"],
+        cwd=tmp_path, env={**os.environ, "PYTHONPATH": ROOT, "LOG_QUEUE": "0"}, start_new_session=True
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 15
+    while True:
+        try:
+            requests.get(url, timeout=1)
+            break
+        except requests.ConnectionError:
+            assert time.monotonic() < deadline, "server did not start"
+            time.sleep(0.1)
+    yield process, url
+    # Workers too, should a test leave the supervisor running
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+
+def _in_background(url):
+    result = {}
+
+    def call():
+        try:
+            response = requests.get(url, timeout=10)
+            result["status"], result["pid"] = response.status_code, response.text
+        except requests.RequestException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=call)
+    thread.start()
+    time.sleep(0.3)
+    return thread, result
+
+
+def test_rolling_restart_lets_accepted_requests_finish(server):
+    process, url = server
+    old_pid = requests.get(url).text
+    running = [_in_background(f"{url}/?sleep=1.5") for _ in range(2)]
+
+    process.send_signal(signal.SIGHUP)
+    # Workers notice SIGTERM within waitress's 1s poll timeout; from then on the
+    # replacement takes new connections while the old worker drains
+    time.sleep(1.2)
+    assert requests.get(url, timeout=5).text != old_pid
+    for thread, slow in running:
+        thread.join()
+        assert slow == {"status": 200, "pid": old_pid}
+
+
+def test_shutdown_drains_before_exiting(server):
+    # With one thread the second request is still queued when the worker is told to stop
+    process, url = server
+    running = [_in_background(f"{url}/?sleep=1") for _ in range(2)]
+
+    process.send_signal(signal.SIGTERM)
+    for thread, slow in running:
+        thread.join()
+        assert slow["status"] == 200
+    assert process.wait(timeout=10) == 0
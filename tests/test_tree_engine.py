@@ -0,0 +1,94 @@
+import importlib
+
+import numpy as np
+import pytest
+
+from src.components.model_trainer import MODEL_REGISTRY, build_model
+from src.serving.tree_engine import ATOL, RTOL, TreeEnsemble, check_conversion, from_model
+
+# Keep fits small; the conversion does not depend on ensemble size
+SMALL_PARAMS = {
+    "RandomForestRegressor": {"n_estimators": 16},
+    "RandomForestClassifier": {"n_estimators": 16},
+    "ExtraTreesRegressor": {"n_estimators": 16},
+    "ExtraTreesClassifier": {"n_estimators": 16},
+    "GradientBoostingRegressor": {"n_estimators": 32},
+    "GradientBoostingClassifier": {"n_estimators": 32},
+    "AdaBoostRegressor": {"n_estimators": 16},
+    "XGBRegressor": {"n_estimators": 32},
+    "XGBClassifier": {"n_estimators": 32},
+    "CatBoostRegressor": {"iterations": 32, "allow_writing_files": False},
+    "CatBoostClassifier": {"iterations": 32, "verbose": False, "allow_writing_files": False},
+}
+
+CLASSIFIERS = [
+    ("sklearn.tree", "DecisionTreeClassifier"),
+    ("sklearn.ensemble", "RandomForestClassifier"),
+    ("sklearn.ensemble", "ExtraTreesClassifier"),
+    ("sklearn.ensemble", "GradientBoostingClassifier"),
+    ("xgboost", "XGBClassifier"),
+    ("catboost", "CatBoostClassifier"),
+]
+
+TREE_MODELS = [name for name in MODEL_REGISTRY if name != "Linear Regression"]
+
+
+@pytest.fixture(scope="module")
+def data():
+    # Binary flags and values rounded to a coarse grid, so rows land exactly on split thresholds
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.integers(0, 2, 400),
+        np.round(rng.uniform(30, 100, 400)),
+        np.round(rng.normal(250, 40, 400), 1),
+        rng.normal(size=400),
+    ]).astype(np.float64)
+    logit = 0.8 * X[:, 0] + 0.05 * (X[:, 1] - 60) + 0.01 * (X[:, 2] - 250) + X[:, 3]
+    y = (logit + rng.normal(scale=0.5, size=400) > 0).astype(int)
+    return X[:300], y[:300], X[300:]
+
+
+def _small(model):
+    params = SMALL_PARAMS.get(type(model).__name__, {})
+    return model.set_params(**params) if params else model
+
+
+def _check(model, X_test):
+    ensemble = from_model(model)
+    assert isinstance(ensemble, TreeEnsemble)
+    error = check_conversion(model, ensemble, X_test)
+    assert error <= ATOL + RTOL
+    # Round-trips through the artifact arrays unchanged
+    arrays, params = ensemble.to_arrays()
+    restored = TreeEnsemble.from_arrays(arrays, params)
+    check_conversion(model, restored, X_test)
+
+
+@pytest.mark.parametrize("name", TREE_MODELS)
+def test_registry_regressors_convert(name, data):
+    X_train, y_train, X_test = data
+    model = _small(build_model(name)).fit(X_train, y_train)
+    _check(model, X_test)
+
+
+@pytest.mark.parametrize("module_name, class_name", CLASSIFIERS)
+def test_classifier_variants_convert(module_name, class_name, data):
+    X_train, y_train, X_test = data
+    model = getattr(importlib.import_module(module_name), class_name)()
+    model = _small(model).fit(X_train, y_train)
+    _check(model, X_test)
+    np.testing.assert_array_equal(from_model(model).predict(X_test), model.predict(X_test).ravel())
+
+
+def test_linear_model_is_not_a_tree(data):
+    X_train, y_train, _ = data
+    with pytest.raises(ValueError):
+        from_model(build_model("Linear Regression").fit(X_train, y_train))
+
+
+def test_mismatch_is_reported(data):
+    X_train, y_train, X_test = data
+    model = _small(build_model("Random Forest")).fit(X_train, y_train)
+    ensemble = from_model(_small(build_model("Random Forest")).set_params(random_state=1).fit(X_train, y_train))
+    with pytest.raises(ValueError, match="differs from the model"):
+        check_conversion(model, ensemble, X_test)
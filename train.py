@@ -1,8 +1,25 @@
 import pickle
+import sys
 import pandas as pd
+from src.serving.artifact import export_artifact
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 
+# Incremental mode: stream only rows added since the last run into an SGD logistic model
+# usage: python train.py --incremental
+if '--incremental' in sys.argv:
+    from src.components.incremental_trainer import IncrementalTrainer
+
+    trainer = IncrementalTrainer()
+    if trainer.initiate_incremental_training():
+        with open(trainer.incremental_trainer_config.model_file_path, 'rb') as model_file:
+            # The running training means are the explanation baseline, as df_train's are below
+            export_artifact(pickle.load(model_file), 'incremental_model.artifact', background=trainer.background())
+        print("Model has been updated incrementally and saved as 'incremental_model.pkl'")
+    else:
+        print("No new rows to train on; 'incremental_model.pkl' unchanged")
+    sys.exit(0)
+
 # import the preprocessed data
 
 df=pd.read_csv('notebook\\Data\\preprocessing.csv')
@@ -32,4 +49,9 @@ model.fit(df_train,y_train)
 with open('best_model.pkl', 'wb') as model_file:
     pickle.dump(model, model_file)
 
-print("Model has been saved as 'best_model.pkl'")
\ No newline at end of file
+print("Model has been saved as 'best_model.pkl'")
+
+## Exporting the flat-array artifact loaded by app.py
+## The training rows' feature means are the baseline /predict?explain=true measures contributions from
+export_artifact(model, 'best_model.artifact', background=df_train)
+print("Model artifact has been saved as 'best_model.artifact'")
\ No newline at end of file